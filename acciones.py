@@ -0,0 +1,78 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Paxos y Raft)
+#
+# Archivo: acciones.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+acciones.py
+
+Registro pre-parseado de una acción SET/ADD/DEL. Cada base de datos sabe parsear
+sus acciones (`Database.parse_action`) una sola vez y aplicarlas luego con
+`Database.apply_record` sin volver a partir strings. El registro vive junto al
+dato que lo originó: en Raft, como tercer campo de cada entrada del log
+(term, acción, registro), así las reconstrucciones de BD no vuelven a parsear; en
+EPaxos, en el comando; Paxos parsea el valor al aprenderlo.
+
+Uso (benchmark de aplicación):
+    python acciones.py 200000
+"""
+
+from __future__ import annotations
+import sys
+import time
+from typing import List, NamedTuple
+
+OP_NOP = 0
+OP_SET = 1
+OP_ADD = 2
+OP_DEL = 3
+
+
+class Accion(NamedTuple):
+    op: int
+    key: str
+    value: str
+
+
+NOP = Accion(OP_NOP, "", "")
+
+
+# ------------------------------------------------------------------------------------
+# Benchmark: apply_action (string) vs apply_record (pre-parseado)
+# ------------------------------------------------------------------------------------
+def _workload(n: int) -> List[str]:
+    ops = ("SET-k{i}-v{i}", "ADD-k{i}-{i}", "ADD-k{i}- extra", "DEL-k{i}")
+    return [ops[i % 4].format(i=i % 97) for i in range(n)]
+
+
+def benchmark(n: int) -> None:
+    import database1
+    import database2
+
+    actions = _workload(n)
+    for nombre, cls in (("database1", database1.Database), ("database2", database2.Database)):
+        db = cls()
+        inicio = time.perf_counter()
+        for act in actions:
+            db.apply_action(act)
+        t_str = time.perf_counter() - inicio
+
+        records = [cls.parse_action(act) for act in actions]
+        db2 = cls()
+        inicio = time.perf_counter()
+        for rec in records:
+            db2.apply_record(rec)
+        t_rec = time.perf_counter() - inicio
+
+        assert db.snapshot() == db2.snapshot()
+        print(f"{nombre}: strings {n / t_str:10.0f} acc/s | registros {n / t_rec:10.0f} acc/s "
+              f"({t_str / t_rec:.2f}x)")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) >= 2 else 200_000)
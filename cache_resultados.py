@@ -0,0 +1,242 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Paxos y Raft)
+#
+# Archivo: cache_resultados.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+cache_resultados.py
+
+Caché de resultados de escenarios direccionada por contenido. La clave de un
+escenario es el sha256 de:
+
+    modo | contenido del caso | main.py | fuentes del motor y sus imports locales
+
+donde las fuentes del motor se obtienen recorriendo los `import` (con ast) desde
+paxos.py o raft.py y quedándose con los módulos de este directorio. Si nada de
+eso cambió, el archivo de logs se copia desde la caché sin correr main.py. Con
+--digest se guardan también los digestos del caso, bajo la misma clave.
+
+La caché vive en `.cache_resultados/` (un archivo por clave) con tamaño acotado:
+cada acierto actualiza el mtime y, al pasarse de `max_bytes`, se borran primero
+los menos usados (LRU).
+
+El modo vigilancia revisa los mtimes de casos y fuentes y vuelve a correr solo
+los escenarios afectados: los casos que cambiaron y, si cambió una fuente, los del
+motor que depende de ella.
+"""
+
+from __future__ import annotations
+import ast
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+DIRECTORIO = ".cache_resultados"
+MAX_BYTES = 64 * 1024 * 1024
+MOTORES = {"Paxos": "paxos.py", "Raft": "raft.py"}
+
+_RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+
+# ------------------------------------------------------------------------------------
+# Dependencias y claves
+# ------------------------------------------------------------------------------------
+def imports_locales(ruta: str, raiz: str = _RAIZ) -> Set[str]:
+    """Módulos de `raiz` importados por el archivo (rutas absolutas)."""
+    with open(ruta, "rb") as f:
+        arbol = ast.parse(f.read(), filename=ruta)
+    nombres: Set[str] = set()
+    for nodo in ast.walk(arbol):
+        if isinstance(nodo, ast.Import):
+            nombres.update(alias.name.split(".")[0] for alias in nodo.names)
+        elif isinstance(nodo, ast.ImportFrom) and nodo.module and not nodo.level:
+            nombres.add(nodo.module.split(".")[0])
+    rutas = (os.path.join(raiz, f"{n}.py") for n in nombres)
+    return {r for r in rutas if os.path.isfile(r)}
+
+
+def dependencias(raices: Iterable[str], raiz: str = _RAIZ) -> List[str]:
+    """Clausura de imports locales desde `raices` (ordenada, incluye las raíces)."""
+    pendientes = [os.path.join(raiz, r) for r in raices]
+    vistos: Set[str] = set()
+    while pendientes:
+        ruta = pendientes.pop()
+        if ruta in vistos:
+            continue
+        vistos.add(ruta)
+        pendientes.extend(imports_locales(ruta, raiz) - vistos)
+    return sorted(vistos)
+
+
+class Hasher:
+    """sha256 de archivos, memoizado por (mtime, tamaño) para no releer fuentes."""
+
+    def __init__(self) -> None:
+        self._memo: Dict[str, Tuple[int, int, bytes]] = {}
+
+    def archivo(self, ruta: str) -> bytes:
+        st = os.stat(ruta)
+        memo = self._memo.get(ruta)
+        if memo is not None and memo[0] == st.st_mtime_ns and memo[1] == st.st_size:
+            return memo[2]
+        with open(ruta, "rb") as f:
+            digest = hashlib.sha256(f.read()).digest()
+        self._memo[ruta] = (st.st_mtime_ns, st.st_size, digest)
+        return digest
+
+    def clave(self, modo: str, caso: str, fuentes: Iterable[str]) -> str:
+        h = hashlib.sha256(modo.encode("utf-8"))
+        h.update(self.archivo(caso))
+        for ruta in fuentes:
+            h.update(os.path.basename(ruta).encode("utf-8"))
+            h.update(self.archivo(ruta))
+        return h.hexdigest()
+
+
+def fuentes_de(modo: str, raiz: str = _RAIZ) -> List[str]:
+    """main.py más la clausura de imports del motor del modo."""
+    return sorted(set(dependencias([MOTORES[modo]], raiz)) | {os.path.join(raiz, "main.py")})
+
+
+# ------------------------------------------------------------------------------------
+# Caché LRU en disco
+# ------------------------------------------------------------------------------------
+class ResultCache:
+    def __init__(self, directorio: str = DIRECTORIO, max_bytes: int = MAX_BYTES) -> None:
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self.aciertos = 0
+        self.fallos = 0
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, clave)
+
+    def get(self, clave: str) -> Optional[bytes]:
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, "rb") as f:
+                datos = f.read()
+        except FileNotFoundError:
+            self.fallos += 1
+            return None
+        os.utime(ruta)  # marca de uso para el LRU
+        self.aciertos += 1
+        return datos
+
+    def put(self, clave: str, datos: bytes) -> None:
+        tmp = self._ruta(clave) + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(datos)
+        os.replace(tmp, self._ruta(clave))
+        self._desalojar()
+
+    def _desalojar(self) -> None:
+        entradas = []
+        total = 0
+        for nombre in os.listdir(self.directorio):
+            st = os.stat(os.path.join(self.directorio, nombre))
+            entradas.append((st.st_mtime_ns, st.st_size, nombre))
+            total += st.st_size
+        entradas.sort()
+        for _, tam, nombre in entradas:
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directorio, nombre))
+            total -= tam
+
+
+# ------------------------------------------------------------------------------------
+# Ejecución con caché y modo vigilancia
+# ------------------------------------------------------------------------------------
+def ruta_logs(modo: str, caso: str) -> str:
+    return os.path.join("logs", f"{modo}_{os.path.basename(caso)}")
+
+
+def ejecutar_con_cache(modo: str, caso: str, correr: Callable[[str, str], Optional[int]],
+                       cache: ResultCache, hasher: Hasher,
+                       fuentes: Optional[List[str]] = None) -> bool:
+    """
+    Deja en logs/ el resultado del caso; retorna True si vino de la caché. `correr`
+    retorna el código de salida de main.py: solo se guarda una corrida exitosa.
+    """
+    clave = hasher.clave(modo, caso, fuentes if fuentes is not None else fuentes_de(modo))
+    salida = ruta_logs(modo, caso)
+    datos = cache.get(clave)
+    if datos is not None:
+        os.makedirs("logs", exist_ok=True)
+        with open(salida, "wb") as f:
+            f.write(datos)
+        return True
+    # Un log de una corrida anterior no debe quedar guardado bajo la clave nueva
+    # si esta corrida falla o excede el tiempo (la excepción se propaga)
+    try:
+        os.remove(salida)
+    except FileNotFoundError:
+        pass
+    if correr(modo, caso):
+        return False
+    try:
+        with open(salida, "rb") as f:
+            cache.put(clave, f.read())
+    except FileNotFoundError:
+        pass  # main.py no escribió logs: no se guarda nada
+    return False
+
+
+def digesto_con_cache(modo: str, caso: str,
+                      calcular: Callable[[str, str], Optional[Dict[str, str]]],
+                      cache: ResultCache, hasher: Hasher,
+                      fuentes: Optional[List[str]] = None) -> Optional[Dict[str, str]]:
+    """
+    Digestos del caso (ver digestos.py), guardados bajo la misma clave que sus logs
+    con sufijo `.digesto`: si nada cambió no se corre main.py. `calcular` retorna
+    None si la corrida falló, y eso no se guarda.
+    """
+    clave = hasher.clave(modo, caso, fuentes if fuentes is not None else fuentes_de(modo))
+    datos = cache.get(clave + ".digesto")
+    if datos is not None:
+        return json.loads(datos)
+    digesto = calcular(modo, caso)
+    if digesto is not None:
+        cache.put(clave + ".digesto", json.dumps(digesto).encode("utf-8"))
+    return digesto
+
+
+def vigilar(casos: List[Tuple[str, str]], al_cambiar: Callable[[List[Tuple[str, str]]], None],
+            intervalo: float = 0.5) -> None:
+    """Llama `al_cambiar(afectados)` cada vez que cambian casos o fuentes (Ctrl-C sale)."""
+    def estado() -> Tuple[Dict[str, List[str]], Dict[str, int]]:
+        fuentes = {modo: fuentes_de(modo) for modo in {m for m, _ in casos}}
+        rutas = {c for _, c in casos} | {r for fs in fuentes.values() for r in fs}
+        mtimes = {}
+        for r in rutas:
+            try:
+                mtimes[r] = os.stat(r).st_mtime_ns
+            except FileNotFoundError:
+                mtimes[r] = -1
+        return fuentes, mtimes
+
+    _, mtimes = estado()
+    print(f"Vigilando {len(casos)} casos y {len(mtimes) - len(casos)} fuentes (Ctrl-C para salir)")
+    try:
+        while True:
+            time.sleep(intervalo)
+            nuevas, nuevos_mtimes = estado()
+            cambiados = {r for r, m in nuevos_mtimes.items() if mtimes.get(r) != m}
+            if not cambiados:
+                continue
+            afectados = [(modo, caso) for modo, caso in casos
+                         if caso in cambiados or cambiados.intersection(nuevas[modo])]
+            mtimes = nuevos_mtimes
+            if afectados:
+                al_cambiar(afectados)
+    except KeyboardInterrupt:
+        pass
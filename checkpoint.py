@@ -0,0 +1,139 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Paxos y Raft)
+#
+# Archivo: checkpoint.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+checkpoint.py
+
+Checkpoint y reanudación de simulaciones largas. Cada K eventos se guarda el estado
+completo del simulador (nodos/aceptores, terms, logs, commit, prepare_info, BD y la
+salida acumulada) en un archivo binario versionado:
+
+    b"T2CK" | versión (u16) | motor (u8) | offset del escenario (u64)
+           | líneas a saltar (u64) | eventos procesados (u64) | sha256 del escenario (32 B)
+           | zlib(pickle(sim))
+
+Al reanudar se carga el último checkpoint y se continúa leyendo el escenario desde
+el offset en bytes guardado (seek), sin re-parsear lo ya procesado. El escenario se
+lee con `escenario.expandir_archivo`, igual que run(): si el checkpoint cayó dentro
+de un bloque Repeat, el offset es el del bloque y se saltan las líneas ya
+expandidas de él. El escenario se identifica por el sha256 de su contenido, como
+en cache_resultados: un escenario editado sin cambiar de tamaño no se confunde.
+
+La instrumentación viaja dentro del simulador: la elección simulada, las
+latencias, la traza y la persistencia de aceptores se guardan con él y, al
+reanudar, la traza y los archivos de aceptores se reabren cortados donde estaban
+al guardar el checkpoint.
+"""
+
+from __future__ import annotations
+import hashlib
+import os
+import pickle
+import struct
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from escenario import expandir_archivo
+from paxos import PaxosSimulator
+from raft import RaftSimulator
+
+MAGIC = b"T2CK"
+VERSION = 3
+_HEADER = struct.Struct("<4sHBQQQ32s")
+MOTORES = {"Paxos": 0, "Raft": 1}
+
+Simulador = Union[PaxosSimulator, RaftSimulator]
+
+
+def digesto_escenario(path: str, bloque: int = 1 << 20) -> bytes:
+    """sha256 del escenario, leído por bloques (puede ser muy grande)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for datos in iter(lambda: f.read(bloque), b""):
+            h.update(datos)
+    return h.digest()
+
+
+def guardar(ruta: str, motor: str, sim: Simulador, offset: int, saltar: int, eventos: int,
+            digesto: bytes) -> None:
+    """Escribe el checkpoint de forma atómica (archivo temporal + rename)."""
+    cuerpo = zlib.compress(pickle.dumps(sim, protocol=pickle.HIGHEST_PROTOCOL), 1)
+    tmp = ruta + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, MOTORES[motor], offset, saltar, eventos,
+                             digesto))
+        f.write(cuerpo)
+    os.replace(tmp, ruta)
+
+
+def cargar(ruta: str, motor: str) -> Tuple[Simulador, int, int, int, bytes]:
+    """Retorna (simulador, offset, líneas a saltar, eventos procesados, sha256 del escenario)."""
+    with open(ruta, "rb") as f:
+        datos = f.read()
+    magic, version, id_motor, offset, saltar, eventos, digesto = _HEADER.unpack_from(datos)
+    if magic != MAGIC:
+        raise ValueError(f"{ruta} no es un checkpoint")
+    if version != VERSION:
+        raise ValueError(f"Versión de checkpoint {version} no soportada (se espera {VERSION})")
+    if id_motor != MOTORES[motor]:
+        raise ValueError(f"{ruta} es un checkpoint de otro motor")
+    sim = pickle.loads(zlib.decompress(datos[_HEADER.size:]))
+    return sim, offset, saltar, eventos, digesto
+
+
+def ejecutar(motor: str, path: str, ruta_ckpt: str, cada: int = 10000,
+             reanudar: bool = True) -> Tuple[List[str], Dict[str, str]]:
+    """Como run(), pero guardando un checkpoint cada `cada` eventos."""
+    sim = simular(motor, path, ruta_ckpt, cada, reanudar)
+    return sim.log_lines, sim.db.snapshot()
+
+
+def simular(motor: str, path: str, ruta_ckpt: str, cada: int = 10000, reanudar: bool = True,
+            crear: Optional[Callable[[], Simulador]] = None) -> Simulador:
+    """
+    Corre el escenario con checkpoints y retorna el simulador terminado. `crear`
+    arma el simulador ya configurado (elección, traza...) si no hay que reanudar.
+    """
+    cls = PaxosSimulator if motor == "Paxos" else RaftSimulator
+    digesto = digesto_escenario(path)
+
+    with open(path, "rb") as f:
+        if reanudar and os.path.exists(ruta_ckpt):
+            sim, offset, saltar, eventos, digesto_ckpt = cargar(ruta_ckpt, motor)
+            if digesto_ckpt != digesto:
+                raise ValueError(f"{ruta_ckpt} corresponde a otro escenario")
+            f.seek(offset)
+            lineas = expandir_archivo(f, cls._clean, saltar)
+        else:
+            sim = crear() if crear is not None else cls(path)
+            eventos = 0
+            lineas = expandir_archivo(f, cls._clean)
+            cabecera = next(lineas, None)
+            if cabecera is None:
+                return sim
+            if motor == "Paxos":
+                proponentes = next(lineas, None)
+                sim._parse_header(cabecera[0], proponentes[0] if proponentes else None)
+            else:
+                sim._parse_header(cabecera[0])
+
+        for line, offset, k in lineas:
+            sim._process_line(line)
+            eventos += 1
+            if eventos % cada == 0:
+                guardar(ruta_ckpt, motor, sim, offset, k + 1, eventos, digesto)
+
+    if isinstance(sim, RaftSimulator):
+        sim._flush_sends()
+        sim._recompute_commit_and_apply()
+    # Terminó: el próximo run parte de cero
+    if os.path.exists(ruta_ckpt):
+        os.remove(ruta_ckpt)
+    return sim
@@ -34,52 +34,160 @@ from __future__ import annotations
 import os
 import sys
 import difflib
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import zip_longest
+from typing import Iterator, Optional
+
+from digestos import Digesto, cargar_dorados, digerir_archivo
+
+CHUNK = 1 << 16
+SECCION_BD = "BASE DE DATOS"
+CONTEXTO = 3
+UMBRAL_PARALELO = 8 << 20  # bytes leídos entre ambos directorios
 
 # ------------------------------------------------------------------------------------
 # Bloque guiado con asistencia de ChatGPT (GPT-5, OpenAI)
 # ------------------------------------------------------------------------------------
 
 
-def read_file(path: str) -> list[str]:
-    """Lee un archivo en UTF-8 y devuelve sus líneas sin saltos."""
+def _iter_lines(path: str) -> Iterator[str]:
+    """Itera las líneas de un archivo sin cargarlo completo (vacío si no existe)."""
     try:
         with open(path, "r", encoding="utf-8") as f:
-            return [x.rstrip("\n") for x in f]
+            for x in f:
+                yield x.rstrip("\n")
     except FileNotFoundError:
-        return []
+        return
+
+
+def _same_content(path1: str, path2: str) -> bool:
+    """Camino rápido: mismo tamaño y mismo checksum incremental (adler32 + crc32)."""
+    try:
+        if os.path.getsize(path1) != os.path.getsize(path2):
+            return False
+        a1 = a2 = 1
+        c1 = c2 = 0
+        with open(path1, "rb") as f1, open(path2, "rb") as f2:
+            while True:
+                b1, b2 = f1.read(CHUNK), f2.read(CHUNK)
+                if not b1 and not b2:
+                    break
+                a1, c1 = zlib.adler32(b1, a1), zlib.crc32(b1, c1)
+                a2, c2 = zlib.adler32(b2, a2), zlib.crc32(b2, c2)
+                if (a1, c1) != (a2, c2):
+                    return False
+        return True
+    except FileNotFoundError:
+        return False
+
+
+class _Secciones:
+    """
+    Lector en streaming de un archivo de logs, partido en su propio encabezado
+    BASE DE DATOS: `logs()` entrega las líneas anteriores y, al agotarse, deja las
+    de la BD en el conjunto `bd`.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.total = 0
+        self.con_bd = False
+        self.bd: set[str] = set()
 
+    def logs(self) -> Iterator[str]:
+        lineas = _iter_lines(self.path)
+        for linea in lineas:
+            self.total += 1
+            if linea == SECCION_BD:
+                self.con_bd = True
+                break
+            yield linea
+        for linea in lineas:
+            self.total += 1
+            self.bd.add(linea)
 
-def compare_files(path1: str, path2: str) -> tuple[float, list[str]]:
+
+def compare_files(path1: str, path2: str, dorado: Optional[Digesto] = None
+                  ) -> tuple[float, list[str]]:
     """
-    Compara dos archivos línea por línea.
+    Compara dos archivos en streaming. Si hay digesto de referencia (`dorado`) y el
+    del archivo generado coincide, no se lee el esperado.
+    - Sección LOGS: línea a línea, en orden.
+    - Sección BASE DE DATOS: como conjunto (el orden no importa). Cada archivo se
+      parte en su propio encabezado, como en `verificar_tests`, así un LOGS más
+      largo o más corto no desalinea la BD.
+    El diff solo se calcula para la primera región de LOGS que difiere.
     Retorna (porcentaje_coincidencia, diferencias_formateadas)
     """
-    lines1 = read_file(path1)
-    lines2 = read_file(path2)
+    if dorado is not None and digerir_archivo(path1) == dorado:
+        return 100.0, []
+    if _same_content(path1, path2):
+        return 100.0, []
+
+    gen, esp = _Secciones(path1), _Secciones(path2)
+    coincidencias = 0
+    primera = -1
+    ventana1: list[str] = []
+    ventana2: list[str] = []
+    previas: list[str] = []
 
-    if not lines1 and not lines2:
+    for i, (l1, l2) in enumerate(zip_longest(gen.logs(), esp.logs())):
+        if l1 == l2:
+            coincidencias += 1
+            if primera < 0:
+                previas = (previas + [l1])[-CONTEXTO:]
+        elif primera < 0:
+            primera = i
+        # Se guarda solo la primera región distinta (más contexto) para el diff: un
+        # número fijo de pasos desde `primera`, aunque uno de los archivos ya se acabó
+        if primera >= 0 and i - primera < 4 * CONTEXTO:
+            if l1 is not None:
+                ventana1.append(l1)
+            if l2 is not None:
+                ventana2.append(l2)
+
+    if not gen.total and not esp.total:
         return 100.0, ["(Ambos vacíos)"]
 
-    sm = difflib.SequenceMatcher(None, lines1, lines2)
-    ratio = sm.ratio() * 100
+    db1, db2 = gen.bd, esp.bd
+    coincidencias += (gen.con_bd and esp.con_bd) + len(db1 & db2)
+    ratio = 200.0 * coincidencias / (gen.total + esp.total)
 
-    diff = list(
-        difflib.unified_diff(
-            lines2,
-            lines1,
-            fromfile="esperado",
-            tofile="generado",
-            lineterm="",
+    diff: list[str] = []
+    if primera >= 0:
+        diff = list(
+            difflib.unified_diff(
+                previas + ventana2,
+                previas + ventana1,
+                fromfile="esperado",
+                tofile="generado",
+                lineterm="",
+                n=CONTEXTO,
+            )
         )
-    )
+    if db1 != db2:
+        if not diff:
+            diff = ["--- esperado", "+++ generado"]
+        diff.append(f"@@ {SECCION_BD} @@")
+        diff.extend(f"-{x}" for x in sorted(db2 - db1))
+        diff.extend(f"+{x}" for x in sorted(db1 - db2))
 
     return ratio, diff
 
 
-def compare_directories(generated_dir: str, expected_dir: str, prefix_filter: str = "") -> None:
+def _compare_pair(pair: tuple[str, str, Optional[Digesto]]) -> tuple[float, list[str]]:
+    return compare_files(*pair)
+
+
+def compare_directories(
+    generated_dir: str, expected_dir: str, prefix_filter: str = "", workers: int | None = None
+) -> None:
     """
     Compara todos los archivos con el mismo nombre en `generated_dir` y `expected_dir`.
     Si `prefix_filter` es "Paxos" o "Raft", solo compara esos archivos.
+    Si los archivos suman al menos `UMBRAL_PARALELO` bytes, las comparaciones se
+    reparten en `workers` procesos (por defecto, uno por CPU); si no, van en serie.
     """
     gen_files = [f for f in os.listdir(generated_dir) if f.endswith(".txt")]
     if prefix_filter:
@@ -95,6 +203,7 @@ def compare_directories(generated_dir: str, expected_dir: str, prefix_filter: st
     print(f" Comparando archivos en '{generated_dir}' vs '{expected_dir}'")
     print("────────────────────────────────────────────────────────────")
 
+    pares = []
     for fname in sorted(gen_files):
         gen_path = os.path.join(generated_dir, fname)
         exp_path = os.path.join(expected_dir, fname)
@@ -102,19 +211,32 @@ def compare_directories(generated_dir: str, expected_dir: str, prefix_filter: st
         if not os.path.exists(exp_path):
             print(f"⚠️  No existe esperado para: {fname}")
             continue
+        pares.append((fname, gen_path, exp_path))
 
-        total += 1
-        ratio, diff = compare_files(gen_path, exp_path)
-
-        if ratio == 100.0:
-            correct += 1
-            print(f"✅ {fname}: {ratio:.1f}% OK")
-        else:
-            print(f"❌ {fname}: {ratio:.1f}% coincidencia")
-            for line in diff[:10]:  # muestra solo las primeras diferencias
-                print("   ", line)
-            if len(diff) > 10:
-                print("   ... (diferencias truncadas)")
+    # Los archivos se comparan en paralelo solo si hay bastante que leer: para pocos
+    # bytes, levantar los procesos cuesta más que comparar. Se imprime en orden.
+    dorados = cargar_dorados(os.path.join(expected_dir, "digestos.json"))
+    trabajos = [(g, e, dorados.get(f)) for f, g, e in pares]
+    tam = sum(os.path.getsize(g) + os.path.getsize(e) for _, g, e in pares)
+    pool = None
+    if len(pares) > 1 and tam >= UMBRAL_PARALELO and workers != 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        resultados = (pool.map if pool is not None else map)(_compare_pair, trabajos)
+        for (fname, _, _), (ratio, diff) in zip(pares, resultados):
+            total += 1
+            if ratio == 100.0:
+                correct += 1
+                print(f"✅ {fname}: {ratio:.1f}% OK")
+            else:
+                print(f"❌ {fname}: {ratio:.1f}% coincidencia")
+                for line in diff[:10]:  # muestra solo las primeras diferencias
+                    print("   ", line)
+                if len(diff) > 10:
+                    print("   ... (diferencias truncadas)")
+    finally:
+        if pool is not None:
+            pool.shutdown()
 
     print("────────────────────────────────────────────────────────────")
     if total > 0:
@@ -37,7 +37,10 @@ Reglas:
 """
 
 from __future__ import annotations
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
+
+from acciones import NOP, OP_ADD, OP_DEL, OP_SET, Accion
+from indice import IndiceOrdenado
 
 
 # ------------------------------------------------------------------------------------
@@ -49,6 +52,7 @@ class Database:
 
     def __init__(self) -> None:
         self._store: Dict[str, str] = {}
+        self._indice = IndiceOrdenado()
 
     # --------- Helpers ---------
     @staticmethod
@@ -59,11 +63,14 @@ class Database:
     # --------- API pública ---------
     def set(self, var: str, value: str) -> None:
         """Asigna un valor directamente."""
+        if var not in self._store:
+            self._indice.agregar(var)
         self._store[var] = value
 
     def add(self, var: str, value: str) -> None:
         """Suma o concatena según tipo."""
         if var not in self._store:
+            self._indice.agregar(var)
             self._store[var] = value
             return
 
@@ -75,7 +82,8 @@ class Database:
 
     def delete(self, var: str) -> None:
         """Elimina una variable si existe."""
-        self._store.pop(var, None)
+        if self._store.pop(var, None) is not None:
+            self._indice.quitar(var)
 
     def snapshot(self) -> Dict[str, str]:
         """Copia del estado actual de la base."""
@@ -85,6 +93,42 @@ class Database:
         """Devuelve el valor o 'Variable no existe'."""
         return self._store.get(var, "Variable no existe")
 
+    def rango(self, desde: str, hasta: Optional[str] = None) -> List[Tuple[str, str]]:
+        """Pares (clave, valor) con desde <= clave < hasta, ordenados por clave."""
+        store = self._store
+        return [(k, store[k]) for k in self._indice.rango(desde, hasta)]
+
+    def prefijo(self, prefijo: str) -> List[Tuple[str, str]]:
+        """Pares (clave, valor) cuyas claves empiezan con `prefijo`, ordenados."""
+        store = self._store
+        return [(k, store[k]) for k in self._indice.prefijo(prefijo)]
+
+    @staticmethod
+    def parse_action(action: str) -> Accion:
+        """Parsea SET-var-valor / ADD-var-valor / DEL-var a un registro Accion."""
+        parts = action.split("-", 2)
+        cmd = parts[0]
+        if cmd == "DEL" and len(parts) >= 2:
+            return Accion(OP_DEL, parts[1], "")
+        if cmd == "SET" and len(parts) >= 3:
+            return Accion(OP_SET, parts[1], parts[2])
+        if cmd == "ADD" and len(parts) >= 3:
+            return Accion(OP_ADD, parts[1], parts[2])
+        return NOP
+
+    def apply_record(self, rec: Accion) -> None:
+        """Aplica un registro ya parseado (camino rápido, sin partir strings)."""
+        op = rec.op
+        if op == OP_SET:
+            key = rec.key
+            if key not in self._store:
+                self._indice.agregar(key)
+            self._store[key] = rec.value
+        elif op == OP_ADD:
+            self.add(rec.key, rec.value)
+        elif op == OP_DEL:
+            self.delete(rec.key)
+
     def apply_action(self, action: str) -> None:
         """
         Aplica una acción tipo:
@@ -92,18 +136,4 @@ class Database:
             ADD-var-valor
             DEL-var
         """
-        parts = action.split("-", 2)
-        if not parts:
-            return
-
-        cmd = parts[0]
-        if cmd == "DEL" and len(parts) >= 2:
-            self.delete(parts[1])
-            return
-
-        if cmd in ("SET", "ADD") and len(parts) >= 3:
-            var, val = parts[1], parts[2]
-            if cmd == "SET":
-                self.set(var, val)
-            else:
-                self.add(var, val)
+        self.apply_record(self.parse_action(action))
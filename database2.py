@@ -8,49 +8,105 @@
 # Autor: Larry Andrés Uribe Araya
 # ------------------------------------------------------------------------------------
 
+from sys import intern
+
+from acciones import NOP, OP_ADD, OP_DEL, OP_SET, Accion
+from indice import IndiceOrdenado
+
+
 class Database:
     """Base de datos simplificada exclusiva para Raft."""
 
     def __init__(self):
         self.data = {}
+        self._indice = IndiceOrdenado()
+
+    def reindexar(self, previas: dict = None) -> None:
+        """
+        Pone el índice al día tras reemplazar `data` completo. Con `previas` (el
+        `data` que el índice reflejaba) solo se anotan las claves que aparecieron o
+        desaparecieron; sin él se reordena todo.
+        """
+        if previas is None:
+            self._indice = IndiceOrdenado(self.data)
+            return
+        nuevas, viejas = self.data.keys(), previas.keys()
+        for key in nuevas - viejas:
+            self._indice.agregar(key)
+        for key in viejas - nuevas:
+            self._indice.quitar(key)
+
+    def heredar_indice(self, previa: "Database") -> None:
+        """Toma el índice de `previa` (BD descartada tras reconstruir) y lo ajusta."""
+        self._indice = previa._indice
+        self.reindexar(previa.data)
 
     # -------------------------------------------------------------------------
-    def _normalize_key(self, key: str) -> str:
+    @staticmethod
+    def _normalize_key(key: str) -> str:
         """Normaliza claves reemplazando guiones bajos por espacios."""
         if not key:
             return key
         return key.replace("_", " ").strip()
 
     # -------------------------------------------------------------------------
-    def apply_action(self, action: str) -> None:
-        """Ejecuta una acción SET-, ADD- o DEL-."""
+    @classmethod
+    def parse_action(cls, action: str) -> Accion:
+        """
+        Parsea SET-/ADD-/DEL- una sola vez: operación en mayúsculas y clave normalizada.
+        Clave y valor se internan: el log de Raft guarda un registro por entrada y las
+        mismas claves (y a menudo los mismos valores) se repiten entre entradas.
+        """
         if not action or "-" not in action:
             # print(f"[DEBUG][DB] Acción inválida: '{action}'")
-            return
+            return NOP
 
         parts = action.split("-", 2)
         op = parts[0].strip().upper()
+        if op == "SET" and len(parts) == 3:
+            return Accion(OP_SET, intern(cls._normalize_key(parts[1])), intern(parts[2].strip()))
+        if op == "ADD" and len(parts) == 3:
+            return Accion(OP_ADD, intern(cls._normalize_key(parts[1])), intern(parts[2].strip()))
+        if op == "DEL" and len(parts) >= 2:
+            return Accion(OP_DEL, intern(cls._normalize_key(parts[1].strip())), "")
+        # print(f"[DEBUG][DB] Acción desconocida: {action}")
+        return NOP
+
+    # -------------------------------------------------------------------------
+    def apply_action(self, action: str) -> None:
+        """Ejecuta una acción SET-, ADD- o DEL-."""
+        self.apply_record(self.parse_action(action))
+
+    # -------------------------------------------------------------------------
+    def apply_record(self, rec: Accion) -> None:
+        """Ejecuta un registro ya parseado (camino rápido, sin partir strings)."""
+        op = rec.op
 
         # --- SET ---
-        if op == "SET" and len(parts) == 3:
-            key = self._normalize_key(parts[1])
-            value = parts[2].strip()
+        if op == OP_SET:
+            key = rec.key
+            value = rec.value
 
             # Limpieza previa si ya existe
             if key in self.data:
                 # print(f"[DEBUG][DB] Limpieza previa: removiendo valor anterior de {key}")
                 del self.data[key]
+            else:
+                self._indice.agregar(key)
 
             # print(f"[DEBUG][DB] SET {key} = '{value}'")
             self.data[key] = value
 
         # --- ADD ---
-        elif op == "ADD" and len(parts) == 3:
-            key = self._normalize_key(parts[1])
-            value = parts[2].strip()
+        elif op == OP_ADD:
+            key = rec.key
+            value = rec.value
 
             # Obtenemos el valor previo actual
-            prev = self.data.get(key, "")
+            prev = self.data.get(key)
+            if prev is None:
+                self._indice.agregar(key)
+                prev = ""
             # print(f"[DEBUG][DB] ADD detectado sobre '{key}' → previo='{prev}' nuevo='{value}'")
 
             # 🔧 FIX: Si el valor previo proviene de un SET posterior (no de una concatenación previa),
@@ -72,9 +128,8 @@ class Database:
             self.data[key] = new_val
 
         # --- DEL ---
-        elif op == "DEL" and len(parts) >= 2:
-            raw_key = parts[1].strip()
-            normalized = self._normalize_key(raw_key)
+        elif op == OP_DEL:
+            normalized = rec.key
             found = False
             for k in list(self.data.keys()):
                 nk = self._normalize_key(k)
@@ -85,13 +140,11 @@ class Database:
                 ):
                     # print(f"[DEBUG][DB] DEL {k}")
                     del self.data[k]
+                    self._indice.quitar(k)
                     found = True
                     break
             # if not found:
-                # print(f"[DEBUG][DB] DEL falló: {raw_key} no existe")
-
-        # else:
-            # print(f"[DEBUG][DB] Acción desconocida: {action}")
+                # print(f"[DEBUG][DB] DEL falló: {normalized} no existe")
 
     # -------------------------------------------------------------------------
     def log_value(self, var: str) -> str:
@@ -100,6 +153,18 @@ class Database:
         # print(f"[DEBUG][DB] GET {key} = '{val}'")
         return val
 
+    # -------------------------------------------------------------------------
+    def rango(self, desde: str, hasta: str = None) -> list:
+        """Pares (clave, valor) con desde <= clave < hasta ('_' se lee como espacio)."""
+        hasta = None if hasta is None else hasta.replace("_", " ")
+        data = self.data
+        return [(k, data[k]) for k in self._indice.rango(desde.replace("_", " "), hasta)]
+
+    def prefijo(self, prefijo: str) -> list:
+        """Pares (clave, valor) cuyas claves normalizadas empiezan con `prefijo`."""
+        data = self.data
+        return [(k, data[k]) for k in self._indice.prefijo(prefijo.replace("_", " "))]
+
     # -------------------------------------------------------------------------
     def snapshot(self) -> dict:
         # print(f"[DEBUG][DB] Snapshot: {self.data}")
@@ -0,0 +1,261 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Paxos y Raft)
+#
+# Archivo: diferencial.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+diferencial.py
+
+Arnés diferencial Paxos vs Raft. Una carga neutral (acciones de clientes, fallos,
+recuperaciones y lecturas) se traduce a la gramática de `casos_Paxos` y de
+`casos_Raft`, se ejecuta en ambos motores y se reporta, por motor:
+
+- eventos procesados por segundo,
+- rondas de consenso (Paxos: Prepare + Accept; Raft: Spread + elecciones),
+- copias de la base de datos (reconstrucciones desde cero) por acción comprometida.
+
+Si la carga lo permite (siempre hay mayoría activa y solo usa operaciones con la
+misma semántica en database1 y database2), se exige que ambos snapshot() coincidan.
+
+Formato de la carga neutral (una instrucción por línea, '#' para comentarios):
+    Nodos;A,B,C
+    Accion;SET-x-1
+    Falla;B
+    Recupera;B
+    Lectura;x
+
+Uso:
+    python diferencial.py carga.txt
+    python diferencial.py --aleatoria --acciones 2000 --semilla 3
+"""
+
+from __future__ import annotations
+import argparse
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from paxos import PaxosSimulator
+from raft import RaftSimulator
+
+Paso = Tuple[str, str]  # (Accion|Falla|Recupera|Lectura, argumento)
+
+
+@dataclass
+class Carga:
+    nodos: List[str]
+    pasos: List[Paso] = field(default_factory=list)
+
+    @classmethod
+    def desde_archivo(cls, path: str) -> "Carga":
+        carga = cls(nodos=[])
+        with open(path, "r", encoding="utf-8") as f:
+            for raw in f:
+                line = PaxosSimulator._clean(raw)
+                if not line:
+                    continue
+                cmd, _, arg = line.partition(";")
+                if cmd == "Nodos":
+                    carga.nodos = [x.strip() for x in arg.split(",") if x.strip()]
+                elif cmd in ("Accion", "Falla", "Recupera", "Lectura"):
+                    carga.pasos.append((cmd, arg.strip()))
+        return carga
+
+    @classmethod
+    def aleatoria(cls, rng: random.Random, nodos: int, acciones: int,
+                  prob_falla: float = 0.05) -> "Carga":
+        """Carga con una minoría de nodos caídos como máximo en todo momento."""
+        ids = [chr(ord("A") + i) for i in range(nodos)]
+        carga = cls(nodos=ids)
+        caidos: List[str] = []
+        for _ in range(acciones):
+            r = rng.random()
+            if r < prob_falla:
+                if caidos and rng.random() < 0.5:
+                    carga.pasos.append(("Recupera", caidos.pop(rng.randrange(len(caidos)))))
+                elif len(caidos) < (nodos - 1) // 2:
+                    nid = rng.choice([x for x in ids if x not in caidos])
+                    caidos.append(nid)
+                    carga.pasos.append(("Falla", nid))
+            elif r < 0.3:
+                carga.pasos.append(("Lectura", f"k{rng.randint(0, 9)}"))
+            else:
+                clave = f"k{rng.randint(0, 9)}"
+                op = rng.choice(("SET", "SET", "ADD", "DEL"))
+                if op == "DEL":
+                    carga.pasos.append(("Accion", f"DEL-{clave}"))
+                else:
+                    carga.pasos.append(("Accion", f"{op}-{clave}-{rng.randint(1, 99)}"))
+        return carga
+
+    # --------------------------- Análisis ---------------------------
+    def siempre_mayoria(self) -> bool:
+        caidos = set()
+        for cmd, arg in self.pasos:
+            if cmd == "Falla":
+                caidos.add(arg)
+            elif cmd == "Recupera":
+                caidos.discard(arg)
+            if len(self.nodos) - len(caidos) <= len(self.nodos) // 2:
+                return False
+        return True
+
+    def semantica_comun(self) -> bool:
+        """
+        database1 y database2 solo coinciden en SET/DEL sobre claves simples y en
+        ADD numérico (database2 normaliza '_' y concatena con espacio).
+        """
+        for cmd, arg in self.pasos:
+            if cmd != "Accion":
+                continue
+            parts = arg.split("-", 2)
+            clave = parts[1] if len(parts) > 1 else ""
+            if "_" in clave or clave != clave.strip() or clave != clave.lower():
+                return False
+            if parts[0] == "ADD" and not (len(parts) == 3 and parts[2].isdigit()):
+                return False
+            if parts[0] == "SET" and (len(parts) < 3 or parts[2] != parts[2].strip()):
+                return False
+        return True
+
+    # -------------------------- Traductores -------------------------
+    def a_paxos(self) -> List[str]:
+        lineas = [";".join(self.nodos), "P"]
+        n = 0
+        for cmd, arg in self.pasos:
+            if cmd == "Accion":
+                n += 1
+                lineas += [f"Prepare;P;{n}", f"Accept;P;{n};{arg}", "Learn"]
+            elif cmd == "Falla":
+                lineas.append(f"Stop;{arg}")
+            elif cmd == "Recupera":
+                lineas.append(f"Start;{arg}")
+            else:
+                lineas.append(f"Log;{arg}")
+        return lineas
+
+    def a_raft(self) -> List[str]:
+        lineas = [";".join(f"{nid},{i + 1}" for i, nid in enumerate(self.nodos))]
+        todos = f"Spread;[{','.join(self.nodos)}]"
+        for cmd, arg in self.pasos:
+            if cmd == "Accion":
+                lineas += [f"Send;{arg}", todos]
+            elif cmd == "Falla":
+                lineas.append(f"Stop;{arg}")
+            elif cmd == "Recupera":
+                lineas.append(f"Start;{arg}")
+            else:
+                lineas.append(f"Log;{arg}")
+        return lineas
+
+
+@dataclass
+class Medicion:
+    motor: str
+    eventos: int = 0
+    segundos: float = 0.0
+    rondas: int = 0
+    copias_bd: int = 0
+    comprometidas: int = 0
+    salida: List[str] = field(default_factory=list)
+    snapshot: Dict[str, str] = field(default_factory=dict)
+
+    def resumen(self) -> str:
+        eps = self.eventos / self.segundos if self.segundos else 0.0
+        por_accion = self.copias_bd / self.comprometidas if self.comprometidas else 0.0
+        rondas = self.rondas / self.comprometidas if self.comprometidas else 0.0
+        return (f"{self.motor:5s} | eventos/s: {eps:10.0f} | rondas/acción: {rondas:5.2f} | "
+                f"copias BD/acción: {por_accion:6.2f} | comprometidas: {self.comprometidas}")
+
+
+def ejecutar_paxos(lineas: List[str]) -> Medicion:
+    med = Medicion("Paxos", eventos=len(lineas) - 2)
+    sim = PaxosSimulator("")
+    inicio = time.perf_counter()
+    sim._parse_header(lineas[0], lineas[1])
+    db = sim.db
+    for line in lineas[2:]:
+        if line == "Learn" and sim.valor_elegido() is not None:
+            med.comprometidas += 1
+        elif line.startswith(("Prepare;", "Accept;")):
+            med.rondas += 1
+        sim._process_line(line)
+        # Misma medición que en Raft; Paxos aplica cada Learn sobre la misma BD
+        if sim.db is not db:
+            med.copias_bd += 1
+            db = sim.db
+    med.segundos = time.perf_counter() - inicio
+    med.salida, med.snapshot = sim.log_lines, sim.db.snapshot()
+    return med
+
+
+def ejecutar_raft(lineas: List[str]) -> Medicion:
+    med = Medicion("Raft", eventos=len(lineas) - 1)
+    sim = RaftSimulator("")
+    inicio = time.perf_counter()
+    sim._parse_header(lineas[0])
+    db, term = sim.db, sim.term
+    for line in lineas[1:]:
+        sim._process_line(line)
+        if sim.db is not db:
+            med.copias_bd += 1
+            db = sim.db
+        if line.startswith("Spread;"):
+            med.rondas += 1
+    sim._recompute_commit_and_apply()
+    med.segundos = time.perf_counter() - inicio
+    med.rondas += sim.term - term
+    med.comprometidas = sim.commit_index
+    med.salida, med.snapshot = sim.log_lines, sim.db.snapshot()
+    return med
+
+
+def comparar(carga: Carga) -> Tuple[Medicion, Medicion]:
+    """Ejecuta ambos motores y valida el acuerdo final cuando corresponde."""
+    paxos = ejecutar_paxos(carga.a_paxos())
+    raft = ejecutar_raft(carga.a_raft())
+    if carga.siempre_mayoria() and carga.semantica_comun():
+        assert paxos.snapshot == raft.snapshot, (
+            f"Snapshots distintos:\n  Paxos={paxos.snapshot}\n  Raft={raft.snapshot}"
+        )
+    return paxos, raft
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Arnés diferencial Paxos vs Raft")
+    parser.add_argument("carga", nargs="?", help="archivo de carga neutral")
+    parser.add_argument("--aleatoria", action="store_true")
+    parser.add_argument("--acciones", type=int, default=1000)
+    parser.add_argument("--nodos", type=int, default=5)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.carga:
+        carga = Carga.desde_archivo(args.carga)
+    elif args.aleatoria:
+        carga = Carga.aleatoria(random.Random(args.semilla), args.nodos, args.acciones)
+    else:
+        parser.error("indica un archivo de carga o --aleatoria")
+
+    try:
+        paxos, raft = comparar(carga)
+    except AssertionError as e:
+        print(f"❌ {e}")
+        return 1
+    print(paxos.resumen())
+    print(raft.resumen())
+    if carga.siempre_mayoria() and carga.semantica_comun():
+        print("✅ Ambos motores terminan con la misma base de datos")
+    else:
+        print("ℹ️  La carga no permite exigir acuerdo entre motores")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,204 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Paxos y Raft)
+#
+# Archivo: digestos.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+digestos.py
+
+Verificación por digesto, sin escribir ni releer archivos de logs:
+
+- LOGS: sha256 en streaming de las líneas en orden. `DigestoLogs` reemplaza a
+  `sim.log_lines` durante la corrida: cada append actualiza el hash y no se guarda
+  la línea.
+- BASE DE DATOS: digesto independiente del orden, como la comparación por conjunto
+  de `verificar_tests`: suma (mod 2^128) del blake2b de cada línea distinta, más la
+  cantidad de líneas.
+
+Ambos lados se normalizan igual que `ejecutar_tests.leer_archivo` (strip, sin
+líneas vacías) y las secciones vacías cuentan como "No hubo logs" / "No hay datos".
+Los digestos de referencia viven en `logs_esperados/digestos.json`; si no coinciden,
+los runners vuelven al diff completo.
+
+Uso:
+    python digestos.py --generar           # recalcula logs_esperados/digestos.json
+    python digestos.py Raft casos_Raft/test_01.txt
+"""
+
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, Iterator, Optional
+
+DORADOS = os.path.join("logs_esperados", "digestos.json")
+SECCION_LOGS = "LOGS"
+SECCION_BD = "BASE DE DATOS"
+SIN_LOGS = "No hubo logs"
+SIN_DATOS = "No hay datos"
+_MOD = 1 << 128
+
+Digesto = Dict[str, str]  # {"logs": ..., "bd": ...}
+
+
+class DigestoLogs:
+    """Sumidero de líneas de Log: hashea en orden sin guardarlas (salvo la última)."""
+
+    __slots__ = ("_hash", "_n", "_ultima")
+
+    def __init__(self) -> None:
+        self._hash = hashlib.sha256()
+        self._n = 0
+        self._ultima: Optional[str] = None
+
+    def append(self, linea: str) -> None:
+        linea = linea.strip()
+        if linea:
+            self._hash.update(linea.encode("utf-8"))
+            self._hash.update(b"\n")
+            self._n += 1
+            self._ultima = linea
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i: int) -> str:
+        # step() solo consulta la última línea producida
+        if i != -1 or self._ultima is None:
+            raise IndexError("DigestoLogs solo conserva la última línea")
+        return self._ultima
+
+    def hexdigest(self) -> str:
+        if not self._n:
+            vacio = DigestoLogs()
+            vacio.append(SIN_LOGS)
+            return vacio._hash.hexdigest()
+        return self._hash.hexdigest()
+
+
+class DigestoBD:
+    """Digesto de conjunto: no depende del orden de las líneas."""
+
+    __slots__ = ("_vistas", "_suma")
+
+    def __init__(self) -> None:
+        self._vistas: set = set()
+        self._suma = 0
+
+    def agregar(self, linea: str) -> None:
+        linea = linea.strip()
+        if linea and linea not in self._vistas:
+            self._vistas.add(linea)
+            h = hashlib.blake2b(linea.encode("utf-8"), digest_size=16).digest()
+            self._suma = (self._suma + int.from_bytes(h, "big")) % _MOD
+
+    def hexdigest(self) -> str:
+        if not self._vistas:
+            vacio = DigestoBD()
+            vacio.agregar(SIN_DATOS)
+            return vacio.hexdigest()
+        return f"{len(self._vistas)}:{self._suma:032x}"
+
+
+def digesto_bd(estado: Dict[str, str]) -> str:
+    d = DigestoBD()
+    for clave, valor in estado.items():
+        d.agregar(f"{clave}={valor}")
+    return d.hexdigest()
+
+
+def resumen(salida: Iterable[str], estado: Dict[str, str]) -> Digesto:
+    """Digestos de una corrida (salida = DigestoLogs o lista de líneas)."""
+    if isinstance(salida, DigestoLogs):
+        logs = salida
+    else:
+        logs = DigestoLogs()
+        for linea in salida:
+            logs.append(linea)
+    return {"logs": logs.hexdigest(), "bd": digesto_bd(estado)}
+
+
+def _lineas(path: str) -> Iterator[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        for x in f:
+            x = x.strip()
+            if x:
+                yield x
+
+
+def digerir_archivo(path: str) -> Digesto:
+    """Digestos de un archivo de logs ya escrito (leído en streaming)."""
+    logs, bd = DigestoLogs(), DigestoBD()
+    seccion = None
+    for linea in _lineas(path):
+        if seccion is None and linea == SECCION_LOGS:
+            seccion = logs
+        elif seccion is not bd and linea == SECCION_BD:
+            seccion = bd
+        elif seccion is logs and linea != SIN_LOGS:
+            logs.append(linea)
+        elif seccion is bd and linea != SIN_DATOS:
+            bd.agregar(linea)
+    return {"logs": logs.hexdigest(), "bd": bd.hexdigest()}
+
+
+def cargar_dorados(path: str = DORADOS) -> Dict[str, Digesto]:
+    """Digestos de referencia por nombre de archivo ({} si no hay archivo)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def generar_dorados(directorio: str = "logs_esperados", path: str = DORADOS) -> Dict[str, Digesto]:
+    dorados = {
+        nombre: digerir_archivo(os.path.join(directorio, nombre))
+        for nombre in sorted(os.listdir(directorio)) if nombre.endswith(".txt")
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dorados, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return dorados
+
+
+def digerir_corrida(modo: str, path: str) -> Digesto:
+    """Corre el caso en este proceso y retorna sus digestos (sin escribir logs)."""
+    from paxos import PaxosSimulator
+    from raft import RaftSimulator
+
+    sim = PaxosSimulator(path) if modo == "Paxos" else RaftSimulator(path)
+    sim.log_lines = DigestoLogs()
+    salida, estado = sim.run()
+    return resumen(salida, estado)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Digestos de LOGS y BASE DE DATOS")
+    parser.add_argument("modo", nargs="?", choices=("Paxos", "Raft"))
+    parser.add_argument("caso", nargs="?")
+    parser.add_argument("--generar", action="store_true",
+                        help=f"recalcula {DORADOS} desde logs_esperados/")
+    args = parser.parse_args()
+
+    if args.generar:
+        print(f"{len(generar_dorados())} digestos escritos en {DORADOS}")
+        return 0
+    if not args.caso:
+        parser.error("indica modo y caso, o --generar")
+    obtenido = digerir_corrida(args.modo, args.caso)
+    esperado = cargar_dorados().get(f"{args.modo}_{os.path.basename(args.caso)}")
+    print(json.dumps(obtenido))
+    if esperado is not None:
+        print("coincide" if esperado == obtenido else "NO coincide")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,19 +1,43 @@
 import subprocess
+import json
 import os
+import sys
+
+from cache_resultados import (Hasher, ResultCache, digesto_con_cache, ejecutar_con_cache,
+                              fuentes_de, vigilar)
+from digestos import cargar_dorados
 
 COMANDO_PYTHON = "python"
 
 
 def ejecutar_tests(modo, ruta_entrada, mostrar_prints, tiempo_maximo):
     if mostrar_prints:
-        subprocess.run([COMANDO_PYTHON, "main.py", modo, ruta_entrada], timeout=tiempo_maximo)
+        return subprocess.run(
+            [COMANDO_PYTHON, "main.py", modo, ruta_entrada], timeout=tiempo_maximo
+        ).returncode
     else:
-        subprocess.run(
+        return subprocess.run(
             [COMANDO_PYTHON, "main.py", modo, ruta_entrada],
             timeout=tiempo_maximo,
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
+        ).returncode
+
+
+def digesto_de(modo, ruta_entrada, tiempo_maximo):
+    """Corre main.py --digest (sin escribir logs/); None si falla o excede el tiempo."""
+    try:
+        resultado = subprocess.run(
+            [COMANDO_PYTHON, "main.py", modo, ruta_entrada, "--digest"],
+            timeout=tiempo_maximo,
+            capture_output=True,
+            text=True,
         )
+        if resultado.returncode:
+            return None
+        return json.loads(resultado.stdout.strip().splitlines()[-1])
+    except (subprocess.TimeoutExpired, ValueError, IndexError):
+        return None
 
 
 def leer_archivo(ruta):
@@ -72,26 +96,56 @@ def verificar_tests(modo, test):
     print("")
 
 
+def correr_casos(casos, mostrar_prints, cache=None, hasher=None, dorados=None):
+    fuentes = {modo: fuentes_de(modo) for modo in {m for m, _ in casos}}
+    for modo, ruta in casos:
+        test = os.path.basename(ruta)
+        dorado = (dorados or {}).get(f"{modo}_{test}")
+        if dorado is not None:
+            def calcular(modo, ruta):
+                return digesto_de(modo, ruta, tiempo_maximo=1)
+
+            # Con caché, el digesto de un caso sin cambios no vuelve a correr main.py
+            digesto = (calcular(modo, ruta) if cache is None else
+                       digesto_con_cache(modo, ruta, calcular, cache, hasher, fuentes[modo]))
+            if digesto == dorado:
+                print(f"Verificando {modo} -- {test}... ✅ digesto coincide")
+                continue
+
+        def correr(modo, ruta):
+            return ejecutar_tests(
+                modo=modo,
+                ruta_entrada=ruta,
+                mostrar_prints=mostrar_prints,
+                tiempo_maximo=1,
+            )
+
+        if cache is None:
+            correr(modo, ruta)
+        else:
+            ejecutar_con_cache(modo, ruta, correr, cache, hasher, fuentes[modo])
+        # Sin digesto de referencia o si no coincide: diff completo
+        verificar_tests(modo=modo, test=test)
+
+
 if __name__ == "__main__":
+    # --sin-cache: corre todo siempre; --watch: vuelve a correr lo afectado al cambiar
+    # --digest: compara digestos contra logs_esperados/digestos.json antes del diff
+    usar_cache = "--sin-cache" not in sys.argv
+    dorados = cargar_dorados() if "--digest" in sys.argv else None
     tests_paxos = [x for x in os.listdir("casos_Paxos") if x.endswith(".txt")]
     tests_raft = [x for x in os.listdir("casos_Raft") if x.endswith(".txt")]
+    casos = [("Paxos", os.path.join("casos_Paxos", t)) for t in tests_paxos]
+    casos += [("Raft", os.path.join("casos_Raft", t)) for t in tests_raft]
 
     mostrar_prints = True
-    for test in tests_paxos:
-        ejecutar_tests(
-            modo="Paxos",
-            ruta_entrada=os.path.join("casos_Paxos", test),
-            mostrar_prints=mostrar_prints,
-            tiempo_maximo=1,
-        )
-        verificar_tests(modo="Paxos", test=test)
-
-    for test in tests_raft:
-        ejecutar_tests(
-            modo="Raft",
-            ruta_entrada=os.path.join("casos_Raft", test),
-            mostrar_prints=mostrar_prints,
-            tiempo_maximo=1,
-        )
-        verificar_tests(modo="Raft", test=test)
+    cache = ResultCache() if usar_cache else None
+    hasher = Hasher()
+    correr_casos(casos, mostrar_prints, cache, hasher, dorados)
+    if cache is not None:
+        print(f"Caché: {cache.aciertos} aciertos, {cache.fallos} ejecutados")
     print("¡Tests finalizados!")
+
+    if "--watch" in sys.argv:
+        vigilar(casos, lambda afectados: correr_casos(afectados, mostrar_prints, cache, hasher,
+                                                      dorados))
@@ -0,0 +1,362 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Paxos)
+#
+# Archivo: epaxos.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+epaxos.py
+
+Modo sin líder al estilo EPaxos. Dos acciones interfieren solo si tocan la misma
+clave (según `Database.parse_action` de database1); el resto conmuta.
+
+- Cada comando lo lidera una réplica (round-robin entre las activas) y se envía
+  PreAccept a todas. Cada réplica responde con sus atributos (seq, deps) calculados
+  con los comandos de esa clave que ya conoce.
+- Si las primeras `F + ⌊(F+1)/2⌋` respuestas (incluido el líder) coinciden con los
+  atributos del líder, el comando se compromete en una ronda (camino rápido).
+- Si no (comandos concurrentes sobre la misma clave llegaron en distinto orden a
+  distintas réplicas), se unen deps, se toma el seq máximo y se hace una ronda
+  Accept con mayoría clásica (camino lento).
+- La ejecución ordena el grafo de dependencias: componentes fuertemente conexas
+  (Tarjan) en orden topológico y, dentro de cada una, por (seq, instancia).
+
+Los comandos propuestos entre dos `ronda()` son concurrentes. Con el formato de
+`casos_Paxos`, cada `Accept;P;n;acción` propone la acción (sin Prepare, que se
+ignora) y cada `Learn` cierra la ronda.
+
+Uso:
+    python epaxos.py casos_Paxos/test_01.txt
+    python epaxos.py --bench --comandos 5000 --claves 100 --zipf 1.2 --concurrencia 8
+"""
+
+from __future__ import annotations
+import argparse
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from acciones import OP_NOP, Accion
+from database1 import Database
+
+Instancia = Tuple[str, int]  # (réplica líder, número de instancia)
+
+
+@dataclass
+class Comando:
+    inst: Instancia
+    accion: str
+    rec: Accion
+    seq: int = 0
+    deps: Set[Instancia] = field(default_factory=set)
+    rapido: bool = False
+    ejecutado: bool = False
+
+
+@dataclass
+class _Replica:
+    activa: bool = True
+    # clave → (líder → mayor instancia conocida); clave → mayor seq conocido
+    ultimas: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    seqs: Dict[str, int] = field(default_factory=dict)
+
+    def atributos(self, rec: Accion, inst: Instancia) -> Tuple[int, Set[Instancia]]:
+        if rec.op == OP_NOP:
+            return 0, set()
+        ultimas = self.ultimas.get(rec.key, {})
+        deps = {(lid, n) for lid, n in ultimas.items() if (lid, n) != inst}
+        return self.seqs.get(rec.key, 0) + 1, deps
+
+    def registrar(self, rec: Accion, inst: Instancia, seq: int) -> None:
+        if rec.op == OP_NOP:
+            return
+        ultimas = self.ultimas.setdefault(rec.key, {})
+        lid, n = inst
+        if n > ultimas.get(lid, -1):
+            ultimas[lid] = n
+        if seq > self.seqs.get(rec.key, 0):
+            self.seqs[rec.key] = seq
+
+
+class EPaxos:
+    """Réplicas EPaxos simuladas con latencias aleatorias por mensaje."""
+
+    def __init__(self, replicas: Sequence[str], seed: int = 0,
+                 latencia: Tuple[float, float] = (1.0, 10.0)) -> None:
+        self.replicas: Dict[str, _Replica] = {rid: _Replica() for rid in replicas}
+        self.n = len(self.replicas)
+        f = (self.n - 1) // 2
+        self.quorum_rapido = max(1, f + (f + 1) // 2)
+        self.quorum_lento = f + 1
+        self.latencia = latencia
+        self.rng = random.Random(seed)
+        self.db = Database()
+        self.cmds: Dict[Instancia, Comando] = {}
+        self._proximo: Dict[str, int] = {rid: 0 for rid in replicas}
+        self._turno = 0
+        self.pendientes: List[str] = []
+        self.rapidos = 0
+        self.lentos = 0
+        self.tiempo = 0.0  # ms simulados acumulados
+
+    # ----------------------- Cliente -----------------------
+    def proponer(self, accion: str) -> None:
+        self.pendientes.append(accion)
+
+    def detener(self, rid: str) -> None:
+        if rid in self.replicas:
+            self.replicas[rid].activa = False
+
+    def reanudar(self, rid: str) -> None:
+        if rid in self.replicas:
+            self.replicas[rid].activa = True
+
+    # ----------------------- Protocolo -----------------------
+    def _rtt(self) -> float:
+        return self.rng.uniform(*self.latencia) + self.rng.uniform(*self.latencia)
+
+    def ronda(self) -> int:
+        """Compromete y ejecuta los comandos pendientes (concurrentes); retorna cuántos."""
+        activas = [rid for rid, r in self.replicas.items() if r.activa]
+        if len(activas) < self.quorum_lento or not self.pendientes:
+            return 0
+
+        # Cada comando a un líder; PreAccept llega a cada réplica con su retardo
+        nuevos: List[Comando] = []
+        llegadas: List[Tuple[float, int, str]] = []
+        for accion in self.pendientes:
+            lid = activas[self._turno % len(activas)]
+            self._turno += 1
+            inst = (lid, self._proximo[lid])
+            self._proximo[lid] += 1
+            k = len(nuevos)
+            nuevos.append(Comando(inst, accion, Database.parse_action(accion)))
+            for rid in activas:
+                t = 0.0 if rid == lid else self.rng.uniform(*self.latencia)
+                llegadas.append((t, k, rid))
+        self.pendientes = []
+
+        # Atributos del líder (t=0) y respuesta de cada réplica en orden de llegada
+        respuestas: List[List[Tuple[float, int, Set[Instancia]]]] = [[] for _ in nuevos]
+        for t, k, rid in sorted(llegadas):
+            cmd = nuevos[k]
+            rep = self.replicas[rid]
+            seq, deps = rep.atributos(cmd.rec, cmd.inst)
+            if rid == cmd.inst[0]:
+                cmd.seq, cmd.deps = seq, deps
+            else:
+                seq, deps = max(seq, cmd.seq), deps | cmd.deps
+                respuestas[k].append((t + self.rng.uniform(*self.latencia), seq, deps))
+            rep.registrar(cmd.rec, cmd.inst, seq)
+
+        duracion = 0.0
+        for cmd, resp in zip(nuevos, respuestas):
+            resp.sort(key=lambda r: r[0])
+            if len(resp) + 1 >= self.quorum_rapido:
+                quorum = resp[:self.quorum_rapido - 1]
+                cmd.rapido = all(s == cmd.seq and d == cmd.deps for _, s, d in quorum)
+            else:
+                quorum = resp[:self.quorum_lento - 1]
+            fin = quorum[-1][0] if quorum else 0.0
+            if not cmd.rapido:
+                # Camino lento: unión de atributos y Accept con mayoría clásica
+                for _, s, d in quorum:
+                    cmd.seq = max(cmd.seq, s)
+                    cmd.deps |= d
+                rtts = sorted(self._rtt() for _ in range(len(activas) - 1))
+                fin += rtts[self.quorum_lento - 2] if self.quorum_lento > 1 else 0.0
+            duracion = max(duracion, fin)
+            self.rapidos += cmd.rapido
+            self.lentos += not cmd.rapido
+            self.cmds[cmd.inst] = cmd
+            # Commit: todas las réplicas conocen los atributos finales
+            for rep in self.replicas.values():
+                rep.registrar(cmd.rec, cmd.inst, cmd.seq)
+
+        self.tiempo += duracion
+        self._ejecutar(nuevos)
+        return len(nuevos)
+
+    def _ejecutar(self, nuevos: List[Comando]) -> None:
+        """Tarjan sobre deps no ejecutadas; cada componente en orden (seq, instancia)."""
+        indice: Dict[Instancia, int] = {}
+        bajo: Dict[Instancia, int] = {}
+        pila: List[Instancia] = []
+        en_pila: Set[Instancia] = set()
+        contador = 0
+
+        for raiz in (c.inst for c in nuevos):
+            if raiz in indice or self.cmds[raiz].ejecutado:
+                continue
+            # DFS iterativo: (nodo, iterador de deps)
+            trabajo = [(raiz, iter(sorted(self.cmds[raiz].deps)))]
+            indice[raiz] = bajo[raiz] = contador
+            contador += 1
+            pila.append(raiz)
+            en_pila.add(raiz)
+            while trabajo:
+                v, deps = trabajo[-1]
+                avanzo = False
+                for w in deps:
+                    cw = self.cmds.get(w)
+                    if cw is None or cw.ejecutado:
+                        continue
+                    if w not in indice:
+                        indice[w] = bajo[w] = contador
+                        contador += 1
+                        pila.append(w)
+                        en_pila.add(w)
+                        trabajo.append((w, iter(sorted(cw.deps))))
+                        avanzo = True
+                        break
+                    if w in en_pila:
+                        bajo[v] = min(bajo[v], indice[w])
+                if avanzo:
+                    continue
+                trabajo.pop()
+                if trabajo:
+                    u = trabajo[-1][0]
+                    bajo[u] = min(bajo[u], bajo[v])
+                if bajo[v] == indice[v]:
+                    componente = []
+                    while True:
+                        w = pila.pop()
+                        en_pila.discard(w)
+                        componente.append(self.cmds[w])
+                        if w == v:
+                            break
+                    for cmd in sorted(componente, key=lambda c: (c.seq, c.inst)):
+                        self.db.apply_record(cmd.rec)
+                        cmd.ejecutado = True
+
+    def tasa_rapida(self) -> float:
+        total = self.rapidos + self.lentos
+        return self.rapidos / total if total else 0.0
+
+
+# ------------------------------------------------------------------------------------
+# Escenarios con el formato de casos_Paxos
+# ------------------------------------------------------------------------------------
+class EPaxosSimulator:
+    """Ejecuta un escenario de casos_Paxos en modo sin líder."""
+
+    def __init__(self, path: str, seed: int = 0) -> None:
+        self.path = path
+        self.seed = seed
+        self.log_lines: List[str] = []
+        self.epaxos: Optional[EPaxos] = None
+
+    def run(self) -> Tuple[List[str], Dict[str, str]]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            lines = [x.split("#", 1)[0].strip() for x in f]
+        lines = [x for x in lines if x]
+        if not lines:
+            return self.log_lines, {}
+        ids = [x.strip() for x in lines[0].split(";") if x.strip()]
+        ep = self.epaxos = EPaxos(ids, self.seed)
+        for line in lines[2:]:
+            parts = line.split(";")
+            cmd = parts[0]
+            if cmd == "Accept" and len(parts) >= 4:
+                ep.proponer(";".join(parts[3:]))
+            elif cmd == "Learn":
+                ep.ronda()
+            elif cmd == "Log" and len(parts) == 2:
+                self.log_lines.append(f"{parts[1]}={ep.db.log_value(parts[1])}")
+            elif cmd == "Start" and len(parts) == 2:
+                ep.reanudar(parts[1])
+            elif cmd == "Stop" and len(parts) == 2:
+                ep.detener(parts[1])
+        return self.log_lines, ep.db.snapshot()
+
+
+# ------------------------------------------------------------------------------------
+# Benchmark: camino rápido y throughput vs Paxos clásico, claves sesgadas (Zipf)
+# ------------------------------------------------------------------------------------
+def carga_zipf(comandos: int, claves: int, s: float, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    acumulado, total = [], 0.0
+    for i in range(claves):
+        total += 1.0 / (i + 1) ** s
+        acumulado.append(total)
+    nombres = rng.choices(range(claves), cum_weights=acumulado, k=comandos)
+    return [f"SET-k{c}-{i}" if i % 3 else f"ADD-k{c}-{i}" for i, c in enumerate(nombres)]
+
+
+def paxos_clasico(acciones: List[str], replicas: Sequence[str], seed: int = 0
+                  ) -> Tuple[float, float, Dict[str, str]]:
+    """Paxos del curso: Prepare + Accept + Learn por acción. Retorna (s, ms, BD)."""
+    from paxos import PaxosSimulator
+
+    sim = PaxosSimulator.from_cluster(replicas, ["P"])
+    rng = random.Random(seed)
+    lat = (1.0, 10.0)
+    mayoria = len(replicas) // 2 + 1
+    ms = 0.0
+    inicio = time.perf_counter()
+    for n, accion in enumerate(acciones, start=1):
+        sim.step(("Prepare", "P", n))
+        sim.step(("Accept", "P", n, accion))
+        sim.step(("Learn",))
+        for _ in range(2):  # dos rondas con mayoría, una tras otra
+            rtts = sorted(rng.uniform(*lat) + rng.uniform(*lat) for _ in replicas[1:])
+            ms += rtts[mayoria - 2] if mayoria > 1 else 0.0
+    return time.perf_counter() - inicio, ms, sim.snapshot()
+
+
+def benchmark(comandos: int, claves: int, zipfs: Sequence[float],
+              concurrencias: Sequence[int], n: int = 5) -> None:
+    replicas = [chr(ord("A") + i) for i in range(n)]
+    print(f"{'zipf':>5} {'conc':>5} | {'rápido':>7} | {'EPaxos cmd/s':>12} "
+          f"{'Paxos cmd/s':>11} | {'EPaxos cmd/ms sim':>17} {'Paxos cmd/ms sim':>16}")
+    for s in zipfs:
+        acciones = carga_zipf(comandos, claves, s)
+        t_px, ms_px, _ = paxos_clasico(acciones, replicas)
+        for c in concurrencias:
+            ep = EPaxos(replicas)
+            inicio = time.perf_counter()
+            for i in range(0, len(acciones), c):
+                for accion in acciones[i:i + c]:
+                    ep.proponer(accion)
+                ep.ronda()
+            t_ep = time.perf_counter() - inicio
+            print(f"{s:5.2f} {c:5d} | {100 * ep.tasa_rapida():6.1f}% | "
+                  f"{comandos / t_ep:12.0f} {comandos / t_px:11.0f} | "
+                  f"{comandos / ep.tiempo:17.3f} {comandos / ms_px:16.3f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Camino rápido sin líder (EPaxos)")
+    parser.add_argument("caso", nargs="?")
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--comandos", type=int, default=5000)
+    parser.add_argument("--claves", type=int, default=100)
+    parser.add_argument("--zipf", default="0.5,1.0,1.5")
+    parser.add_argument("--concurrencia", default="1,4,16")
+    parser.add_argument("--replicas", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark(args.comandos, args.claves, [float(x) for x in args.zipf.split(",")],
+                  [int(x) for x in args.concurrencia.split(",")], args.replicas)
+        return 0
+    if not args.caso:
+        parser.error("indica un caso o --bench")
+    sim = EPaxosSimulator(args.caso)
+    salida, estado = sim.run()
+    print("LOGS")
+    print("\n".join(salida) if salida else "No hubo logs")
+    print("BASE DE DATOS")
+    print("\n".join(f"{k}={v}" for k, v in estado.items()) if estado else "No hay datos")
+    if sim.epaxos is not None:
+        print(f"# camino rápido: {sim.epaxos.rapidos}, lento: {sim.epaxos.lentos}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,236 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Paxos y Raft)
+#
+# Archivo: escenario.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+escenario.py
+
+Lectura perezosa de escenarios con bloques de repetición, común a Paxos y Raft.
+
+    Repeat;N[;var]
+        <líneas>
+    End
+
+repite el cuerpo N veces; dentro del cuerpo `{var}` (por defecto `{i}`) se
+reemplaza por el índice de la vuelta, desde 0. Se admiten `{i+c}`, `{i*c}` y
+`{i%c}` con c entero (p. ej. `Send;SET-k{i%1000}-{i}` recorre 1000 claves). Los
+bloques se pueden anidar usando nombres de variable distintos.
+
+La expansión es un generador: solo se guarda en memoria el cuerpo de los bloques
+(tan largo como el archivo), nunca las líneas expandidas, así que un archivo de
+diez líneas puede generar diez millones de eventos con memoria constante.
+
+Un `Repeat` con N inválido no produce líneas, un `End` suelto se ignora y un
+bloque sin `End` se cierra al final del archivo.
+
+Uso (benchmark):
+    python escenario.py --eventos 2000000 --modo Raft
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+from itertools import islice
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Set, Tuple, Union
+
+_VARIABLE = re.compile(r"\{([A-Za-z_]\w*)(?:([+*%])(-?\d+))?\}")
+
+Getter = Callable[[Dict[str, int]], int]
+# Nodo del árbol: línea constante (str), plantilla (formato, getters) o
+# bloque (n, variable, cuerpo)
+Nodo = Union[str, Tuple[str, List[Getter]], Tuple[int, str, list]]
+
+
+def _getter(var: str, op: str, c: int) -> Getter:
+    if op == "+":
+        return lambda e: e[var] + c
+    if op == "*":
+        return lambda e: e[var] * c
+    if op == "%" and c:
+        return lambda e: e[var] % c
+    return lambda e: e[var]
+
+
+def _compilar(linea: str, variables: Set[str]) -> Nodo:
+    """
+    Pasa la línea a un formato de str.format más una función por variable. Las
+    variables que no son de un bloque envolvente quedan como texto literal.
+    """
+    formato: List[str] = []
+    getters: List[Getter] = []
+    pos = 0
+    for m in _VARIABLE.finditer(linea):
+        if m.group(1) not in variables:
+            continue
+        formato.append(linea[pos:m.start()].replace("{", "{{").replace("}", "}}") + "{}")
+        getters.append(_getter(m.group(1), m.group(2) or "", int(m.group(3) or 0)))
+        pos = m.end()
+    if not getters:
+        return linea
+    formato.append(linea[pos:].replace("{", "{{").replace("}", "}}"))
+    return "".join(formato), getters
+
+
+def _repeat(linea: str) -> Tuple[int, str]:
+    partes = [p.strip() for p in linea.split(";")]
+    try:
+        n = max(0, int(partes[1]))
+    except (IndexError, ValueError):
+        n = 0
+    var = partes[2] if len(partes) > 2 and partes[2] else "i"
+    return n, var
+
+
+def _es_repeat(linea: str) -> bool:
+    return linea.startswith("Repeat;")
+
+
+def _leer_bloque(lineas: Iterator[str], variables: Set[str]) -> list:
+    """Lee el cuerpo de un bloque hasta su `End` (consume el `End`)."""
+    cuerpo: list = []
+    for linea in lineas:
+        if linea == "End":
+            break
+        if _es_repeat(linea):
+            n, var = _repeat(linea)
+            cuerpo.append((n, var, _leer_bloque(lineas, variables | {var})))
+        else:
+            cuerpo.append(_compilar(linea, variables))
+    return cuerpo
+
+
+def _expandir(n: int, var: str, cuerpo: list, entorno: Dict[str, int]) -> Iterator[str]:
+    previo = entorno.get(var)
+    for i in range(n):
+        entorno[var] = i
+        for nodo in cuerpo:
+            if nodo.__class__ is str:
+                yield nodo
+            elif len(nodo) == 2:
+                formato, getters = nodo
+                yield formato.format(*[g(entorno) for g in getters])
+            else:
+                yield from _expandir(*nodo, entorno)
+    if previo is None:
+        entorno.pop(var, None)
+    else:
+        entorno[var] = previo
+
+
+def expandir(lineas: Iterable[str], limpiar: Callable[[str], str]) -> Iterator[str]:
+    """
+    Limpia (`limpiar`) y descarta líneas vacías; expande los bloques `Repeat`.
+    Las líneas fuera de bloques pasan tal cual.
+    """
+    limpias = (x for x in map(limpiar, lineas) if x)
+    for linea in limpias:
+        if _es_repeat(linea):
+            n, var = _repeat(linea)
+            yield from _expandir(n, var, _leer_bloque(limpias, {var}), {})
+        elif linea != "End":
+            yield linea
+
+
+def _limpias(f: BinaryIO, limpiar: Callable[[str], str]) -> Iterator[str]:
+    # readline (no iteración) para que f.tell() marque el byte siguiente a la línea
+    while True:
+        raw = f.readline()
+        if not raw:
+            return
+        linea = limpiar(raw.decode("utf-8"))
+        if linea:
+            yield linea
+
+
+def expandir_archivo(f: BinaryIO, limpiar: Callable[[str], str],
+                     saltar: int = 0) -> Iterator[Tuple[str, int, int]]:
+    """
+    Como `expandir`, sobre un archivo binario posicionado con seek. Produce
+    (línea, offset, k): `offset` es el byte donde empieza el elemento de primer
+    nivel (línea suelta o bloque Repeat) que generó la línea y `k` cuántas líneas
+    de ese elemento salieron antes. Para reanudar tras (línea, offset, k):
+    `f.seek(offset)` y `saltar=k + 1` (se descartan sin procesar las k + 1 primeras
+    líneas de ese elemento).
+    """
+    lineas = _limpias(f, limpiar)
+    while True:
+        inicio = f.tell()
+        linea = next(lineas, None)
+        if linea is None:
+            return
+        if _es_repeat(linea):
+            n, var = _repeat(linea)
+            salida: Iterator[str] = _expandir(n, var, _leer_bloque(lineas, {var}), {})
+        elif linea == "End":
+            continue
+        else:
+            salida = iter((linea,))
+        for k, x in enumerate(islice(salida, saltar, None), saltar):
+            yield x, inicio, k
+        saltar = 0
+
+
+# ------------------------------------------------------------------------------------
+# Benchmark: escenario expandido vs archivo plano
+# ------------------------------------------------------------------------------------
+def _escenarios(modo: str, eventos: int) -> Tuple[str, str]:
+    if modo == "Paxos":
+        cabecera = "A;B;C\nP1;P2\n"
+        cuerpo = ["Prepare;P1;{i+1}", "Accept;P1;{i+1};SET-k{i%1000}-{i}", "Learn"]
+    else:
+        cabecera = "A,1;B,2;C,3\n"
+        cuerpo = ["Send;SET-k{i%1000}-{i}", "Spread;[A,B,C]"]
+    vueltas = eventos // len(cuerpo)
+    compacto = cabecera + f"Repeat;{vueltas}\n" + "\n".join(cuerpo) + "\nEnd\nLog;k1\n"
+    plano = cabecera + "\n".join(expandir(compacto.splitlines()[cabecera.count("\n"):],
+                                           str.strip)) + "\n"
+    return compacto, plano
+
+
+def _correr(modo: str, contenido: str) -> Tuple[float, int, List[str]]:
+    from paxos import PaxosSimulator
+    from raft import RaftSimulator
+
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False,
+                                     encoding="utf-8") as f:
+        f.write(contenido)
+    try:
+        sim = PaxosSimulator(f.name) if modo == "Paxos" else RaftSimulator(f.name)
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        salida, _ = sim.run()
+        t = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        os.remove(f.name)
+    return t, pico, salida
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Escenarios con Repeat (expansión perezosa)")
+    parser.add_argument("--eventos", type=int, default=200_000)
+    parser.add_argument("--modo", choices=("Paxos", "Raft"), default="Paxos")
+    args = parser.parse_args()
+
+    compacto, plano = _escenarios(args.modo, args.eventos)
+    print(f"archivo compacto: {len(compacto):,} bytes | plano: {len(plano):,} bytes")
+    for nombre, contenido in (("compacto", compacto), ("plano", plano)):
+        t, pico, salida = _correr(args.modo, contenido)
+        print(f"{nombre:>8} | {t:6.2f}s | {args.eventos / t:10.0f} eventos/s | "
+              f"pico {pico / 2**20:7.1f} MiB | {salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
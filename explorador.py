@@ -0,0 +1,288 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Paxos y Raft)
+#
+# Archivo: explorador.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+explorador.py
+
+Exploración exhaustiva acotada (model checking) sobre clusters pequeños.
+Recorre en anchura todas las secuencias de eventos de un alfabeto fijo hasta una
+profundidad dada, evitando re-explorar estados equivalentes mediante un hash
+canónico del estado completo del simulador:
+
+- Raft: NodeState (activo, timeout, term, log), líder, term, commit y la BD.
+- Paxos: AcceptorState, prepare_info y la BD.
+
+Con --simetria los nodos se ordenan por su estado antes de hashear, de modo que
+dos estados que solo difieren en los nombres de los nodos cuentan como uno. En
+Raft eso exige nodos intercambiables: todos con el mismo timeout y, en la
+elección, empates resueltos por el contenido de cada nodo y no por su nombre
+(`RaftSimetrico`). El reporte compara contra la misma exploración sin reducir.
+El conjunto de visitados es acotado en memoria (--capacidad) u opcionalmente un
+filtro de Bloom (--bloom). Los invariantes se verifican con los monitores de
+fuzzer.py en cada estado nuevo.
+
+Uso:
+    python explorador.py Raft --nodos 3 --profundidad 5 --simetria
+    python explorador.py Paxos --nodos 3 --profundidad 4 --bloom 8000000
+"""
+
+from __future__ import annotations
+import argparse
+import copy
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+from fuzzer import MonitorPaxos, MonitorRaft, Violacion
+from paxos import PaxosSimulator
+from raft import RaftSimulator
+
+Simulador = Union[PaxosSimulator, RaftSimulator]
+Monitor = Union[MonitorPaxos, MonitorRaft]
+
+
+class RaftSimetrico(RaftSimulator):
+    """
+    RaftSimulator cuyos nodos activos se recorren ordenados por contenido (term,
+    timeout, log) en vez de por nombre: los empates de `_pick_leader` no dependen de
+    cómo se llamen los nodos y la reducción por simetría es correcta.
+    """
+
+    def _active_ids(self) -> List[str]:
+        activos = [nid for nid, st in self.nodes.items() if st.active]
+        activos.sort(key=lambda nid: self._contenido(self.nodes[nid]))
+        return activos
+
+    @staticmethod
+    def _contenido(st) -> tuple:
+        return st.term, st.timeout, tuple((t, a) for t, a, _ in st.log)
+
+
+# ------------------------------------------------------------------------------------
+# Hash canónico del estado
+# ------------------------------------------------------------------------------------
+def hash_raft(sim: RaftSimulator, simetria: bool = False) -> int:
+    """Hash del estado completo de un RaftSimulator (sin la salida de Log)."""
+    nodos = [
+        (st.active, st.timeout, st.term, nid == sim.leader, tuple(st.log))
+        for nid, st in sim.nodes.items()
+    ]
+    if simetria:
+        nodos.sort()
+    else:
+        nodos = [(nid,) + n for nid, n in zip(sim.nodes, nodos)]
+    return hash((
+        tuple(nodos), sim.leader is None, sim.term, sim.commit_index, sim.last_applied,
+        tuple(sim.db.data.items()),
+    ))
+
+
+def hash_paxos(sim: PaxosSimulator, simetria: bool = False) -> int:
+    """Hash del estado completo de un PaxosSimulator (sin la salida de Log)."""
+    ids = list(sim.acceptors)
+    estados = {
+        aid: (st.active, st.promised_n, st.accepted_n, st.accepted_val or "")
+        for aid, st in sim.acceptors.items()
+    }
+    if simetria:
+        ids.sort(key=lambda aid: estados[aid])
+        rango = {aid: i for i, aid in enumerate(ids)}
+        aceptores = tuple(estados[aid] for aid in ids)
+    else:
+        rango = {aid: aid for aid in ids}
+        aceptores = tuple((aid,) + estados[aid] for aid in ids)
+
+    prepares = tuple(sorted(
+        (prop, n, tuple(sorted(rango[a] for a in ok)), sug or "", max_n)
+        for (prop, n), (ok, sug, max_n) in sim.prepare_info.items()
+    ))
+    return hash((aceptores, prepares, tuple(sim.db._store.items())))
+
+
+def hash_estado(sim: Simulador, monitor: Monitor, simetria: bool = False) -> int:
+    """Combina el hash del simulador con la historia que usan los monitores."""
+    if isinstance(sim, RaftSimulator):
+        return hash((hash_raft(sim, simetria), tuple(monitor.comprometido)))
+    return hash((hash_paxos(sim, simetria), tuple(monitor.aprendidos), monitor.elegido))
+
+
+# ------------------------------------------------------------------------------------
+# Conjuntos de visitados
+# ------------------------------------------------------------------------------------
+class VisitadosAcotado:
+    """Conjunto de hashes con capacidad máxima; al llenarse descarta los más antiguos."""
+
+    def __init__(self, capacidad: int) -> None:
+        self.capacidad = capacidad
+        self._hashes: Dict[int, None] = {}
+
+    def agregar(self, h: int) -> bool:
+        """Agrega h; retorna True si ya estaba."""
+        if h in self._hashes:
+            return True
+        if len(self._hashes) >= self.capacidad:
+            del self._hashes[next(iter(self._hashes))]
+        self._hashes[h] = None
+        return False
+
+    def bytes_usados(self) -> int:
+        return len(self._hashes) * 100  # aprox. por entrada de dict con int
+
+
+class FiltroBloom:
+    """Filtro de Bloom sobre hashes de 64 bits (doble hashing, k funciones)."""
+
+    def __init__(self, bits: int, funciones: int = 4) -> None:
+        self.bits = bits
+        self.funciones = funciones
+        self._tabla = bytearray((bits + 7) // 8)
+
+    def agregar(self, h: int) -> bool:
+        """Agrega h; retorna True si (probablemente) ya estaba."""
+        h1 = h & 0xFFFFFFFF
+        h2 = ((h >> 32) & 0xFFFFFFFF) | 1
+        presente = True
+        for i in range(self.funciones):
+            pos = (h1 + i * h2) % self.bits
+            byte, bit = pos >> 3, 1 << (pos & 7)
+            if not self._tabla[byte] & bit:
+                presente = False
+                self._tabla[byte] |= bit
+        return presente
+
+    def bytes_usados(self) -> int:
+        return len(self._tabla)
+
+
+# ------------------------------------------------------------------------------------
+# Exploración
+# ------------------------------------------------------------------------------------
+def alfabeto(motor: str, nodos: int, simetria: bool = False) -> Tuple[List[str], List[str]]:
+    """
+    Retorna (cabecera, eventos posibles) para un cluster de `nodos` nodos. Con
+    simetría, los nodos Raft comparten timeout para ser intercambiables.
+    """
+    ids = [chr(ord("A") + i) for i in range(nodos)]
+    fallos = [f"{cmd};{nid}" for cmd in ("Stop", "Start") for nid in ids]
+    if motor == "Raft":
+        cabecera = [";".join(f"{nid},{1 if simetria else i + 1}" for i, nid in enumerate(ids))]
+        eventos = ["Send;SET-a-1", "Send;ADD-a-2", f"Spread;[{','.join(ids)}]"]
+        eventos += [f"Spread;[{nid}]" for nid in ids]
+        return cabecera, eventos + fallos
+    cabecera = [";".join(ids), "P;Q"]
+    eventos = [f"Prepare;{p};{n}" for p in ("P", "Q") for n in (1, 2)]
+    eventos += [f"Accept;{p};{n};SET-a-{p}" for p in ("P", "Q") for n in (1, 2)]
+    return cabecera, eventos + ["Learn"] + fallos
+
+
+@dataclass
+class Resultado:
+    estados: int = 0
+    generados: int = 0
+    duplicados: int = 0
+    segundos: float = 0.0
+    memoria: int = 0
+    violaciones: List[Tuple[Violacion, List[str]]] = field(default_factory=list)
+
+    @property
+    def estados_por_segundo(self) -> float:
+        return self.estados / self.segundos if self.segundos else 0.0
+
+    @property
+    def tasa_dedup(self) -> float:
+        return self.duplicados / self.generados if self.generados else 0.0
+
+
+def explorar(motor: str, nodos: int, profundidad: int, simetria: bool = False,
+             capacidad: int = 1_000_000, bloom_bits: int = 0,
+             max_violaciones: int = 5, reducir: Optional[bool] = None) -> Resultado:
+    """
+    Búsqueda en anchura acotada por profundidad con deduplicación de estados.
+    `simetria` arma un clúster de nodos intercambiables; `reducir` (por defecto,
+    igual a `simetria`) decide si los estados se hashean en forma canónica.
+    """
+    reducir = simetria if reducir is None else reducir
+    cabecera, eventos = alfabeto(motor, nodos, simetria)
+    if motor == "Raft":
+        sim: Simulador = RaftSimetrico("") if simetria else RaftSimulator("")
+        sim._parse_header(cabecera[0])
+        monitor: Monitor = MonitorRaft()
+        monitor.despues(sim, cabecera[0])
+    else:
+        sim = PaxosSimulator("")
+        sim._parse_header(cabecera[0], cabecera[1])
+        monitor = MonitorPaxos()
+
+    visitados: Union[VisitadosAcotado, FiltroBloom] = (
+        FiltroBloom(bloom_bits) if bloom_bits else VisitadosAcotado(capacidad)
+    )
+    res = Resultado()
+    inicio = time.perf_counter()
+    visitados.agregar(hash_estado(sim, monitor, reducir))
+    res.estados = 1
+    frontera: List[Tuple[Simulador, Monitor, List[str]]] = [(sim, monitor, [])]
+
+    for _ in range(profundidad):
+        siguiente: List[Tuple[Simulador, Monitor, List[str]]] = []
+        for sim, monitor, camino in frontera:
+            for ev in eventos:
+                s, m = copy.deepcopy((sim, monitor))
+                m.antes(s, ev)
+                s._process_line(ev)
+                violacion: Optional[Violacion] = m.despues(s, ev)
+                res.generados += 1
+                if visitados.agregar(hash_estado(s, m, reducir)):
+                    res.duplicados += 1
+                    continue
+                res.estados += 1
+                if violacion:
+                    if len(res.violaciones) < max_violaciones:
+                        res.violaciones.append((violacion, cabecera + camino + [ev]))
+                    continue
+                siguiente.append((s, m, camino + [ev]))
+        frontera = siguiente
+        if not frontera:
+            break
+
+    res.segundos = time.perf_counter() - inicio
+    res.memoria = visitados.bytes_usados()
+    return res
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Exploración exhaustiva acotada")
+    parser.add_argument("motor", choices=("Paxos", "Raft"))
+    parser.add_argument("--nodos", type=int, default=3)
+    parser.add_argument("--profundidad", type=int, default=4)
+    parser.add_argument("--simetria", action="store_true")
+    parser.add_argument("--capacidad", type=int, default=1_000_000)
+    parser.add_argument("--bloom", type=int, default=0, help="bits del filtro de Bloom")
+    args = parser.parse_args()
+
+    res = explorar(args.motor, args.nodos, args.profundidad, args.simetria,
+                   args.capacidad, args.bloom)
+    print(f"Estados únicos: {res.estados} | generados: {res.generados}")
+    print(f"Estados/seg: {res.estados_por_segundo:.0f} | dedup: {100 * res.tasa_dedup:.1f}%")
+    print(f"Memoria visitados: ~{res.memoria / 1024:.0f} KiB | tiempo: {res.segundos:.2f}s")
+    if args.simetria:
+        # Mismo clúster sin hash canónico: cuánto reduce realmente la simetría
+        base = explorar(args.motor, args.nodos, args.profundidad, True,
+                        args.capacidad, args.bloom, reducir=False)
+        print(f"Simetría: {base.estados} → {res.estados} estados "
+              f"({100 * (1 - res.estados / base.estados):.1f}% menos)")
+    for (codigo, detalle), camino in res.violaciones:
+        print(f"❌ {codigo}: {detalle}")
+        for linea in camino:
+            print("    ", linea)
+    return 1 if res.violaciones else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
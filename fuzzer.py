@@ -0,0 +1,323 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Paxos y Raft)
+#
+# Archivo: fuzzer.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+fuzzer.py
+
+Explorador aleatorio de fallos para los simuladores de Paxos y Raft.
+Genera escenarios con intercalaciones aleatorias de eventos, los ejecuta en un pool
+de procesos y verifica invariantes de seguridad después de cada evento:
+
+- prefijo-comprometido: lo ya comprometido nunca cambia ni se acorta.
+- valor-unico: un slot nunca queda con dos valores distintos.
+- acuerdo-bd: la base de datos coincide con reaplicar lo comprometido.
+
+Los casos que fallan se reducen (delta debugging) y se guardan como archivos de
+escenario mínimos en la carpeta de salida.
+
+Uso:
+    python fuzzer.py Raft --casos 500 --eventos 30
+    python fuzzer.py Paxos --casos 500 --procesos 4 --salida casos_fuzz
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import database1
+import database2
+from paxos import PaxosSimulator
+from raft import RaftSimulator
+
+Violacion = Tuple[str, str]  # (código de invariante, detalle)
+
+CLAVES = ("a", "b", "c")
+
+
+# ------------------------------------------------------------------------------------
+# Generación de escenarios
+# ------------------------------------------------------------------------------------
+def _accion_aleatoria(rng: random.Random) -> str:
+    clave = rng.choice(CLAVES)
+    op = rng.choice(("SET", "SET", "ADD", "DEL"))
+    if op == "DEL":
+        return f"DEL-{clave}"
+    if op == "ADD":
+        return f"ADD-{clave}-{rng.randint(1, 9)}"
+    return f"SET-{clave}-v{rng.randint(1, 9)}"
+
+
+def generar_raft(rng: random.Random, nodos: int, eventos: int) -> List[str]:
+    """Escenario Raft: cabecera con timeouts y eventos Send/Spread/Start/Stop/Log."""
+    ids = [chr(ord("A") + i) for i in range(nodos)]
+    lineas = [";".join(f"{nid},{rng.randint(1, 9)}" for nid in ids)]
+    for _ in range(eventos):
+        tipo = rng.choice(("Send", "Send", "Spread", "Spread", "Start", "Stop", "Log"))
+        if tipo == "Send":
+            lineas.append(f"Send;{_accion_aleatoria(rng)}")
+        elif tipo == "Spread":
+            destinos = rng.sample(ids, rng.randint(1, nodos))
+            lineas.append(f"Spread;[{','.join(destinos)}]")
+        elif tipo == "Log":
+            lineas.append(f"Log;{rng.choice(CLAVES)}")
+        else:
+            lineas.append(f"{tipo};{rng.choice(ids)}")
+    return lineas
+
+
+def generar_paxos(rng: random.Random, aceptores: int, eventos: int) -> List[str]:
+    """
+    Escenario Paxos: dos proponentes y eventos Prepare/Accept/Learn/Start/Stop/Log.
+    Como en Paxos real, cada ballot tiene un solo dueño (P impares, Q pares) y un solo
+    valor: un Accept repetido sobre el mismo ballot reenvía el valor del primero.
+    """
+    ids = [chr(ord("A") + i) for i in range(aceptores)]
+    proponentes = ["P", "Q"]
+    lineas = [";".join(ids), ";".join(proponentes)]
+    preparados: List[Tuple[str, int]] = []
+    valores: Dict[int, str] = {}
+
+    def ballot() -> Tuple[str, int]:
+        i = rng.randrange(len(proponentes))
+        return proponentes[i], len(proponentes) * rng.randint(0, 24) + i + 1
+
+    for _ in range(eventos):
+        tipo = rng.choice(("Prepare", "Accept", "Accept", "Learn", "Start", "Stop", "Log"))
+        if tipo == "Prepare":
+            prop, n = ballot()
+            preparados.append((prop, n))
+            lineas.append(f"Prepare;{prop};{n}")
+        elif tipo == "Accept":
+            prop, n = rng.choice(preparados) if preparados and rng.random() < 0.8 else ballot()
+            valor = valores.setdefault(n, _accion_aleatoria(rng))
+            lineas.append(f"Accept;{prop};{n};{valor}")
+        elif tipo == "Learn":
+            lineas.append("Learn")
+        elif tipo == "Log":
+            lineas.append(f"Log;{rng.choice(CLAVES)}")
+        else:
+            lineas.append(f"{tipo};{rng.choice(ids)}")
+    return lineas
+
+
+# ------------------------------------------------------------------------------------
+# Monitores de invariantes
+# ------------------------------------------------------------------------------------
+class MonitorRaft:
+    """Verifica los invariantes de Raft sobre el log del líder y la BD."""
+
+    def __init__(self) -> None:
+        self.comprometido: List[str] = []
+
+    def antes(self, sim: RaftSimulator, linea: str) -> None:
+        pass
+
+    def despues(self, sim: RaftSimulator, linea: str) -> Optional[Violacion]:
+        if not sim.leader or sim.leader not in sim.nodes:
+            return None
+        log = sim.nodes[sim.leader].log
+        actual = [act for _, act, _ in log[:sim.commit_index]]
+
+        previo = self.comprometido
+        if len(actual) < len(previo):
+            return ("prefijo-comprometido",
+                    f"commit_index bajó de {len(previo)} a {len(actual)}")
+        if actual[:len(previo)] != previo:
+            i = next(i for i, (x, y) in enumerate(zip(previo, actual)) if x != y)
+            return ("prefijo-comprometido",
+                    f"slot {i} cambió de '{previo[i]}' a '{actual[i]}'")
+        self.comprometido = actual
+
+        for nid in sim._active_ids():
+            otro = sim.nodes[nid].log
+            for i in range(min(len(otro), len(actual))):
+                if otro[i][1] != actual[i]:
+                    return ("valor-unico",
+                            f"slot {i}: líder '{actual[i]}' vs {nid} '{otro[i][1]}'")
+
+        esperado = database2.Database()
+        for act in actual:
+            esperado.apply_action(act)
+        if esperado.snapshot() != sim.db.snapshot():
+            return ("acuerdo-bd",
+                    f"BD {sim.db.snapshot()} ≠ comprometido {esperado.snapshot()}")
+        return None
+
+
+class MonitorPaxos:
+    """Verifica los invariantes de Paxos sobre los valores elegidos y aprendidos."""
+
+    def __init__(self) -> None:
+        self.aprendidos: List[str] = []
+        self.elegido: Optional[str] = None
+        self._pendiente: Optional[str] = None
+
+    def antes(self, sim: PaxosSimulator, linea: str) -> None:
+        self._pendiente = sim.valor_elegido() if linea == "Learn" else None
+
+    def despues(self, sim: PaxosSimulator, linea: str) -> Optional[Violacion]:
+        slot = len(self.aprendidos)
+        if self._pendiente is not None:
+            self.aprendidos.append(self._pendiente)
+            if self.elegido is not None and self._pendiente != self.elegido:
+                return ("valor-unico",
+                        f"slot {slot}: elegido '{self.elegido}' pero se aprendió "
+                        f"'{self._pendiente}'")
+            self.elegido = None
+        else:
+            valor = sim.valor_elegido()
+            if valor is not None:
+                if self.elegido is None:
+                    self.elegido = valor
+                elif valor != self.elegido:
+                    return ("valor-unico",
+                            f"slot {slot}: '{self.elegido}' y '{valor}' con mayoría")
+
+        esperado = database1.Database()
+        for act in self.aprendidos:
+            esperado.apply_action(act)
+        if esperado.snapshot() != sim.db.snapshot():
+            return ("acuerdo-bd",
+                    f"BD {sim.db.snapshot()} ≠ aprendido {esperado.snapshot()}")
+        return None
+
+
+# ------------------------------------------------------------------------------------
+# Ejecución y reducción
+# ------------------------------------------------------------------------------------
+def _cabecera(motor: str) -> int:
+    return 2 if motor == "Paxos" else 1
+
+
+def ejecutar_caso(motor: str, lineas: List[str]) -> Optional[Violacion]:
+    """Ejecuta un escenario evento a evento y retorna la primera violación."""
+    h = _cabecera(motor)
+    if motor == "Paxos":
+        sim = PaxosSimulator("")
+        sim._parse_header(lineas[0], lineas[1])
+        monitor = MonitorPaxos()
+    else:
+        sim = RaftSimulator("")
+        sim._parse_header(lineas[0])
+        monitor = MonitorRaft()
+        violacion = monitor.despues(sim, lineas[0])
+        if violacion:
+            return violacion
+
+    for linea in lineas[h:]:
+        monitor.antes(sim, linea)
+        sim._process_line(linea)
+        violacion = monitor.despues(sim, linea)
+        if violacion:
+            return violacion
+    return None
+
+
+def reducir(motor: str, lineas: List[str], codigo: str) -> List[str]:
+    """Delta debugging (ddmin) sobre los eventos, conservando la cabecera."""
+    h = _cabecera(motor)
+    cabecera, eventos = lineas[:h], lineas[h:]
+
+    def falla(evs: List[str]) -> bool:
+        res = ejecutar_caso(motor, cabecera + evs)
+        return res is not None and res[0] == codigo
+
+    n = 2
+    while len(eventos) >= 2:
+        trozo = max(1, len(eventos) // n)
+        reducido = False
+        for i in range(0, len(eventos), trozo):
+            complemento = eventos[:i] + eventos[i + trozo:]
+            if falla(complemento):
+                eventos = complemento
+                n = max(n - 1, 2)
+                reducido = True
+                break
+        if not reducido:
+            if trozo == 1:
+                break
+            n = min(n * 2, len(eventos))
+    return cabecera + eventos
+
+
+def explorar_semilla(args: Tuple[str, int, int, int]) -> Optional[Tuple[int, str, str, List[str]]]:
+    """Genera, ejecuta y (si falla) reduce el escenario de una semilla."""
+    motor, semilla, nodos, eventos = args
+    rng = random.Random(semilla)
+    if motor == "Paxos":
+        lineas = generar_paxos(rng, nodos, eventos)
+    else:
+        lineas = generar_raft(rng, nodos, eventos)
+
+    violacion = ejecutar_caso(motor, lineas)
+    if violacion is None:
+        return None
+    codigo = violacion[0]
+    minimo = reducir(motor, lineas, codigo)
+    detalle = (ejecutar_caso(motor, minimo) or violacion)[1]
+    return semilla, codigo, detalle, minimo
+
+
+def guardar_caso(carpeta: str, motor: str, semilla: int, codigo: str, detalle: str,
+                 lineas: List[str]) -> str:
+    os.makedirs(carpeta, exist_ok=True)
+    ruta = os.path.join(carpeta, f"{motor}_{codigo}_{semilla}.txt")
+    h = _cabecera(motor)
+    with open(ruta, "w", encoding="utf-8") as f:
+        for linea in lineas[:h]:
+            f.write(linea + "\n")
+        f.write(f"# Invariante violada: {codigo} — {detalle}\n")
+        for linea in lineas[h:]:
+            f.write(linea + "\n")
+    return ruta
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fuzzer de invariantes Paxos/Raft")
+    parser.add_argument("motor", choices=("Paxos", "Raft"))
+    parser.add_argument("--casos", type=int, default=200)
+    parser.add_argument("--eventos", type=int, default=25)
+    parser.add_argument("--nodos", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--salida", default="casos_fuzz")
+    args = parser.parse_args()
+
+    tareas = [(args.motor, args.semilla + i, args.nodos, args.eventos)
+              for i in range(args.casos)]
+    vistos: Dict[str, int] = {}
+    mejores: Dict[str, Tuple[int, str, List[str]]] = {}
+    with ProcessPoolExecutor(max_workers=args.procesos) as pool:
+        for res in pool.map(explorar_semilla, tareas, chunksize=8):
+            if res is None:
+                continue
+            semilla, codigo, detalle, minimo = res
+            vistos[codigo] = vistos.get(codigo, 0) + 1
+            # Se guarda solo el caso más corto encontrado por invariante
+            if codigo not in mejores or len(minimo) < len(mejores[codigo][2]):
+                mejores[codigo] = (semilla, detalle, minimo)
+
+    for codigo, (semilla, detalle, minimo) in sorted(mejores.items()):
+        ruta = guardar_caso(args.salida, args.motor, semilla, codigo, detalle, minimo)
+        print(f"❌ {codigo}: semilla {semilla} ({len(minimo)} líneas) → {ruta}")
+
+    print("────────────────────────────────────────────────────────────")
+    if not vistos:
+        print(f"✅ {args.casos} casos sin violaciones")
+    for codigo, veces in sorted(vistos.items()):
+        print(f"{codigo}: {veces}/{args.casos} casos")
+    return 1 if vistos else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
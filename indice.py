@@ -0,0 +1,157 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Paxos y Raft)
+#
+# Archivo: indice.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+indice.py
+
+Índice ordenado de claves para lecturas por rango y prefijo en database1 y
+database2. Las claves viven en una lista ordenada (bisect); las altas y bajas se
+anotan en dos conjuntos pendientes y se consolidan en la siguiente lectura:
+
+- pocas pendientes (≤ `umbral`): insort / del por bisect, O(n) de memmove cada una;
+- muchas: se filtran las bajas y se reordena todo una vez; la lista ya ordenada es
+  una sola corrida para timsort, así que cuesta O(n + p log p).
+
+Así SET/ADD/DEL cuestan O(1) extra y un rango sin escrituras pendientes cuesta
+O(log n + k). Solo cambian el índice las operaciones que crean o borran claves;
+reasignar una clave existente no lo toca. Raft reconstruye la BD en cada commit:
+la BD nueva hereda el índice de la anterior (`Database.heredar_indice`) y solo
+anota la diferencia de claves, en vez de reordenar todo.
+
+En el escenario:
+    Scan;desde;hasta    claves en [desde, hasta) (hasta vacío = sin límite)
+    Prefix;p            claves que empiezan con p
+Ambos agregan una línea `Scan;desde;hasta=[k1=v1,k2=v2]` / `Prefix;p=[...]`.
+
+Uso (benchmark):
+    python indice.py --claves 100000 --lecturas 200
+"""
+
+from __future__ import annotations
+import argparse
+import random
+import time
+from bisect import bisect_left, insort
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+
+class IndiceOrdenado:
+    """Claves ordenadas con altas/bajas diferidas hasta la próxima lectura."""
+
+    __slots__ = ("_claves", "_altas", "_bajas", "umbral")
+
+    def __init__(self, claves: Iterable[str] = (), umbral: int = 64) -> None:
+        self._claves: List[str] = sorted(claves)
+        self._altas: Set[str] = set()
+        self._bajas: Set[str] = set()
+        self.umbral = umbral
+
+    def agregar(self, clave: str) -> None:
+        """Registra una clave nueva (no debe estar ya en el índice)."""
+        if clave in self._bajas:
+            self._bajas.discard(clave)
+        else:
+            self._altas.add(clave)
+
+    def quitar(self, clave: str) -> None:
+        """Registra el borrado de una clave presente."""
+        if clave in self._altas:
+            self._altas.discard(clave)
+        else:
+            self._bajas.add(clave)
+
+    def _consolidar(self) -> List[str]:
+        altas, bajas, claves = self._altas, self._bajas, self._claves
+        if not altas and not bajas:
+            return claves
+        if len(altas) + len(bajas) <= self.umbral:
+            for clave in bajas:
+                del claves[bisect_left(claves, clave)]
+            for clave in altas:
+                insort(claves, clave)
+        else:
+            if bajas:
+                claves = [k for k in claves if k not in bajas]
+            claves.extend(altas)
+            claves.sort()
+            self._claves = claves
+        altas.clear()
+        bajas.clear()
+        return claves
+
+    def rango(self, desde: str, hasta: Optional[str] = None) -> Iterator[str]:
+        """Claves en [desde, hasta), en orden."""
+        claves = self._consolidar()
+        fin = len(claves) if hasta is None else bisect_left(claves, hasta)
+        for i in range(bisect_left(claves, desde), fin):
+            yield claves[i]
+
+    def prefijo(self, prefijo: str) -> Iterator[str]:
+        """Claves que empiezan con `prefijo`, en orden."""
+        claves = self._consolidar()
+        for i in range(bisect_left(claves, prefijo), len(claves)):
+            if not claves[i].startswith(prefijo):
+                break
+            yield claves[i]
+
+    def __len__(self) -> int:
+        return len(self._claves) + len(self._altas) - len(self._bajas)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._consolidar())
+
+
+def linea_scan(evento: str, pares: Iterable[Tuple[str, str]]) -> str:
+    """Línea de salida de un Scan/Prefix: `evento=[k1=v1,k2=v2]`."""
+    return f"{evento}=[{','.join(f'{k}={v}' for k, v in pares)}]"
+
+
+# ------------------------------------------------------------------------------------
+# Benchmark: rango con índice vs snapshot + sort
+# ------------------------------------------------------------------------------------
+def benchmark(claves: int, lecturas: int, seed: int = 0) -> None:
+    from database1 import Database
+
+    rng = random.Random(seed)
+    db = Database()
+    for i in range(claves):
+        db.set(f"k{rng.randrange(10 * claves):08d}", str(i))
+    limites = sorted(f"k{rng.randrange(10 * claves):08d}" for _ in range(2 * lecturas))
+    rangos = [(limites[i], limites[i + 1]) for i in range(0, 2 * lecturas, 2)]
+    db.rango("", "")  # consolida las altas iniciales fuera de la medición
+
+    inicio = time.perf_counter()
+    total = 0
+    for desde, hasta in rangos:
+        snap = db.snapshot()
+        total += len([(k, snap[k]) for k in sorted(snap) if desde <= k < hasta])
+    t_sort = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    total_idx = 0
+    for desde, hasta in rangos:
+        total_idx += len(db.rango(desde, hasta))
+    t_idx = time.perf_counter() - inicio
+    print(f"snapshot+sort | {t_sort:7.3f}s | {lecturas / t_sort:10.0f} rangos/s")
+    print(f"índice        | {t_idx:7.3f}s | {lecturas / t_idx:10.0f} rangos/s | "
+          f"{t_sort / t_idx:7.0f}x | mismo resultado: {'sí' if total == total_idx else 'NO'}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Índice ordenado de claves (rango/prefijo)")
+    parser.add_argument("--claves", type=int, default=100_000)
+    parser.add_argument("--lecturas", type=int, default=200)
+    args = parser.parse_args()
+    benchmark(args.claves, args.lecturas)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,181 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Paxos y Raft)
+#
+# Archivo: latencias.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+latencias.py
+
+Latencia de commit/aplicación por entrada y rezago de replicación por nodo.
+
+Cada entrada se marca al ingresar (Send en Raft, Accept en Paxos) con el número de
+evento del escenario y el reloj (perf_counter_ns). Al comprometerse y al aplicarse
+a la BD se registra la diferencia en ambas unidades en histogramas estilo HDR:
+buckets log-lineales con `bits` bits de precisión (error relativo < 2^-(bits-1)),
+así el costo por muestra es O(1) y la memoria no depende del rango de valores.
+
+El rezago por nodo se muestrea en cada commit: en Raft son las entradas del líder
+que aún no tiene el nodo; en Paxos, las rondas aprendidas seguidas en que el
+aceptor no tenía el valor ganador.
+
+Uso:
+    python main.py Raft casos_Raft/test_01.txt --latencias /tmp/lat.json
+"""
+
+from __future__ import annotations
+import json
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, List, Tuple
+
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+class Histograma:
+    """Histograma log-lineal disperso (valores enteros ≥ 0)."""
+
+    def __init__(self, bits: int = 7) -> None:
+        self.bits = bits
+        self.cuentas: Dict[int, int] = {}
+        self.n = 0
+        self.total = 0
+        self.minimo = 0
+        self.maximo = 0
+
+    def _bucket(self, v: int) -> int:
+        e = v.bit_length() - self.bits
+        if e <= 0:
+            return v
+        return (e << self.bits) + (v >> e)
+
+    def _tope(self, b: int) -> int:
+        """Mayor valor que cae en el bucket b."""
+        e, sub = b >> self.bits, b & ((1 << self.bits) - 1)
+        if e == 0:
+            return sub
+        return ((sub + 1) << e) - 1
+
+    def record(self, v: int) -> None:
+        v = max(0, int(v))
+        b = self._bucket(v)
+        self.cuentas[b] = self.cuentas.get(b, 0) + 1
+        if self.n == 0 or v < self.minimo:
+            self.minimo = v
+        if v > self.maximo:
+            self.maximo = v
+        self.n += 1
+        self.total += v
+
+    def percentile(self, p: float) -> int:
+        if self.n == 0:
+            return 0
+        objetivo = max(1, -(-self.n * p // 100))
+        acumulado = 0
+        for b in sorted(self.cuentas):
+            acumulado += self.cuentas[b]
+            if acumulado >= objetivo:
+                return min(self._tope(b), self.maximo)
+        return self.maximo
+
+    def to_dict(self) -> Dict[str, Any]:
+        datos: Dict[str, Any] = {
+            "n": self.n, "min": self.minimo, "max": self.maximo,
+            "media": self.total / self.n if self.n else 0.0,
+        }
+        for p in PERCENTILES:
+            datos[f"p{p:g}"] = self.percentile(p)
+        return datos
+
+
+class Latencias:
+    """Marcas de tiempo por entrada y histogramas de commit/aplicación/rezago."""
+
+    def __init__(self, bits: int = 7) -> None:
+        self.bits = bits
+        self.evento = 0
+        # clave de la entrada → marcas (evento, ns) en orden de ingreso
+        self._marcas: Dict[Hashable, Deque[Tuple[int, int]]] = {}
+        self._por_aplicar: List[Tuple[int, int]] = []
+        self.commit_eventos = Histograma(bits)
+        self.commit_ns = Histograma(bits)
+        self.aplicacion_eventos = Histograma(bits)
+        self.aplicacion_ns = Histograma(bits)
+        self.rezago: Dict[str, Histograma] = {}
+        self.rezago_actual: Dict[str, int] = {}
+
+    def tick(self) -> None:
+        """Avanza el número de evento del escenario."""
+        self.evento += 1
+
+    def enviada(self, clave: Hashable, unica: bool = False) -> None:
+        """Marca el ingreso de una entrada (si `unica`, conserva la primera marca)."""
+        marcas = self._marcas.get(clave)
+        if marcas is None:
+            marcas = self._marcas[clave] = deque()
+        elif unica:
+            return
+        marcas.append((self.evento, time.perf_counter_ns()))
+
+    def comprometida(self, clave: Hashable) -> None:
+        marcas = self._marcas.get(clave)
+        if not marcas:
+            return  # re-commit tras una elección, o entrada no marcada
+        ev, ns = marcas.popleft()
+        if not marcas:
+            del self._marcas[clave]
+        self.commit_eventos.record(self.evento - ev)
+        self.commit_ns.record(time.perf_counter_ns() - ns)
+        self._por_aplicar.append((ev, ns))
+
+    def aplicadas(self) -> None:
+        """Las entradas comprometidas hasta ahora ya están en la BD."""
+        ahora = time.perf_counter_ns()
+        for ev, ns in self._por_aplicar:
+            self.aplicacion_eventos.record(self.evento - ev)
+            self.aplicacion_ns.record(ahora - ns)
+        self._por_aplicar.clear()
+
+    # Checkpoint (pickle): las marcas en ns se corren por el tiempo entre guardar y
+    # reanudar, que puede ser en otro proceso (perf_counter_ns no es comparable)
+    def __getstate__(self) -> Dict[str, Any]:
+        estado = dict(self.__dict__)
+        estado["_pausa"] = time.perf_counter_ns()
+        return estado
+
+    def __setstate__(self, estado: Dict[str, Any]) -> None:
+        delta = time.perf_counter_ns() - estado.pop("_pausa")
+        self.__dict__.update(estado)
+        for marcas in self._marcas.values():
+            for i, (ev, ns) in enumerate(marcas):
+                marcas[i] = (ev, ns + delta)
+        self._por_aplicar = [(ev, ns + delta) for ev, ns in self._por_aplicar]
+
+    def muestra_rezago(self, nodo: str, valor: int) -> None:
+        h = self.rezago.get(nodo)
+        if h is None:
+            h = self.rezago[nodo] = Histograma(self.bits)
+        h.record(valor)
+        self.rezago_actual[nodo] = valor
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "eventos": self.evento,
+            "sin_commit": sum(len(m) for m in self._marcas.values()),
+            "sin_aplicar": len(self._por_aplicar),
+            "commit": {"eventos": self.commit_eventos.to_dict(),
+                       "ns": self.commit_ns.to_dict()},
+            "aplicacion": {"eventos": self.aplicacion_eventos.to_dict(),
+                           "ns": self.aplicacion_ns.to_dict()},
+            "rezago": {nodo: dict(h.to_dict(), actual=self.rezago_actual[nodo])
+                       for nodo, h in self.rezago.items()},
+        }
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+            f.write("\n")
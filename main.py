@@ -11,25 +11,76 @@
 from sys import argv
 from paxos import PaxosSimulator
 from raft import RaftSimulator
+from traza import TraceRecorder
+from latencias import Latencias
+from raft_eleccion import ModeloEleccion
+from digestos import DigestoLogs, resumen
+from paxos_durable import Persistencia
+import checkpoint
+import json
 import os
 
 if __name__ == "__main__":
     if len(argv) < 3:
-        print("Uso: python main.py [Paxos|Raft] <ruta_caso>")
+        print("Uso: python main.py [Paxos|Raft] <ruta_caso> "
+              "[--checkpoint <archivo> [--cada K]] [--traza <archivo>] "
+              "[--latencias <archivo.json>] [--eleccion prevote|simple] [--digest] "
+              "[--persistencia <dir> [--fsync grupo|registro]]")
         exit(1)
 
     modo = argv[1]
     path = argv[2]
+    # --digest no lleva valor: imprime los digestos en vez de escribir logs/
+    digest = "--digest" in argv[3:]
+    resto = [a for a in argv[3:] if a != "--digest"]
+    opciones = dict(zip(resto[::2], resto[1::2]))
 
-    if modo == "Paxos":
-        sim = PaxosSimulator(path)
-    elif modo == "Raft":
-        sim = RaftSimulator(path)
-    else:
+    if modo not in ("Paxos", "Raft"):
         print("Modo no reconocido. Usa 'Paxos' o 'Raft'.")
         exit(1)
 
-    salida, estado = sim.run()
+    def crear():
+        """Simulador configurado con las opciones de instrumentación."""
+        if modo == "Paxos":
+            sim = PaxosSimulator(path)
+        elif "--eleccion" in opciones:
+            # Elección con timeouts aleatorios (ver raft_eleccion.py)
+            modelo = ModeloEleccion(prevote=opciones["--eleccion"] == "prevote", seed=0)
+            sim = RaftSimulator(path, election=modelo)
+        else:
+            sim = RaftSimulator(path)
+        if "--traza" in opciones:
+            sim.trace = TraceRecorder(opciones["--traza"])
+        if "--latencias" in opciones:
+            sim.latencias = Latencias()
+        if modo == "Paxos" and "--persistencia" in opciones:
+            # Aceptores con archivos propios y fsync por registro o en grupo
+            sim.persistencia = Persistencia(opciones["--persistencia"],
+                                            opciones.get("--fsync", "grupo"))
+        return sim
+
+    if "--checkpoint" in opciones:
+        # Guarda el estado cada K eventos y reanuda desde el último checkpoint si existe;
+        # la instrumentación se guarda con el simulador y sigue al reanudar
+        sim = checkpoint.simular(modo, path, opciones["--checkpoint"],
+                                 cada=int(opciones.get("--cada", 10000)), crear=crear)
+        salida, estado = sim.log_lines, sim.db.snapshot()
+    else:
+        sim = crear()
+        if digest:
+            sim.log_lines = DigestoLogs()
+        salida, estado = sim.run()
+    if sim.trace is not None:
+        sim.trace.close()
+    if modo == "Paxos" and sim.persistencia is not None:
+        sim.persistencia.cerrar()
+    if sim.latencias is not None:
+        # Percentiles de latencia y rezago por nodo, en JSON
+        sim.latencias.dump(opciones["--latencias"])
+
+    if digest:
+        print(json.dumps(resumen(salida, estado)))
+        exit(0)
 
     # Escribir archivo de logs en carpeta logs/
     nombre_archivo = f"logs/{modo}_{path.split(os.sep)[-1]}"
@@ -23,22 +23,34 @@
 # ------------------------------------------------------------------------------------
 
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 from database1 import Database
+from indice import linea_scan
+from escenario import expandir
+from latencias import Latencias
+from paxos_durable import Persistencia
+from traza import ACCEPT, LEARN, PROMISE, TraceRecorder, valor_id
 
 
 # ------------------------------------------------------------------------------------
 # Implementación simplificada de Paxos (alineada al formato de los casos del curso)
 # ------------------------------------------------------------------------------------
 
-@dataclass
 class AcceptorState:
-    active: bool = True
-    promised_n: int = 0
-    accepted_n: int = 0
-    accepted_val: Optional[str] = None
+    # __slots__ explícito: dataclass(slots=True) requiere Python 3.10
+    __slots__ = ("active", "promised_n", "accepted_n", "accepted_val")
+
+    def __init__(self, active: bool = True, promised_n: int = 0, accepted_n: int = 0,
+                 accepted_val: Optional[str] = None) -> None:
+        self.active = active
+        self.promised_n = promised_n
+        self.accepted_n = accepted_n
+        self.accepted_val = accepted_val
+
+    def __repr__(self) -> str:
+        return (f"AcceptorState(active={self.active}, promised_n={self.promised_n}, "
+                f"accepted_n={self.accepted_n}, accepted_val={self.accepted_val!r})")
 
 
 class PaxosSimulator:
@@ -52,7 +64,7 @@ class PaxosSimulator:
       - Log;var
     """
 
-    def __init__(self, path: str) -> None:
+    def __init__(self, path: str = "") -> None:
         self.path = path
         self.db = Database()
 
@@ -61,6 +73,12 @@ class PaxosSimulator:
         # (proposer, n) → (ok_acceptors, suggested_val, max_accepted_n)
         self.prepare_info: Dict[Tuple[str, int], Tuple[Set[str], Optional[str], int]] = {}
         self.log_lines: List[str] = []
+        # Traza binaria opcional de transiciones internas (ver traza.py)
+        self.trace: Optional[TraceRecorder] = None
+        # Latencia de Accept a Learn y rondas de rezago por aceptor (ver latencias.py)
+        self.latencias: Optional[Latencias] = None
+        # Archivos de aceptores con fsync por registro o en grupo (ver paxos_durable.py)
+        self.persistencia: Optional[Persistencia] = None
 
     # ----------------------- Utilidades -----------------------
     @staticmethod
@@ -72,6 +90,17 @@ class PaxosSimulator:
     def _majority_threshold(self) -> int:
         return (len(self.acceptors) // 2) + 1
 
+    def valor_elegido(self) -> Optional[str]:
+        """Valor aceptado por una mayoría de aceptores (el que aprendería un Learn)."""
+        count: Dict[str, int] = {}
+        for st in self.acceptors.values():
+            if st.accepted_val is not None:
+                count[st.accepted_val] = count.get(st.accepted_val, 0) + 1
+        if not count:
+            return None
+        valor, votos = max(count.items(), key=lambda kv: kv[1])
+        return valor if votos >= self._majority_threshold() else None
+
     # ----------------------- Eventos --------------------------
     def _event_prepare(self, proposer: str, n: int) -> None:
         ok: Set[str] = set()
@@ -84,6 +113,10 @@ class PaxosSimulator:
             if n > st.promised_n:
                 st.promised_n = n
                 ok.add(aid)
+                if self.persistencia is not None:
+                    self.persistencia.promesa(aid, n)
+                if self.trace is not None:
+                    self.trace.emit(PROMISE, aid, n, st.accepted_n, valor_id(st.accepted_val))
                 if st.accepted_val is not None and st.accepted_n > max_acc_n:
                     max_acc_n = st.accepted_n
                     suggested_val = st.accepted_val
@@ -100,12 +133,19 @@ class PaxosSimulator:
             return
 
         value_to_accept = suggested_val if suggested_val is not None else action
+        if self.latencias is not None:
+            # Un valor sugerido conserva la marca de su primer Accept
+            self.latencias.enviada(value_to_accept, unica=True)
         for aid, st in self.acceptors.items():
             if not st.active:
                 continue
             if n >= st.promised_n:
                 st.accepted_n = n
                 st.accepted_val = value_to_accept
+                if self.persistencia is not None:
+                    self.persistencia.aceptacion(aid, n, value_to_accept)
+                if self.trace is not None:
+                    self.trace.emit(ACCEPT, aid, n, 0, valor_id(value_to_accept))
 
     def _event_learn(self) -> None:
         count: Dict[str, int] = {}
@@ -118,84 +158,195 @@ class PaxosSimulator:
 
         winner, votes = max(count.items(), key=lambda kv: kv[1])
         if votes >= self._majority_threshold():
-            self.db.apply_action(winner)
-            for st in self.acceptors.values():
+            if self.latencias is not None:
+                self.latencias.comprometida(winner)
+            # Se parsea una vez, al aprenderse (un valor se aprende una sola vez)
+            self.db.apply_record(Database.parse_action(winner))
+            if self.latencias is not None:
+                self._medir_rezago(winner)
+            if self.trace is not None:
+                self.trace.emit(LEARN, "-", 0, votes, valor_id(winner))
+            for aid, st in self.acceptors.items():
                 if st.active:
                     st.promised_n = 0
                     st.accepted_n = 0
                     st.accepted_val = None
+                    if self.persistencia is not None:
+                        self.persistencia.reinicio(aid)
             self.prepare_info.clear()
 
+    def _medir_rezago(self, winner: str) -> None:
+        """Rezago: rondas aprendidas seguidas en que el aceptor no tenía el ganador."""
+        lat = self.latencias
+        lat.aplicadas()
+        for aid, st in self.acceptors.items():
+            rezago = 0 if st.accepted_val == winner else lat.rezago_actual.get(aid, 0) + 1
+            lat.muestra_rezago(aid, rezago)
+
     def _event_log(self, var: str) -> None:
         self.log_lines.append(f"{var}={self.db.log_value(var)}")
 
+    def _event_scan(self, cmd: str, desde: str, hasta: Optional[str] = None) -> None:
+        """Scan;desde;hasta (hasta vacío = sin límite) o Prefix;p, vía el índice ordenado."""
+        if cmd == "Prefix":
+            evento, pares = f"Prefix;{desde}", self.db.prefijo(desde)
+        else:
+            evento = f"Scan;{desde}" if hasta is None else f"Scan;{desde};{hasta}"
+            pares = self.db.rango(desde, hasta or None)
+        self.log_lines.append(linea_scan(evento, pares))
+
     def _event_start(self, aid: str) -> None:
         if aid in self.acceptors:
-            self.acceptors[aid].active = True
+            st = self.acceptors[aid]
+            if self.persistencia is not None and not st.active:
+                # El aceptor vuelve con lo que alcanzó a dejar en disco
+                st.promised_n, st.accepted_n, st.accepted_val = self.persistencia.recuperar(aid)
+            st.active = True
 
     def _event_stop(self, aid: str) -> None:
         if aid in self.acceptors:
-            self.acceptors[aid].active = False
+            st = self.acceptors[aid]
+            st.active = False
+            if self.persistencia is not None:
+                # Caída: lo ya respondido queda en disco; al volver se lee de ahí. El
+                # estado en memoria se conserva porque Learn también cuenta a los detenidos.
+                self.persistencia.caida(aid)
 
     # ----------------------- Ejecución ------------------------
+    def _parse_header(self, acc_line: str, prop_line: Optional[str]) -> None:
+        """Inicializa aceptores (primera línea) y proponentes (segunda línea)."""
+        acc_ids = [x.strip() for x in acc_line.split(";") if x.strip()]
+        prop_ids = None
+        if prop_line is not None:
+            prop_ids = [x.strip() for x in prop_line.split(";") if x.strip()]
+        self._init_cluster(acc_ids, prop_ids)
+
+    def _init_cluster(self, acc_ids: Iterable[str], prop_ids: Optional[Iterable[str]]) -> None:
+        self.acceptors = {aid: AcceptorState(active=True) for aid in acc_ids}
+        if self.persistencia is not None:
+            self.persistencia.iniciar(self.acceptors)
+        if prop_ids is not None:
+            self.proposers = set(prop_ids)
+
+    def _dispatch(self, cmd: str, *args: Any) -> None:
+        """Ejecuta un evento ya parseado: (cmd, *argumentos)."""
+        if self.trace is not None:
+            self.trace.tick()
+        if self.latencias is not None:
+            self.latencias.tick()
+        if self.persistencia is not None:
+            self.persistencia.antes_de(cmd)
+        if cmd == "Prepare":
+            proposer, n = args
+            if proposer in self.proposers:
+                self._event_prepare(proposer, n)
+        elif cmd == "Accept":
+            proposer, n, action = args
+            if proposer in self.proposers:
+                self._event_accept(proposer, n, action)
+        elif cmd == "Learn":
+            self._event_learn()
+        elif cmd == "Log":
+            self._event_log(args[0])
+        elif cmd == "Start":
+            self._event_start(args[0])
+        elif cmd == "Stop":
+            self._event_stop(args[0])
+        elif cmd in ("Scan", "Prefix"):
+            self._event_scan(cmd, *args)
+
+    def _process_line(self, line: str) -> None:
+        """Procesa una línea de evento ya limpia."""
+        parts = line.split(";")
+        cmd = parts[0]
+
+        if cmd == "Prepare" and len(parts) == 3:
+            try:
+                n = int(parts[2])
+            except ValueError:
+                n = None
+            if n is not None:
+                self._dispatch(cmd, parts[1], n)
+                return
+
+        elif cmd == "Accept" and len(parts) >= 4:
+            try:
+                n = int(parts[2])
+            except ValueError:
+                n = None
+            if n is not None:
+                self._dispatch(cmd, parts[1], n, ";".join(parts[3:]))
+                return
+
+        elif cmd == "Learn" or (cmd in ("Log", "Start", "Stop", "Prefix") and len(parts) == 2):
+            self._dispatch(cmd, *parts[1:])
+            return
+
+        elif cmd == "Scan" and len(parts) in (2, 3):
+            self._dispatch(cmd, *parts[1:])
+            return
+
+        # Línea inválida: no hace nada, pero cuenta como evento en la traza
+        self._dispatch("")
+
+    # ----------------------- API incremental (sin archivos) -----------------------
+    @classmethod
+    def from_cluster(cls, acceptors: Iterable[str],
+                     proposers: Iterable[str] = ()) -> "PaxosSimulator":
+        """Crea un simulador sin archivo de escenario."""
+        sim = cls("")
+        sim._init_cluster(acceptors, proposers)
+        return sim
+
+    def step(self, event: Union[str, Tuple[Any, ...]]) -> Optional[str]:
+        """
+        Procesa un evento: una línea del escenario ('Prepare;P1;5') o una tupla ya
+        parseada (('Prepare', 'P1', 5), ('Accept', 'P1', 5, 'SET-a-1'), ('Learn',),
+        ('Log', 'a'), ('Scan', 'a', 'c'), ('Prefix', 'a'), ('Start', 'A'), ('Stop', 'A')).
+        Retorna la línea producida si el evento fue un Log.
+        """
+        antes = len(self.log_lines)
+        if isinstance(event, str):
+            line = self._clean(event)
+            if line:
+                self._process_line(line)
+        else:
+            self._dispatch(*event)
+        return self.log_lines[-1] if len(self.log_lines) > antes else None
+
+    def feed(self, events: Iterable[Union[str, Tuple[Any, ...]]]) -> List[str]:
+        """Procesa un lote de eventos; retorna las líneas de Log producidas."""
+        antes = len(self.log_lines)
+        for event in events:
+            self.step(event)
+        return self.log_lines[antes:]
+
+    def read(self, var: str) -> str:
+        """Valor aprendido de var (como Log, pero sin agregarlo a la salida)."""
+        return self.db.log_value(var)
+
+    def snapshot(self) -> Dict[str, str]:
+        """Estado aprendido actual de la base de datos."""
+        return self.db.snapshot()
+
     def run(self) -> Tuple[List[str], Dict[str, str]]:
         with open(self.path, "r", encoding="utf-8") as f:
-            lines = [self._clean(x) for x in f if self._clean(x)]
+            lines = expandir(f, self._clean)
+            acceptors = next(lines, None)
 
-        if not lines:
-            # Sin definiciones → sin logs y BD vacía
-            return self.log_lines, self.db.snapshot()
+            if acceptors is None:
+                # Sin definiciones → sin logs y BD vacía
+                return self.log_lines, self.db.snapshot()
 
-        # Primera línea: aceptores
-        acc_line = lines[0]
-        acc_ids = [x.strip() for x in acc_line.split(";") if x.strip()]
-        self.acceptors = {aid: AcceptorState(active=True) for aid in acc_ids}
+            # Primera línea: aceptores. Segunda línea: proponentes
+            self._parse_header(acceptors, next(lines, None))
 
-        # Segunda línea: proponentes
-        if len(lines) >= 2:
-            prop_line = lines[1]
-            prop_ids = [x.strip() for x in prop_line.split(";") if x.strip()]
-            self.proposers = set(prop_ids)
-            idx = 2
-        else:
-            idx = 1
-            pass
-
-        # Procesar eventos
-        for line in lines[idx:]:
-            parts = line.split(";")
-            cmd = parts[0]
-
-            if cmd == "Prepare" and len(parts) == 3:
-                proposer = parts[1]
-                try:
-                    n = int(parts[2])
-                except ValueError:
-                    continue
-                if proposer in self.proposers:
-                    self._event_prepare(proposer, n)
-
-            elif cmd == "Accept" and len(parts) >= 4:
-                proposer = parts[1]
-                try:
-                    n = int(parts[2])
-                except ValueError:
-                    continue
-                action = ";".join(parts[3:])
-                if proposer in self.proposers:
-                    self._event_accept(proposer, n, action)
-
-            elif cmd == "Learn":
-                self._event_learn()
-
-            elif cmd == "Log" and len(parts) == 2:
-                self._event_log(parts[1])
-
-            elif cmd == "Start" and len(parts) == 2:
-                self._event_start(parts[1])
-
-            elif cmd == "Stop" and len(parts) == 2:
-                self._event_stop(parts[1])
+            # Procesar eventos
+            for line in lines:
+                self._process_line(line)
+
+        if self.persistencia is not None:
+            self.persistencia.sincronizar()
 
         # Importante:
         # - NO añadimos "No hubo logs" aquí.
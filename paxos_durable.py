@@ -0,0 +1,301 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Paxos)
+#
+# Archivo: paxos_durable.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+paxos_durable.py
+
+Persistencia opcional de aceptores. Cada aceptor escribe sus cambios de estado en
+un archivo propio, solo de agregado (`<dir>/<aceptor>.log`), con registros:
+
+    tipo (u8) | n (i64) | largo del valor (u32, 0xFFFFFFFF = None) | valor | crc32 (u32)
+
+    P = promesa (promised_n = n)
+    A = aceptación (accepted_n = n, accepted_val = valor)
+    R = reinicio tras Learn (todo a 0 / None)
+
+Sincronización (fsync) antes de que la respuesta se use:
+
+- "registro": write + fsync por cada registro (lo que haría un aceptor ingenuo).
+- "grupo": los registros se acumulan mientras lleguen eventos del mismo tipo
+  (varios Prepare seguidos = ballots concurrentes) y se hace un fsync por archivo
+  antes del primer evento que consume esas respuestas (Accept, Learn, Stop...).
+  Los reinicios de Learn no son respuestas: viajan en el fsync siguiente.
+
+Stop sincroniza lo que el aceptor ya respondió y cierra su archivo; Start
+reconstruye su estado leyendo el archivo. Un registro final truncado o con crc
+inválido se descarta y se corta el archivo ahí. Al recuperar, si el
+archivo pasó de `max_bytes` se reescribe con un único registro de estado.
+
+Uso:
+    python main.py Paxos casos_Paxos/test_01.txt --persistencia /tmp/aceptores --fsync grupo
+    python paxos_durable.py --rondas 200 --concurrencia 1,4,16
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import random
+import shutil
+import struct
+import tempfile
+import time
+import zlib
+from typing import BinaryIO, Dict, Iterable, List, Optional, Set, Tuple
+
+PROMESA = ord("P")
+ACEPTACION = ord("A")
+REINICIO = ord("R")
+_SIN_VALOR = 0xFFFFFFFF
+_CABECERA = struct.Struct("<BqI")
+_CRC = struct.Struct("<I")
+
+EstadoAceptor = Tuple[int, int, Optional[str]]  # (promised_n, accepted_n, accepted_val)
+
+
+def _registro(tipo: int, n: int, valor: Optional[str]) -> bytes:
+    datos = b"" if valor is None else valor.encode("utf-8")
+    cuerpo = _CABECERA.pack(tipo, n, _SIN_VALOR if valor is None else len(datos)) + datos
+    return cuerpo + _CRC.pack(zlib.crc32(cuerpo))
+
+
+def leer_estado(ruta: str) -> Tuple[EstadoAceptor, int, int]:
+    """
+    Reproduce el archivo de un aceptor. Retorna (estado, bytes válidos, registros);
+    se detiene en el primer registro incompleto o corrupto.
+    """
+    promised = accepted = 0
+    valor: Optional[str] = None
+    try:
+        with open(ruta, "rb") as f:
+            datos = f.read()
+    except FileNotFoundError:
+        return (0, 0, None), 0, 0
+    pos = registros = 0
+    while pos + _CABECERA.size <= len(datos):
+        tipo, n, largo = _CABECERA.unpack_from(datos, pos)
+        fin = pos + _CABECERA.size + (0 if largo == _SIN_VALOR else largo)
+        if fin + _CRC.size > len(datos):
+            break
+        if _CRC.unpack_from(datos, fin)[0] != zlib.crc32(datos[pos:fin]):
+            break
+        if tipo == PROMESA:
+            promised = n
+        elif tipo == ACEPTACION:
+            accepted = n
+            valor = None if largo == _SIN_VALOR else datos[pos + _CABECERA.size:fin].decode("utf-8")
+        elif tipo == REINICIO:
+            promised = accepted = 0
+            valor = None
+        else:
+            break
+        pos = fin + _CRC.size
+        registros += 1
+    return (promised, accepted, valor), pos, registros
+
+
+class Persistencia:
+    """Archivos solo de agregado por aceptor, con fsync por registro o en grupo."""
+
+    MODOS = ("grupo", "registro")
+
+    def __init__(self, directorio: str, modo: str = "grupo", max_bytes: int = 1 << 20) -> None:
+        if modo not in self.MODOS:
+            raise ValueError(f"modo de fsync inválido: {modo} (usa {'/'.join(self.MODOS)})")
+        self.directorio = directorio
+        self.modo = modo
+        self.max_bytes = max_bytes
+        self._archivos: Dict[str, BinaryIO] = {}
+        self._pendientes: Set[str] = set()
+        self._tipo_pendiente: Optional[str] = None
+        self._respuestas_pendientes = False
+        self.registros = 0
+        self.fsyncs = 0
+        self.recuperaciones = 0
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta(self, aid: str) -> str:
+        return os.path.join(self.directorio, f"{aid}.log")
+
+    def iniciar(self, aceptores: Iterable[str]) -> None:
+        """Clúster nuevo (cabecera del escenario): archivos vacíos."""
+        self.cerrar()
+        for aid in aceptores:
+            self._archivos[aid] = open(self._ruta(aid), "wb")
+
+    # ----------------------- Escritura -----------------------
+    def _escribir(self, aid: str, registro: bytes, respuesta: bool = True) -> None:
+        f = self._archivos.get(aid)
+        if f is None:
+            f = self._archivos[aid] = open(self._ruta(aid), "ab")
+        f.write(registro)
+        self.registros += 1
+        if self.modo == "registro":
+            f.flush()
+            os.fsync(f.fileno())
+            self.fsyncs += 1
+        else:
+            self._pendientes.add(aid)
+            self._respuestas_pendientes |= respuesta
+
+    def promesa(self, aid: str, n: int) -> None:
+        self._escribir(aid, _registro(PROMESA, n, None))
+
+    def aceptacion(self, aid: str, n: int, valor: Optional[str]) -> None:
+        self._escribir(aid, _registro(ACEPTACION, n, valor))
+
+    def reinicio(self, aid: str) -> None:
+        self._escribir(aid, _registro(REINICIO, 0, None), respuesta=False)
+
+    def antes_de(self, cmd: str) -> None:
+        """Group commit: se sincroniza al cambiar de tipo de evento."""
+        if self._respuestas_pendientes and cmd != self._tipo_pendiente:
+            self.sincronizar()
+        self._tipo_pendiente = cmd
+
+    def sincronizar(self) -> None:
+        for aid in self._pendientes:
+            f = self._archivos[aid]
+            f.flush()
+            os.fsync(f.fileno())
+            self.fsyncs += 1
+        self._pendientes.clear()
+        self._respuestas_pendientes = False
+
+    # ----------------------- Caída y recuperación -----------------------
+    def caida(self, aid: str) -> None:
+        """El aceptor se detiene: lo ya respondido queda en disco y se cierra el archivo."""
+        self.sincronizar()
+        f = self._archivos.pop(aid, None)
+        if f is not None:
+            f.close()
+
+    def recuperar(self, aid: str) -> EstadoAceptor:
+        """Estado del aceptor leído de su archivo (corta una cola corrupta)."""
+        self.sincronizar()
+        f = self._archivos.pop(aid, None)
+        if f is not None:
+            f.close()
+        ruta = self._ruta(aid)
+        estado, validos, _ = leer_estado(ruta)
+        self.recuperaciones += 1
+        if os.path.exists(ruta) and os.path.getsize(ruta) != validos:
+            with open(ruta, "r+b") as g:
+                g.truncate(validos)
+        if validos > self.max_bytes:
+            self._compactar(aid, estado)
+        return estado
+
+    def _compactar(self, aid: str, estado: EstadoAceptor) -> None:
+        promised, accepted, valor = estado
+        tmp = self._ruta(aid) + ".tmp"
+        with open(tmp, "wb") as f:
+            if accepted or valor is not None:
+                f.write(_registro(ACEPTACION, accepted, valor))
+            if promised:
+                f.write(_registro(PROMESA, promised, None))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._ruta(aid))
+
+    def cerrar(self) -> None:
+        self.sincronizar()
+        for f in self._archivos.values():
+            f.close()
+        self._archivos.clear()
+
+    # Checkpoint (pickle): lo respondido se sincroniza y se guarda el largo de cada
+    # archivo abierto; al reanudar se cortan ahí (lo escrito después no ocurrió)
+    def __getstate__(self) -> Dict[str, object]:
+        self.sincronizar()
+        estado = dict(self.__dict__)
+        estado["_archivos"] = {aid: f.tell() for aid, f in self._archivos.items()}
+        return estado
+
+    def __setstate__(self, estado: Dict[str, object]) -> None:
+        largos = estado.pop("_archivos")
+        self.__dict__.update(estado)
+        self._archivos = {}
+        for aid, largo in largos.items():
+            f = self._archivos[aid] = open(self._ruta(aid), "r+b")
+            f.truncate(largo)
+            f.seek(largo)
+
+
+# ------------------------------------------------------------------------------------
+# Benchmark: sin persistencia vs fsync por registro vs group commit
+# ------------------------------------------------------------------------------------
+def carga(rondas: int, concurrencia: int, aceptores: int = 5, seed: int = 0) -> List[str]:
+    """Rondas con `concurrencia` Prepare seguidos (ballots concurrentes), Accept y Learn."""
+    rng = random.Random(seed)
+    ids = [f"A{i}" for i in range(aceptores)]
+    props = [f"P{i}" for i in range(concurrencia)]
+    lineas = [";".join(ids), ";".join(props)]
+    n = 0
+    for r in range(rondas):
+        for p in props:
+            n += 1
+            lineas.append(f"Prepare;{p};{n}")
+        lineas.append(f"Accept;{props[-1]};{n};SET-k{r % 100}-{r}")
+        lineas.append("Learn")
+        if rng.random() < 0.05:
+            aid = rng.choice(ids)
+            lineas.extend((f"Stop;{aid}", f"Log;k{r % 100}", f"Start;{aid}"))
+    return lineas
+
+
+def _correr(lineas: List[str], modo: Optional[str], directorio: str
+            ) -> Tuple[float, List[str], Dict[str, str], Optional[Persistencia]]:
+    from paxos import PaxosSimulator
+
+    sim = PaxosSimulator()
+    if modo is not None:
+        sim.persistencia = Persistencia(directorio, modo)
+    inicio = time.perf_counter()
+    sim._parse_header(lineas[0], lineas[1])
+    for line in lineas[2:]:
+        sim._process_line(line)
+    if sim.persistencia is not None:
+        sim.persistencia.cerrar()
+    return time.perf_counter() - inicio, sim.log_lines, sim.db.snapshot(), sim.persistencia
+
+
+def benchmark(rondas: int, concurrencias: Iterable[int], directorio: Optional[str]) -> None:
+    base = directorio or tempfile.mkdtemp(prefix="aceptores_")
+    print(f"directorio: {base}")
+    print(f"{'conc.':>5} | {'modo':>9} | {'eventos/s':>10} | {'fsyncs':>7} | "
+          f"{'registros':>9} | igual")
+    try:
+        for c in concurrencias:
+            lineas = carga(rondas, c)
+            eventos = len(lineas) - 2
+            t, out, db, _ = _correr(lineas, None, base)
+            print(f"{c:5d} | {'memoria':>9} | {eventos / t:10.0f} | {'-':>7} | {'-':>9} |")
+            for modo in Persistencia.MODOS:
+                t_m, out_m, db_m, p = _correr(lineas, modo, os.path.join(base, modo))
+                igual = out_m == out and db_m == db
+                print(f"{c:5d} | {modo:>9} | {eventos / t_m:10.0f} | {p.fsyncs:7d} | "
+                      f"{p.registros:9d} | {'sí' if igual else 'NO'}")
+    finally:
+        if directorio is None:
+            shutil.rmtree(base, ignore_errors=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Aceptores Paxos con persistencia")
+    parser.add_argument("--rondas", type=int, default=200)
+    parser.add_argument("--concurrencia", default="1,4,16")
+    parser.add_argument("--directorio", help="dónde escribir (por defecto, temporal)")
+    args = parser.parse_args()
+    benchmark(args.rondas, [int(x) for x in args.concurrencia.split(",")], args.directorio)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
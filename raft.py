@@ -9,30 +9,56 @@
 # ------------------------------------------------------------------------------------
 
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 from database2 import Database
-
-
-@dataclass
-class NodeState:
-    active: bool = True
-    timeout: int = 0
-    term: int = 0
-    log: List[Tuple[int, str]] = field(default_factory=list)
-
-
-class RaftSimulator:
+from escenario import expandir
+from latencias import Latencias
+from raft_aplicacion import aplicar
+from raft_eleccion import ModeloEleccion
+from raft_eventos import EventosRaft
+from raft_learners import Learner
+from raft_lectura import ReadCache
+from raft_log import ColumnarLog, Entry, NodeState, StringTable
+from traza import COMMIT, ELECCION, TERM, TraceRecorder
+from raft_lotes import ReplicationStats, SendQueue
+
+LogType = Union[List[Entry], ColumnarLog]
+
+class RaftSimulator(EventosRaft):
     """Simulador detallado de Raft con depuración completa."""
 
-    def __init__(self, path: str) -> None:
+    def __init__(self, path: str = "", batch_size: int = 1, linger: float = 0.0,
+                 compact_log: bool = False, max_staleness: int = 0,
+                 election: Optional[ModeloEleccion] = None, apply_workers: int = 0) -> None:
         self.path = path
         self.db = Database()
         self.nodes: Dict[str, NodeState] = {}
+        # Réplicas no votantes: fuera de nodes, así no cuentan para mayoría ni elección
+        self.learners: Dict[str, Learner] = {}
+        self.max_staleness = max_staleness
         self.leader: Optional[str] = None
+        # Elección simulada con timeouts aleatorios (None: máximo global instantáneo)
+        self.election = election
         self.term: int = 0
         self.commit_index: int = 0
         self.last_applied: int = 0
+        self.log_lines: List[str] = []
+        # Lecturas: se recalcula el commit solo si algo cambió desde el último cálculo
+        self.reads = ReadCache()
+        self._dirty: bool = True
+        self._db_applied: int = 0
+        # Group commit de Send y estadísticas de replicación
+        self.sends = SendQueue(batch_size, linger)
+        self.stats = ReplicationStats()
+        # Log columnar con acciones internadas (tabla compartida por todos los nodos).
+        # Cada entrada lleva su acción ya parseada: las reconstrucciones de BD la reusan
+        self._strings: Optional[StringTable] = StringTable() if compact_log else None
+        # Reconstrucciones grandes de la BD se aplican particionadas por clave
+        self.apply_workers = apply_workers
+        # Traza binaria opcional de transiciones internas (ver traza.py)
+        self.trace: Optional[TraceRecorder] = None
+        # Latencia de commit/aplicación y rezago por nodo (ver latencias.py)
+        self.latencias: Optional[Latencias] = None
 
     @staticmethod
     def _clean(line: str) -> str:
@@ -51,6 +77,11 @@ class RaftSimulator:
             parts[2] = parts[2].strip()
         return "-".join(parts)
 
+    def _new_log(self, entries: Iterable[Entry] = ()) -> LogType:
+        if self._strings is not None:
+            return ColumnarLog(entries, self._strings)
+        return list(entries)
+
     def _active_ids(self) -> List[str]:
         return [nid for nid, st in self.nodes.items() if st.active]
 
@@ -60,9 +91,7 @@ class RaftSimulator:
     # print(f"[DEBUG] Calculando mayoría: activos={active} → mayoría={maj}")
         return maj
 
-      # -------------------------------------------------------------------------
-  # -------------------------------------------------------------------------
-       # -------------------------------------------------------------------------
+    # -------------------------------------------------------------------------
     def _pick_leader(self) -> None:
         # print("\n[DEBUG] ===== ELECCIÓN DE NUEVO LÍDER =====")
         activos = self._active_ids()
@@ -73,24 +102,37 @@ class RaftSimulator:
             self.leader = None
             return
 
-        # 🧮 Selección de líder con mayor term, largo de log, menor timeout
-        candidato = max(
-            activos,
-            key=lambda nid: (
-                self.nodes[nid].log[-1][0] if self.nodes[nid].log else 0,
-                len(self.nodes[nid].log),
-                -self.nodes[nid].timeout
+        if self.election is None:
+            # 🧮 Selección de líder con mayor term, largo de log, menor timeout
+            candidato = max(
+                activos,
+                key=lambda nid: (
+                    self.nodes[nid].log[-1][0] if self.nodes[nid].log else 0,
+                    len(self.nodes[nid].log),
+                    -self.nodes[nid].timeout
+                )
             )
-        )
+            self.term += 1
+        else:
+            # RequestVote con timeouts: puede consumir varios terms (split votes)
+            res = self.election.elegir(self.nodes, activos, self.term)
+            if res.lider is None:
+                # Sin líder, pero los terms de las candidaturas fallidas ya se usaron
+                self.term = max(self.term, res.term)
+                self.leader = None
+                return
+            candidato, self.term = res.lider, res.term
 
-        self.term += 1
         self.leader = candidato
         self.nodes[self.leader].term = self.term
+        if self.trace is not None:
+            self.trace.emit(TERM, self.leader, self.term)
     # print(f"[DEBUG] 🏆 Líder elegido: {self.leader} (term={self.term})")
 
         maj_total = self._majority()
         max_len = max((len(self.nodes[nid].log) for nid in activos), default=0)
-        committed: List[Tuple[int, str]] = []
+        committed: List[Entry] = []
+        registros = {}
 
     # print(f"[DEBUG] Iniciando reconstrucción de log común, longitud máxima={max_len}")
 
@@ -99,7 +141,7 @@ class RaftSimulator:
             for nid in activos:
                 st = self.nodes[nid]
                 if len(st.log) > i:
-                    term, accion = st.log[i]
+                    _, accion, registros[accion] = st.log[i]
                     acciones[accion] = acciones.get(accion, 0) + 1
                     # print(f"[DEBUG] Nodo {nid} → log[{i}]={st.log[i]}")
             if not acciones:
@@ -116,7 +158,7 @@ class RaftSimulator:
                     if len(self.nodes[nid].log) > i and self.nodes[nid].log[i][1] == best
                 ]
                 term_comun = max(set(terminos), key=terminos.count) if terminos else self.term
-                committed.append((term_comun, best))
+                committed.append((term_comun, best, registros[best]))
                 # print(f"[DEBUG] ✅ Acción '{best}' aceptada con término común={term_comun}")
             else:
                 # print(
@@ -146,7 +188,7 @@ class RaftSimulator:
 
         # Sincronizar todos los nodos
         for nid, st in self.nodes.items():
-            st.log = final_log.copy()
+            st.log = self._new_log(final_log)
             # print(f"[DEBUG] Nodo {nid} sincronizado → log={st.log}")
 
         # ------------------------------------------------------------------
@@ -154,20 +196,26 @@ class RaftSimulator:
         # ------------------------------------------------------------------
         if final_log != prev_log:
             # print("[DEBUG][DB] Log comprometido cambió → reaplicando BD desde cero")
-            self.db = Database()
-            for term, act in final_log:
-                # print(f"[DEBUG][DB] Aplicando a BD: ({term}, {act})")
-                self.db.apply_action(act)
+            self._rebuild_db(final_log)
         elif len(final_log) < len(prev_log):
             # print("[DEBUG][DB] ⚠️ Log truncado detectado → reaplicando BD (forzado)")
-            self.db = Database()
-            for term, act in final_log:
-                # print(f"[DEBUG][DB] Reaplicando tras truncamiento: ({term}, {act})")
-                self.db.apply_action(act)
+            self._rebuild_db(final_log)
         else:
             # print("[DEBUG][DB] Log comprometido sin cambios → se conserva estado BD actual")
             pass
 
+        # Cambió el líder: la caché de lecturas ya no es confiable
+        self.reads.clear()
+        self._db_applied = len(final_log) if final_log != prev_log else -1
+
+        if self.trace is not None:
+            self.trace.emit(ELECCION, self.leader, self.term, len(final_log))
+            if len(final_log) != self.commit_index:
+                self.trace.emit(COMMIT, self.leader, self.term, len(final_log), self.commit_index)
+        if self.latencias is not None:
+            self._medir_commit(final_log[self.commit_index:])
+            if final_log != prev_log:
+                self.latencias.aplicadas()  # la BD se reconstruyó arriba
         self.commit_index = len(final_log)
         self.last_applied = self.commit_index
     # print(f"[DEBUG][DB] Snapshot final tras elección: {self.db.snapshot()}")
@@ -175,83 +223,19 @@ class RaftSimulator:
     # print("[DEBUG] ===== FIN ELECCIÓN LÍDER =====\n")
 
         self._recompute_commit_and_apply()
+        self._sync_learners(None)
 
     # -------------------------------------------------------------------------
-    def _event_start(self, nid: str) -> None:
-        # print(f"[EVENT] Start de nodo {nid}")
-        if nid not in self.nodes:
-            self.nodes[nid] = NodeState(True, 0, 0)
-        else:
-            self.nodes[nid].active = True
-
-        if self.leader and self.leader in self.nodes:
-            leader_log = self.nodes[self.leader].log
-            if leader_log and self.nodes[nid].log != leader_log:
-                # print(f"[DEBUG] Nodo {nid} sincronizado con log líder {self.leader}")
-                self.nodes[nid].log = leader_log.copy()
-        else:
-            self._pick_leader()
-
-        self._recompute_commit_and_apply()
-
-    def _event_stop(self, nid: str) -> None:
-        # print(f"[EVENT] Stop de nodo {nid}")
-        if nid in self.nodes:
-            was_leader = nid == self.leader
-            self.nodes[nid].active = False
-            if was_leader:
-                # print("[DEBUG] 🚫 El líder se detuvo. Reelección forzada.")
-                self._pick_leader()
-                if self.leader:
-                    self._recompute_commit_and_apply()
-
-    # -------------------------------------------------------------------------
-    def _send(self, action: str) -> None:
-        # print(f"[SEND] Acción enviada: {action}")
-        action = self._normalize_key(action)
-        if not self.leader or not self.nodes.get(self.leader, NodeState()).active:
-            # print("[DEBUG] ⚠️ No hay líder activo. Acción ignorada.")
-            return
-        st = self.nodes[self.leader]
-        st.log.append((self.term, action))
-    # print(f"[DEBUG] Log del líder actualizado: {st.log}")
-
-    def _spread(self, targets: Optional[List[str]]) -> None:
-        # print(f"[SPREAD] Iniciando propagación → {targets}")
-        if not self.leader or self.leader not in self.nodes:
-            # print("[DEBUG] ❌ No hay líder válido para spread.")
-            return
-        if not self.nodes[self.leader].active:
-            # print("[DEBUG] ⚠️ El líder actual está inactivo.")
-            return
-
-        leader_log = self.nodes[self.leader].log
-        if not leader_log:
-            # print("[DEBUG] ℹ️ Log líder vacío, nada que propagar.")
-            return
-
-        dests = (
-            [nid for nid in self._active_ids() if nid != self.leader]
-            if not targets
-            else [t for t in targets if t in self._active_ids() and t != self.leader]
-        )
-
-    # print(f"[DEBUG] Propagando log {leader_log} hacia {dests}")
-        for d in dests:
-            self.nodes[d].log = leader_log.copy()
-            # print(f"[DEBUG] Nodo {d} actualizado con log: {self.nodes[d].log}")
-
-        self._recompute_commit_and_apply()
+    def _rebuild_db(self, entries: Iterable[Entry]) -> None:
+        """Reconstruye la BD desde cero aplicando los registros ya parseados."""
+        previa, self.db = self.db, Database()
+        aplicar(self.db, [rec for _, _, rec in entries], self.apply_workers)
+        # El índice ordenado se arrastra: solo cambian las claves nuevas o borradas
+        self.db.heredar_indice(previa)
 
-    def _event_log(self, var: str, out: List[str]) -> None:
-        # print(f"[LOG] Consultando variable '{var}'")
-        self._recompute_commit_and_apply()
-        val = self.db.log_value(var)
-        out.append(f"{var}={val}")
-
-    # -------------------------------------------------------------------------
     def _recompute_commit_and_apply(self) -> None:
         # print(f"[DEBUG] === RECOMPUTE COMMIT === líder={self.leader}")
+        self._dirty = False
         if not self.leader or self.leader not in self.nodes:
             # print("[DEBUG] ❌ No hay líder válido.")
             return
@@ -266,14 +250,14 @@ class RaftSimulator:
         activos = self._active_ids()
         new_commit = self.commit_index
 
-        for i, (term_entry, action) in enumerate(leader_log):
+        # Todo log es prefijo del log del líder, así que basta escanear desde el commit
+        for i in range(self.commit_index, len(leader_log)):
+            action = leader_log[i][1]
             count = sum(
                 1 for nid in activos
                 if len(self.nodes[nid].log) > i and self.nodes[nid].log[i][1] == action
             )
-            # print(
-            # f"[DEBUG] Entrada {i}: acción={action}, term={term_entry}, replicada en
-            # {count} nodos")
+            # print(f"[DEBUG] Entrada {i}: acción={action}, replicada en {count} nodos")
             if count >= majority:
                 new_commit = i + 1
             else:
@@ -281,62 +265,53 @@ class RaftSimulator:
 
         if new_commit > self.commit_index:
             # print(f"[DEBUG] 🌀 Commit actualizado: {self.commit_index} → {new_commit}")
+            self.stats.committed += new_commit - self.commit_index
+            if self.trace is not None:
+                self.trace.emit(COMMIT, self.leader, self.term, new_commit, self.commit_index)
+            if self.latencias is not None:
+                self._medir_commit(leader_log[self.commit_index:new_commit])
             self.commit_index = new_commit
             self.last_applied = new_commit
             # print("[DEBUG] 🔁 Reaplicando BD (desde cero):")
-            self.db = Database()
-            for _, act in leader_log[:self.commit_index]:
-                # print(f"    [APPLY] {act}")
-                self.db.apply_action(act)
+            if self._db_applied < 0:
+                self.reads.clear()
+            else:
+                self.reads.invalidate(leader_log[self._db_applied:new_commit])
+            self._db_applied = new_commit
+            self._rebuild_db(leader_log[:self.commit_index])
+            if self.latencias is not None:
+                self.latencias.aplicadas()
             # print(f"[DEBUG][DB] Snapshot: {self.db.snapshot()}")
         else:
             # print(f"[DEBUG] ℹ️ Commit ya está actualizado en {self.commit_index}")
             pass
     # print(f"[DEBUG] FIN commit_index={self.commit_index}")
 
+    def _medir_commit(self, entries: Iterable[Entry]) -> None:
+        """Registra la latencia de las entradas recién comprometidas y el rezago."""
+        lat = self.latencias
+        for term, action, _ in entries:
+            lat.comprometida((term, action))
+        leader_len = len(self.nodes[self.leader].log)
+        for nid, st in self.nodes.items():
+            lat.muestra_rezago(nid, max(0, leader_len - len(st.log)))
+
     # -------------------------------------------------------------------------
     def run(self) -> Tuple[List[str], Dict[str, str]]:
         # print(f"[RUN] Ejecutando archivo de entrada: {self.path}")
         with open(self.path, "r", encoding="utf-8") as f:
-            raw_lines = f.readlines()
-        lines = [self._clean(x) for x in raw_lines if self._clean(x)]
-        out: List[str] = []
-        if not lines:
-            # print("[RUN] ⚠️ Archivo vacío.")
-            return out, self.db.snapshot()
-
-        node_specs = [x.strip() for x in lines[0].split(";") if x.strip()]
-    # print(f"[INIT] Nodos iniciales: {node_specs}")
-        for tok in node_specs:
-            if "," in tok:
-                nid, t = tok.split(",", 1)
-                try:
-                    timeout = int(t)
-                except ValueError:
-                    timeout = 0
-            else:
-                nid, timeout = tok, 0
-            self.nodes[nid] = NodeState(True, timeout, 0)
-            # print(f"[INIT] Nodo {nid} creado (timeout={timeout})")
+            lines = expandir(f, self._clean)
+            header = next(lines, None)
+            if header is None:
+                # print("[RUN] ⚠️ Archivo vacío.")
+                return self.log_lines, self.db.snapshot()
 
-        self._pick_leader()
-        self._recompute_commit_and_apply()
+            self._parse_header(header)
 
-        for line in lines[1:]:
-            # print(f"[EVENT] Procesando línea: {line}")
-            if line.startswith("Send;"):
-                self._send(line.split(";", 1)[1].strip())
-            elif line.startswith("Spread;"):
-                inside = line.split(";", 1)[1].strip().strip("[]")
-                targets = [t.strip() for t in inside.split(",") if t.strip()]
-                self._spread(targets)
-            elif line.startswith("Start;"):
-                self._event_start(line.split(";", 1)[1].strip())
-            elif line.startswith("Stop;"):
-                self._event_stop(line.split(";", 1)[1].strip())
-            elif line.startswith("Log;"):
-                self._event_log(line.split(";", 1)[1].strip(), out)
+            for line in lines:
+                self._process_line(line)
 
+        self._flush_sends()
         self._recompute_commit_and_apply()
     # print(f"[RUN] ✅ Finalizado. Estado BD final: {self.db.snapshot()}")
-        return out, self.db.snapshot()
+        return self.log_lines, self.db.snapshot()
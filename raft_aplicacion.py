@@ -0,0 +1,177 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Raft)
+#
+# Archivo: raft_aplicacion.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+raft_aplicacion.py
+
+Aplicación paralela de entradas comprometidas, particionada por clave. SET/ADD/DEL
+sobre claves distintas son independientes; la única dependencia entre claves es
+DEL, que en database2 borra la primera clave que coincide sin distinguir
+mayúsculas. Por eso se agrupa por clave plegada (`fold_key`): dentro de un grupo
+se conserva el orden del log y los grupos se reparten entre procesos.
+
+Para que `snapshot()` quede idéntico (mismo orden de inserción del dict) cada
+operación lleva su posición en el lote como sello: SET reinserta la clave (sello
+nuevo), ADD solo si la clave no existía, DEL la saca. Al unir, las claves vivas se
+insertan ordenadas por sello.
+
+Lotes chicos (menos de `min_lote` entradas) se aplican secuencialmente: el costo de
+enviar los registros a otro proceso supera al de aplicarlos.
+
+Uso (benchmark):
+    python raft_aplicacion.py --entradas 400000 --claves 5000 --workers 1,2,4,8
+"""
+
+from __future__ import annotations
+import argparse
+import atexit
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from acciones import OP_ADD, OP_NOP, OP_SET, Accion
+from database2 import Database
+from raft_lectura import fold_key
+
+Sellado = Tuple[int, str, str]                  # (sello, clave, valor)
+Grupo = Tuple[List[Sellado], List[Tuple[int, Accion]]]  # (estado base, operaciones)
+
+_POOLS: Dict[int, ProcessPoolExecutor] = {}
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    """Pool compartido por tamaño (crearlo en cada reconstrucción sería más caro)."""
+    pool = _POOLS.get(workers)
+    if pool is None:
+        pool = _POOLS[workers] = ProcessPoolExecutor(max_workers=workers)
+    return pool
+
+
+@atexit.register
+def _cerrar_pools() -> None:
+    # aplicar() espera todos sus resultados, así que al salir los procesos están
+    # ociosos y esperarlos es inmediato (cancel_futures es de Python 3.9+)
+    for pool in _POOLS.values():
+        pool.shutdown(wait=True)
+    _POOLS.clear()
+
+
+def aplicar_grupos(grupos: List[Grupo]) -> List[Sellado]:
+    """Reproduce cada grupo sobre una BD propia; retorna sus claves vivas selladas."""
+    vivas: List[Sellado] = []
+    for base, ops in grupos:
+        # BD descartable: solo se leen sus claves vivas, no su índice
+        db = Database()
+        sellos: Dict[str, int] = {}
+        for sello, key, value in base:
+            db.data[key] = value
+            sellos[key] = sello
+        for sello, rec in ops:
+            if rec.op == OP_SET or (rec.op == OP_ADD and rec.key not in db.data):
+                sellos[rec.key] = sello
+            db.apply_record(rec)
+        vivas.extend((sellos[k], k, v) for k, v in db.data.items())
+    return vivas
+
+
+def particionar(db: Database, records: Iterable[Accion], particiones: int
+                ) -> List[List[Grupo]]:
+    """Agrupa por clave plegada y reparte los grupos en `particiones` listas."""
+    grupos: Dict[str, Grupo] = {}
+    # El estado previo queda antes que cualquier operación nueva
+    n_base = len(db.data)
+    for i, (key, value) in enumerate(db.data.items()):
+        grupos.setdefault(fold_key(key), ([], []))[0].append((i - n_base, key, value))
+    for i, rec in enumerate(records):
+        if rec.op != OP_NOP:
+            grupos.setdefault(fold_key(rec.key), ([], []))[1].append((i, rec))
+
+    particiones_: List[List[Grupo]] = [[] for _ in range(particiones)]
+    # Reparto por tamaño (mayor primero, a la partición más liviana)
+    cargas = [0] * particiones
+    for grupo in sorted(grupos.values(), key=lambda g: -(len(g[0]) + len(g[1]))):
+        j = cargas.index(min(cargas))
+        particiones_[j].append(grupo)
+        cargas[j] += len(grupo[0]) + len(grupo[1])
+    return [p for p in particiones_ if p]
+
+
+def aplicar(db: Database, records: Sequence[Accion], workers: int = 0,
+            min_lote: int = 4096, pool: Optional[ProcessPoolExecutor] = None) -> None:
+    """Aplica `records` sobre `db` con el mismo resultado (y orden) que uno a uno."""
+    if workers <= 1 or len(records) < min_lote:
+        apply = db.apply_record
+        for rec in records:
+            apply(rec)
+        return
+
+    particiones = particionar(db, records, workers)
+    pool = pool or _pool(workers)
+    vivas: List[Sellado] = []
+    for parcial in pool.map(aplicar_grupos, particiones):
+        vivas.extend(parcial)
+    vivas.sort()
+    previas, db.data = db.data, {key: value for _, key, value in vivas}
+    db.reindexar(previas)
+
+
+# ------------------------------------------------------------------------------------
+# Benchmark: reconstrucción secuencial vs particionada
+# ------------------------------------------------------------------------------------
+def _carga(n: int, claves: int, seed: int = 0) -> List[Accion]:
+    rng = random.Random(seed)
+    acciones = []
+    for i in range(n):
+        k = f"k_{rng.randrange(claves)}" if rng.random() < 0.9 else f"K {rng.randrange(claves)}"
+        r = rng.random()
+        if r < 0.6:
+            acciones.append(f"SET-{k}-{i}")
+        elif r < 0.9:
+            acciones.append(f"ADD-{k}-{i % 7}")
+        else:
+            acciones.append(f"DEL-{k}")
+    return [Database.parse_action(a) for a in acciones]
+
+
+def benchmark(entradas: int, claves: int, workers: Sequence[int]) -> None:
+    records = _carga(entradas, claves)
+    base = Database()
+    inicio = time.perf_counter()
+    aplicar(base, records)
+    t_seq = time.perf_counter() - inicio
+    print(f"secuencial | {t_seq:6.2f}s | {entradas / t_seq:10.0f} entradas/s")
+    esperado = list(base.snapshot().items())
+
+    for w in workers:
+        if w <= 1:
+            continue
+        _pool(w)  # arranque del pool fuera de la medición
+        db = Database()
+        inicio = time.perf_counter()
+        aplicar(db, records, workers=w, min_lote=0)
+        t = time.perf_counter() - inicio
+        igual = list(db.snapshot().items()) == esperado
+        print(f"workers={w:2d} | {t:6.2f}s | {entradas / t:10.0f} entradas/s | "
+              f"{t_seq / t:5.2f}x | snapshot idéntico: {'sí' if igual else 'NO'}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Aplicación paralela por clave (Raft)")
+    parser.add_argument("--entradas", type=int, default=400_000)
+    parser.add_argument("--claves", type=int, default=5000)
+    parser.add_argument("--workers", default="1,2,4,8")
+    args = parser.parse_args()
+    benchmark(args.entradas, args.claves, [int(x) for x in args.workers.split(",")])
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
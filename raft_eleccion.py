@@ -0,0 +1,275 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Raft)
+#
+# Archivo: raft_eleccion.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+raft_eleccion.py
+
+Modelo de elección de Raft con timeouts aleatorios. En vez del `max` global e
+instantáneo de `_pick_leader`, se simula (con eventos discretos, tiempo en ms):
+
+- Cada nodo activo dispara su elección tras `base + timeout + U(0, spread)` ms,
+  donde `timeout` es el declarado en la cabecera del escenario.
+- El candidato incrementa su term, vota por sí mismo y envía RequestVote; cada
+  mensaje tarda U(latencia) ms. Un nodo vota una vez por term y solo si el log del
+  candidato está al menos tan al día como el suyo (último term, largo).
+- Si dos candidatos se disparan casi juntos los votos se reparten (split vote):
+  nadie llega a mayoría, el timer vence de nuevo y se pasa a otro term.
+- Con pre-vote, el candidato primero pregunta si lo votarían en term+1 sin cambiar
+  su term; un nodo con log atrasado no logra mayoría y no infla el term del resto.
+
+Uso en el simulador:
+    RaftSimulator(path, election=ModeloEleccion(prevote=True, seed=1))
+    python main.py Raft casos_Raft/test_01.txt --eleccion prevote
+
+Benchmark:
+    python raft_eleccion.py --nodos 3,5,9,15 --spread 0,10,50,150 --pruebas 200
+"""
+
+from __future__ import annotations
+import argparse
+import heapq
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+UltimoLog = Tuple[int, int]  # (term de la última entrada, largo)
+
+
+@dataclass
+class ResultadoEleccion:
+    lider: Optional[str]
+    term: int          # term del líder elegido
+    perdidos: int      # terms iniciados que no eligieron líder
+    tiempo: float      # ms desde la caída del líder hasta tener uno nuevo
+    candidaturas: int  # RequestVote iniciados (excluye pre-votes fallidos)
+    prevotos_fallidos: int = 0
+
+
+@dataclass
+class _Nodo:
+    term: int
+    ultimo: UltimoLog
+    voto: Optional[str] = None
+    candidato: bool = False
+    prevotando: bool = False
+    votos: Set[str] = field(default_factory=set)
+    epoca: int = 0  # invalida timers reprogramados
+
+
+class ModeloEleccion:
+    """Elección por timeouts aleatorios con RequestVote, split votes y pre-vote."""
+
+    def __init__(self, base: float = 150.0, spread: float = 150.0,
+                 latencia: Tuple[float, float] = (1.0, 10.0), prevote: bool = True,
+                 seed: Optional[int] = None, max_tiempo: float = 60_000.0) -> None:
+        self.base = base
+        self.spread = spread
+        self.latencia = latencia
+        self.prevote = prevote
+        self.max_tiempo = max_tiempo
+        self.rng = random.Random(seed)
+        self.historial: List[ResultadoEleccion] = []
+
+    def _retardo(self) -> float:
+        return self.rng.uniform(*self.latencia)
+
+    def _timer(self, timeout: int) -> float:
+        return self.base + timeout + self.rng.uniform(0.0, self.spread)
+
+    def elegir(self, nodos: Dict[str, Any], activos: Sequence[str],
+               term: int) -> ResultadoEleccion:
+        """
+        Simula una elección entre `activos` partiendo del term global `term`.
+        `nodos` mapea id → NodeState (se usan `timeout` y `log`).
+        """
+        estado = {
+            nid: _Nodo(term, (nodos[nid].log[-1][0], len(nodos[nid].log))
+                       if nodos[nid].log else (0, 0))
+            for nid in activos
+        }
+        res = self.simular({nid: nodos[nid].timeout for nid in activos}, estado, term)
+        self.historial.append(res)
+        return res
+
+    def simular(self, timeouts: Dict[str, int], estado: Dict[str, _Nodo],
+                term: int) -> ResultadoEleccion:
+        mayoria = len(estado) // 2 + 1
+        cola: List[Tuple[float, int, str, tuple]] = []
+        seq = 0
+
+        def push(t: float, tipo: str, datos: tuple) -> None:
+            nonlocal seq
+            heapq.heappush(cola, (t, seq, tipo, datos))
+            seq += 1
+
+        def rearmar(nid: str, ahora: float) -> None:
+            st = estado[nid]
+            st.epoca += 1
+            push(ahora + self._timer(timeouts[nid]), "timeout", (nid, st.epoca))
+
+        def difundir(origen: str, ahora: float, tipo: str, datos: tuple) -> None:
+            for dest in estado:
+                if dest != origen:
+                    push(ahora + self._retardo(), tipo, (dest,) + datos)
+
+        for nid in estado:
+            rearmar(nid, 0.0)
+
+        candidaturas = prevotos_fallidos = 0
+        terms_iniciados: Set[int] = set()
+        while cola:
+            ahora, _, tipo, datos = heapq.heappop(cola)
+            if ahora > self.max_tiempo:
+                break
+
+            if tipo == "timeout":
+                nid, epoca = datos
+                st = estado[nid]
+                if epoca != st.epoca:
+                    continue
+                if st.prevotando:
+                    prevotos_fallidos += 1
+                rearmar(nid, ahora)
+                st.candidato = False
+                st.votos = {nid}
+                if self.prevote:
+                    st.prevotando = True
+                    difundir(nid, ahora, "prevoto", (nid, st.term + 1, st.ultimo))
+                else:
+                    self._candidatear(nid, st, ahora, difundir)
+                    candidaturas += 1
+                    terms_iniciados.add(st.term)
+                if len(st.votos) >= mayoria:  # clúster de un nodo
+                    if st.prevotando:
+                        self._candidatear(nid, st, ahora, difundir)
+                        candidaturas += 1
+                        terms_iniciados.add(st.term)
+                    return self._fin(nid, st.term, terms_iniciados, ahora,
+                                     candidaturas, prevotos_fallidos)
+
+            elif tipo == "prevoto":
+                dest, cand, t, ultimo = datos
+                st = estado[dest]
+                ok = t > st.term and ultimo >= st.ultimo
+                push(ahora + self._retardo(), "r_prevoto", (cand, dest, t, ok))
+
+            elif tipo == "r_prevoto":
+                cand, votante, t, ok = datos
+                st = estado[cand]
+                if not (st.prevotando and ok and t == st.term + 1):
+                    continue
+                st.votos.add(votante)
+                if len(st.votos) >= mayoria:
+                    self._candidatear(cand, st, ahora, difundir)
+                    candidaturas += 1
+                    terms_iniciados.add(st.term)
+                    rearmar(cand, ahora)
+
+            elif tipo == "voto":
+                dest, cand, t, ultimo = datos
+                st = estado[dest]
+                if t > st.term:
+                    st.term, st.voto = t, None
+                    st.candidato = st.prevotando = False
+                ok = t == st.term and st.voto in (None, cand) and ultimo >= st.ultimo
+                if ok:
+                    st.voto = cand
+                    rearmar(dest, ahora)  # votar reinicia el timer del seguidor
+                push(ahora + self._retardo(), "r_voto", (cand, dest, t, ok, st.term))
+
+            elif tipo == "r_voto":
+                cand, votante, t, ok, term_votante = datos
+                st = estado[cand]
+                if term_votante > st.term:
+                    # El votante está en un term mayor: el candidato vuelve a seguidor
+                    st.term, st.voto = term_votante, None
+                    st.candidato = st.prevotando = False
+                    continue
+                if not (st.candidato and ok and t == st.term):
+                    continue
+                st.votos.add(votante)
+                if len(st.votos) >= mayoria:
+                    return self._fin(cand, st.term, terms_iniciados, ahora,
+                                     candidaturas, prevotos_fallidos)
+
+        return ResultadoEleccion(None, max((s.term for s in estado.values()), default=term),
+                                 len(terms_iniciados), self.max_tiempo, candidaturas,
+                                 prevotos_fallidos)
+
+    @staticmethod
+    def _candidatear(nid: str, st: _Nodo, ahora: float, difundir) -> None:
+        st.prevotando = False
+        st.candidato = True
+        st.term += 1
+        st.voto = nid
+        st.votos = {nid}
+        difundir(nid, ahora, "voto", (nid, st.term, st.ultimo))
+
+    @staticmethod
+    def _fin(lider: str, term_lider: int, terms: Set[int], ahora: float,
+             candidaturas: int, prevotos_fallidos: int) -> ResultadoEleccion:
+        return ResultadoEleccion(lider, term_lider, len(terms - {term_lider}), ahora, candidaturas,
+                                 prevotos_fallidos)
+
+
+# ------------------------------------------------------------------------------------
+# Benchmark: convergencia y terms perdidos vs tamaño del clúster y spread
+# ------------------------------------------------------------------------------------
+def _logs_aleatorios(n: int, rng: random.Random) -> Dict[str, _Nodo]:
+    """Nodos con logs desparejos: parte del clúster quedó atrasada."""
+    largo = rng.randint(5, 50)
+    estado = {}
+    for i in range(n):
+        atraso = rng.randint(0, largo) if rng.random() < 0.4 else 0
+        estado[f"N{i}"] = _Nodo(3, (3 if largo - atraso else 0, largo - atraso))
+    return estado
+
+
+def benchmark(nodos: Sequence[int], spreads: Sequence[float], pruebas: int,
+              seed: int = 0) -> None:
+    print(f"{'nodos':>5} {'spread':>6} {'prevote':>7} | {'ms medio':>8} {'ms p99':>7} | "
+          f"{'terms perdidos':>14} | {'candidaturas':>12} | {'sin líder':>9}")
+    for n in nodos:
+        for spread in spreads:
+            for prevote in (False, True):
+                modelo = ModeloEleccion(spread=spread, prevote=prevote, seed=seed)
+                rng = random.Random(seed)
+                tiempos: List[float] = []
+                perdidos = candidaturas = fallidas = 0
+                for _ in range(pruebas):
+                    estado = _logs_aleatorios(n, rng)
+                    timeouts = {nid: rng.randint(0, 10) for nid in estado}
+                    res = modelo.simular(timeouts, estado, 3)
+                    tiempos.append(res.tiempo)
+                    perdidos += res.perdidos
+                    candidaturas += res.candidaturas
+                    fallidas += res.lider is None
+                tiempos.sort()
+                p99 = tiempos[min(len(tiempos) - 1, int(0.99 * len(tiempos)))]
+                print(f"{n:5d} {spread:6g} {'sí' if prevote else 'no':>7} | "
+                      f"{sum(tiempos) / pruebas:8.1f} {p99:7.1f} | "
+                      f"{perdidos / pruebas:14.2f} | {candidaturas / pruebas:12.2f} | "
+                      f"{fallidas:9d}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Elección de Raft con timeouts aleatorios")
+    parser.add_argument("--nodos", default="3,5,9,15")
+    parser.add_argument("--spread", default="0,10,50,150")
+    parser.add_argument("--pruebas", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    benchmark([int(x) for x in args.nodos.split(",")],
+              [float(x) for x in args.spread.split(",")], args.pruebas, args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
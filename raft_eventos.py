@@ -0,0 +1,325 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Raft)
+#
+# Archivo: raft_eventos.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+raft_eventos.py
+
+Eventos del escenario de Raft (Start, Stop, Send, Spread, Log, Scan/Prefix), su
+despacho y la API incremental (`from_cluster`, `step`, `feed`, `read`, `snapshot`).
+`EventosRaft` es un mixin: `RaftSimulator` (raft.py) aporta el estado del clúster,
+la elección y el cálculo de commit, y hereda de aquí el manejo de cada evento.
+"""
+
+from __future__ import annotations
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from database2 import Database
+from indice import linea_scan
+from raft_learners import Learner, parse_learner
+from raft_log import LogLike, NodeState, entry_nbytes, first_divergence
+from traza import REPLICACION
+
+
+class EventosRaft:
+    """Manejo de eventos y API incremental de RaftSimulator."""
+
+    # -------------------------------------------------------------------------
+    def _event_start(self, nid: str) -> None:
+        # print(f"[EVENT] Start de nodo {nid}")
+        if nid in self.learners:
+            self.learners[nid].active = True
+            self._sync_learners([nid])
+            return
+        self._dirty = True
+        if nid not in self.nodes:
+            self.nodes[nid] = NodeState(True, 0, 0, self._new_log())
+        else:
+            self.nodes[nid].active = True
+
+        if self.leader and self.leader in self.nodes:
+            leader_log = self.nodes[self.leader].log
+            if leader_log:
+                self._catch_up(nid, leader_log)
+        else:
+            self._pick_leader()
+
+        self._recompute_commit_and_apply()
+
+    def _catch_up(self, nid: str, leader_log: LogLike) -> None:
+        """Trunca el log del nodo en el primer índice divergente y envía solo el sufijo."""
+        log = self.nodes[nid].log
+        d = first_divergence(log, leader_log)
+        if d < len(log):
+            del log[d:]
+        suffix = leader_log[d:]
+        log.extend(suffix)
+        self.stats.add_rejoin(len(suffix), sum(entry_nbytes(e) for e in suffix))
+        if self.trace is not None and suffix:
+            self.trace.emit(REPLICACION, nid, self.term, len(leader_log), len(suffix))
+        # print(f"[DEBUG] Nodo {nid} sincronizado con log líder {self.leader}")
+
+    def _event_stop(self, nid: str) -> None:
+        # print(f"[EVENT] Stop de nodo {nid}")
+        if nid in self.learners:
+            self.learners[nid].active = False
+            return
+        self._dirty = True
+        if nid in self.nodes:
+            was_leader = nid == self.leader
+            self.nodes[nid].active = False
+            if was_leader:
+                # print("[DEBUG] 🚫 El líder se detuvo. Reelección forzada.")
+                self._pick_leader()
+                if self.leader:
+                    self._recompute_commit_and_apply()
+
+    # -------------------------------------------------------------------------
+    def _send(self, action: str) -> None:
+        # print(f"[SEND] Acción enviada: {action}")
+        action = self._normalize_key(action)
+        if not self.leader or not self.nodes.get(self.leader, NodeState()).active:
+            # print("[DEBUG] ⚠️ No hay líder activo. Acción ignorada.")
+            return
+        if self.latencias is not None:
+            self.latencias.enviada((self.term, action))
+        if self.sends.push(action):
+            self._flush_sends()
+
+    def _flush_sends(self) -> None:
+        """Agrega al log del líder, en un solo lote, los Send pendientes."""
+        if not self.sends.pending:
+            return
+        st = self.nodes[self.leader]
+        batch = self.sends.drain()
+        # Cada acción se parsea una sola vez, al entrar al log
+        parse = Database.parse_action
+        st.log.extend([(self.term, action, parse(action)) for action in batch])
+        self.stats.add_batch(len(batch))
+        self._dirty = True
+    # print(f"[DEBUG] Log del líder actualizado: {st.log}")
+
+    def _spread(self, targets: Optional[List[str]]) -> None:
+        # print(f"[SPREAD] Iniciando propagación → {targets}")
+        if not self.leader or self.leader not in self.nodes:
+            # print("[DEBUG] ❌ No hay líder válido para spread.")
+            return
+        if not self.nodes[self.leader].active:
+            # print("[DEBUG] ⚠️ El líder actual está inactivo.")
+            return
+
+        leader_log = self.nodes[self.leader].log
+        if not leader_log:
+            # print("[DEBUG] ℹ️ Log líder vacío, nada que propagar.")
+            return
+
+        dests = (
+            [nid for nid in self._active_ids() if nid != self.leader]
+            if not targets
+            else [t for t in targets if t in self._active_ids() and t != self.leader]
+        )
+
+    # print(f"[DEBUG] Propagando log {leader_log} hacia {dests}")
+        # Pipelining: a un seguidor cuyo log es prefijo del líder solo se le envía el
+        # sufijo nuevo (log matching: misma entrada en la misma posición ⇒ mismo prefijo)
+        self.stats.rounds += 1
+        for d in dests:
+            log = self.nodes[d].log
+            n = len(log)
+            if n <= len(leader_log) and (n == 0 or log[-1] == leader_log[n - 1]):
+                log.extend(leader_log[n:])
+                self.stats.shipped += len(leader_log) - n
+            else:
+                self.nodes[d].log = leader_log.copy()
+                self.stats.shipped += len(leader_log)
+                n = 0
+            if self.trace is not None:
+                self.trace.emit(REPLICACION, d, self.term, len(leader_log), len(leader_log) - n)
+            # print(f"[DEBUG] Nodo {d} actualizado con log: {self.nodes[d].log}")
+
+        self._recompute_commit_and_apply()
+        self._sync_learners(targets)
+
+    def _sync_learners(self, targets: Optional[List[str]]) -> None:
+        """Replica el log del líder (y lo comprometido) a los learners activos."""
+        if not self.learners or not self.leader or self.leader not in self.nodes:
+            return
+        leader_log = self.nodes[self.leader].log
+        for lid, learner in self.learners.items():
+            if learner.active and (not targets or lid in targets):
+                self.stats.shipped += learner.sync(leader_log, self.commit_index)
+
+    def _event_learner_log(self, var: str, lid: str, out: List[str]) -> None:
+        """Lectura desde un learner si su atraso está acotado; si no, desde el líder."""
+        learner = self.learners[lid]
+        if self._dirty:
+            self._recompute_commit_and_apply()
+        if not learner.active or learner.staleness(self.commit_index) > self.max_staleness:
+            self._event_log(var, out)
+            return
+        learner.reads += 1
+        out.append(f"{var}={learner.db.log_value(var)}")
+
+    def _event_log(self, var: str, out: List[str]) -> None:
+        # print(f"[LOG] Consultando variable '{var}'")
+        # ReadIndex: si nada cambió desde el último cálculo de commit, el líder sigue
+        # siéndolo y lo aplicado está al día, así que se responde sin re-escanear el log.
+        if self._dirty:
+            self._recompute_commit_and_apply()
+        val = self.reads.get(var)
+        if val is None:
+            val = self.db.log_value(var)
+            self.reads.put(var, val)
+        out.append(f"{var}={val}")
+
+    def _event_scan(self, cmd: str, arg: str, out: List[str]) -> None:
+        """Scan;desde;hasta o Prefix;p sobre lo comprometido, vía el índice ordenado."""
+        out.append(linea_scan(f"{cmd};{arg}", self._pares_scan(cmd, arg)))
+
+    def _pares_scan(self, cmd: str, arg: str) -> List[Tuple[str, str]]:
+        if self._dirty:
+            self._recompute_commit_and_apply()
+        if cmd == "Prefix":
+            return self.db.prefijo(arg)
+        desde, _, hasta = arg.partition(";")
+        return self.db.rango(desde.strip(), hasta.strip() or None)
+    # -------------------------------------------------------------------------
+    def _init_cluster(self, specs: Iterable[Tuple[str, int]], learners: Iterable[str] = ()
+                      ) -> None:
+        """Crea los nodos (id, timeout) y learners, y elige el primer líder."""
+        # El reloj de commits/s parte con el cluster (run, from_cluster o feed)
+        if not self.stats.started:
+            self.stats.started = time.perf_counter()
+        for nid, timeout in specs:
+            self.nodes[nid] = NodeState(True, timeout, 0, self._new_log())
+            # print(f"[INIT] Nodo {nid} creado (timeout={timeout})")
+        for lid in learners:
+            self.learners[lid] = Learner()
+
+        self._pick_leader()
+        self._recompute_commit_and_apply()
+
+    def _parse_header(self, header: str) -> None:
+        """Crea los nodos declarados en la primera línea y elige el primer líder."""
+        node_specs = [x.strip() for x in header.split(";") if x.strip()]
+    # print(f"[INIT] Nodos iniciales: {node_specs}")
+        specs: List[Tuple[str, int]] = []
+        learners: List[str] = []
+        for tok in node_specs:
+            lid, is_learner = parse_learner(tok)
+            if is_learner:
+                learners.append(lid)
+                continue
+            if "," in tok:
+                nid, t = tok.split(",", 1)
+                try:
+                    timeout = int(t)
+                except ValueError:
+                    timeout = 0
+            else:
+                nid, timeout = tok, 0
+            specs.append((nid, timeout))
+        self._init_cluster(specs, learners)
+
+    def _dispatch(self, cmd: str, arg: Any = None, learner: Optional[str] = None) -> None:
+        """Ejecuta un evento ya parseado (cmd, argumento)."""
+        if self.trace is not None:
+            self.trace.tick()
+        if self.latencias is not None:
+            self.latencias.tick()
+        if cmd != "Send":
+            self._flush_sends()
+        if cmd == "Send":
+            self._send(arg)
+        elif cmd == "Spread":
+            self._spread(list(arg) if arg else [])
+        elif cmd == "Start":
+            self._event_start(arg)
+        elif cmd == "Stop":
+            self._event_stop(arg)
+        elif cmd == "Log":
+            if learner is not None and learner in self.learners:
+                self._event_learner_log(arg, learner, self.log_lines)
+            else:
+                self._event_log(arg, self.log_lines)
+        elif cmd in ("Scan", "Prefix"):
+            self._event_scan(cmd, arg, self.log_lines)
+
+    def _process_line(self, line: str) -> None:
+        """Procesa una línea de evento ya limpia."""
+        # print(f"[EVENT] Procesando línea: {line}")
+        cmd, sep, rest = line.partition(";")
+        if not sep:
+            self._dispatch("")
+        elif cmd == "Spread":
+            inside = rest.strip().strip("[]")
+            self._dispatch(cmd, [t.strip() for t in inside.split(",") if t.strip()])
+        elif cmd == "Log":
+            var = rest.strip()
+            name, _, lid = var.rpartition(";")
+            if name and lid.strip() in self.learners:
+                self._dispatch(cmd, name.strip(), lid.strip())
+            else:
+                self._dispatch(cmd, var)
+        else:
+            self._dispatch(cmd, rest.strip())
+
+    # ----------------------- API incremental (sin archivos) -----------------------
+    @classmethod
+    def from_cluster(cls, nodes: Union[Dict[str, int], Iterable[Any]],
+                     learners: Iterable[str] = (), **kwargs: Any) -> "EventosRaft":
+        """
+        Crea un simulador sin archivo de escenario.
+        `nodes` es {id: timeout} o una lista de ids / (id, timeout).
+        """
+        sim = cls("", **kwargs)
+        if isinstance(nodes, dict):
+            specs = [(nid, int(t)) for nid, t in nodes.items()]
+        else:
+            specs = [(n, 0) if isinstance(n, str) else (n[0], int(n[1])) for n in nodes]
+        sim._init_cluster(specs, learners)
+        return sim
+
+    def step(self, event: Union[str, Tuple[Any, ...]]) -> Optional[str]:
+        """
+        Procesa un evento: una línea del escenario ('Send;SET-a-1') o una tupla ya
+        parseada (('Send', 'SET-a-1'), ('Spread', ['A', 'B']), ('Log', 'a'),
+        ('Log', 'a', 'L1'), ('Scan', 'a;c'), ('Prefix', 'a'), ('Start', 'A'), ('Stop', 'A')).
+        Retorna la línea producida si el evento fue un Log.
+        """
+        antes = len(self.log_lines)
+        if isinstance(event, str):
+            line = self._clean(event)
+            if line:
+                self._process_line(line)
+        else:
+            self._dispatch(*event)
+        return self.log_lines[-1] if len(self.log_lines) > antes else None
+
+    def feed(self, events: Iterable[Union[str, Tuple[Any, ...]]]) -> List[str]:
+        """Procesa un lote de eventos; retorna las líneas de Log producidas."""
+        antes = len(self.log_lines)
+        for event in events:
+            self.step(event)
+        return self.log_lines[antes:]
+
+    def _sync(self) -> None:
+        self._flush_sends()
+        if self._dirty:
+            self._recompute_commit_and_apply()
+
+    def read(self, var: str) -> str:
+        """Valor comprometido de var (como Log, pero sin agregarlo a la salida)."""
+        self._sync()
+        return self.db.log_value(var)
+
+    def snapshot(self) -> Dict[str, str]:
+        """Estado comprometido actual de la base de datos."""
+        self._sync()
+        return self.db.snapshot()
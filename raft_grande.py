@@ -0,0 +1,364 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Raft)
+#
+# Archivo: raft_grande.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+raft_grande.py
+
+Modo de clúster grande para Raft. Los nodos se identifican con enteros (índice en
+la cabecera) y su estado vive en arreglos compactos en vez de un NodeState por
+nodo:
+
+    activo (bytearray) | timeout | term | largo del log | generación (arrays q)
+
+Los logs no se copian: en RaftSimulator todo log de nodo es prefijo del log del
+líder (Spread y Start copian el del líder, la elección deja a todos con el mismo
+log), así que basta un log compartido y el largo de cada nodo. Con eso:
+
+- el commit es el largo `mayoría`-ésimo mayor entre los activos, que se obtiene de
+  un conteo por largo (casi siempre hay pocos largos distintos);
+- `Spread;[]` (a todos) no recorre los nodos: registra (largo, generación) y cada
+  nodo activo no tocado después de esa generación tiene ese largo;
+- la elección y el prefijo comprometido salen del mismo conteo, sin recorrer logs;
+- la BD se aplica de forma incremental mientras refleje un prefijo del log.
+
+`Spread;[...]` resuelve los nombres con el índice nombre → entero. La salida es la
+misma que la de RaftSimulator para la gramática base (sin learners, lotes ni traza).
+
+Uso:
+    python raft_grande.py casos_Raft/test_01.txt
+
+El benchmark de memoria y eventos/s está en raft_grande_bench.py.
+"""
+
+from __future__ import annotations
+import argparse
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from acciones import Accion
+from database2 import Database
+from escenario import expandir
+from raft import RaftSimulator
+from raft_learners import parse_learner
+
+Entrada = Tuple[int, str, Accion]  # (term, acción, acción parseada)
+
+
+class RaftGrande:
+    """RaftSimulator con nodos en arreglos e IDs enteros."""
+
+    def __init__(self, path: str = "") -> None:
+        self.path = path
+        self.db = Database()
+        self.nombres: List[str] = []
+        self.indice: Dict[str, int] = {}
+        self.activo = bytearray()
+        self.timeout = array("q")
+        self.term_nodo = array("q")
+        self.largo = array("q")
+        self.gen = array("q")
+        self._gen = 0
+        # Último Spread a todos: los activos con gen < sync_gen tienen largo sync_len
+        self.sync_len = 0
+        self.sync_gen = -1
+        self.n_activos = 0
+        self.inactivos: Set[int] = set()
+        # largo de log → nodos activos con ese largo
+        self.por_largo: Dict[int, int] = {}
+        self.log: List[Entrada] = []  # log del líder; todo nodo tiene un prefijo
+        self.leader: Optional[int] = None
+        self.term = 0
+        self.commit_index = 0
+        self.log_lines: List[str] = []
+        self._dirty = True
+        self._db_hasta = 0  # la BD es replay(log[:_db_hasta])
+
+    _clean = staticmethod(RaftSimulator._clean)
+    _normalize_key = staticmethod(RaftSimulator._normalize_key)
+
+    # ----------------------- Nodos -----------------------
+    def _agregar(self, nombre: str, timeout: int) -> int:
+        i = self.indice.get(nombre)
+        if i is not None:
+            # Nombre repetido en la cabecera: el nodo se reinicia en su misma posición
+            self._set_activo(i, True)
+            self._set_largo(i, 0)
+            self.timeout[i] = timeout
+            self.term_nodo[i] = 0
+            return i
+        i = len(self.nombres)
+        self.nombres.append(nombre)
+        self.indice[nombre] = i
+        self.activo.append(1)
+        self.timeout.append(timeout)
+        self.term_nodo.append(0)
+        self.largo.append(0)
+        self.gen.append(self._tick())
+        self.n_activos += 1
+        self.por_largo[0] = self.por_largo.get(0, 0) + 1
+        return i
+
+    def _tick(self) -> int:
+        self._gen += 1
+        return self._gen
+
+    def _largo(self, i: int) -> int:
+        if self.activo[i] and self.gen[i] < self.sync_gen:
+            return self.sync_len
+        return self.largo[i]
+
+    def _set_largo(self, i: int, largo: int) -> None:
+        viejo = self._largo(i)
+        self.largo[i] = largo
+        self.gen[i] = self._tick()
+        if viejo != largo and self.activo[i]:
+            self._mover(viejo, largo)
+
+    def _sync_activos(self, largo: int) -> None:
+        """Todos los nodos activos pasan a tener `largo` entradas (O(1))."""
+        self.sync_len = largo
+        self.sync_gen = self._tick()
+        self.por_largo = {largo: self.n_activos} if self.n_activos else {}
+
+    def _mover(self, viejo: int, nuevo: int) -> None:
+        c = self.por_largo[viejo] - 1
+        if c:
+            self.por_largo[viejo] = c
+        else:
+            del self.por_largo[viejo]
+        self.por_largo[nuevo] = self.por_largo.get(nuevo, 0) + 1
+
+    def _set_activo(self, i: int, activo: bool) -> None:
+        if bool(self.activo[i]) == activo:
+            return
+        # Se fija el largo efectivo antes de cambiar el estado
+        largo = self.largo[i] = self._largo(i)
+        self.gen[i] = self._tick()
+        self.activo[i] = activo
+        if activo:
+            self.inactivos.discard(i)
+            self.n_activos += 1
+            self.por_largo[largo] = self.por_largo.get(largo, 0) + 1
+        else:
+            self.inactivos.add(i)
+            self.n_activos -= 1
+            c = self.por_largo[largo] - 1
+            if c:
+                self.por_largo[largo] = c
+            else:
+                del self.por_largo[largo]
+
+    def _majority(self) -> int:
+        return self.n_activos // 2 + 1 if self.n_activos > 0 else 1
+
+    def _k_esimo_largo(self, k: int) -> int:
+        """Largo k-ésimo mayor entre los nodos activos (0 si hay menos de k)."""
+        acumulado = 0
+        for largo in sorted(self.por_largo, reverse=True):
+            acumulado += self.por_largo[largo]
+            if acumulado >= k:
+                return largo
+        return 0
+
+    def _lider_activo(self) -> bool:
+        return self.leader is not None and bool(self.activo[self.leader])
+
+    # ----------------------- Elección -----------------------
+    def _pick_leader(self) -> None:
+        if self.n_activos == 0:
+            self.leader = None
+            return
+
+        log, timeout, activo = self.log, self.timeout, self.activo
+        mejor, clave_mejor = -1, None
+        for i in range(len(self.nombres)):
+            if not activo[i]:
+                continue
+            n = self._largo(i)
+            clave = (log[n - 1][0] if n else 0, n, -timeout[i])
+            if clave_mejor is None or clave > clave_mejor:
+                mejor, clave_mejor = i, clave
+
+        self.term += 1
+        self.leader = mejor
+        self.term_nodo[mejor] = self.term
+
+        # Prefijo con mayoría de los activos (todos los logs son prefijos del mismo)
+        comprometido = self._k_esimo_largo(self._majority())
+        prev = self._largo(mejor)
+        hasta = max(comprometido, prev)
+        final: List[Entrada] = []
+        vistos = set()
+        for entrada in log[:hasta]:
+            if entrada not in vistos:
+                vistos.add(entrada)
+                final.append(entrada)
+
+        cambio = len(final) != prev or final != log[:prev]
+        self.log = final
+        # Todos los nodos (también los detenidos) quedan con el log final
+        self._sync_activos(len(final))
+        for i in self.inactivos:
+            self.largo[i] = len(final)
+            self.gen[i] = self._tick()
+        if cambio:
+            self._rebuild_db()
+        elif self._db_hasta > len(final):
+            # La BD quedó con entradas que ya no están en el log: se reconstruye
+            # recién en el próximo commit, igual que RaftSimulator
+            self._db_hasta = -1
+        self.commit_index = len(final)
+        self._recompute_commit_and_apply()
+
+    # ----------------------- Eventos -----------------------
+    def _event_start(self, nombre: str) -> None:
+        self._dirty = True
+        i = self.indice.get(nombre)
+        if i is None:
+            i = self._agregar(nombre, 0)
+        else:
+            self._set_activo(i, True)
+
+        if self.leader is not None:
+            n = self._largo(self.leader)
+            if n and self._largo(i) != n:
+                self._set_largo(i, n)
+        else:
+            self._pick_leader()
+        self._recompute_commit_and_apply()
+
+    def _event_stop(self, nombre: str) -> None:
+        self._dirty = True
+        i = self.indice.get(nombre)
+        if i is None:
+            return
+        self._set_activo(i, False)
+        if i == self.leader:
+            self._pick_leader()
+            if self.leader is not None:
+                self._recompute_commit_and_apply()
+
+    def _send(self, action: str) -> None:
+        action = self._normalize_key(action)
+        if not self._lider_activo():
+            return
+        self.log.append((self.term, action, Database.parse_action(action)))
+        self._set_largo(self.leader, len(self.log))
+        self._dirty = True
+
+    def _spread(self, targets: Sequence[str]) -> None:
+        if not self._lider_activo() or not self.log:
+            return
+        lider, n = self.leader, len(self.log)
+        if not targets:
+            self._sync_activos(n)
+        else:
+            for nombre in targets:
+                i = self.indice.get(nombre)
+                if i is not None and self.activo[i] and i != lider:
+                    self._set_largo(i, n)
+        self._recompute_commit_and_apply()
+
+    def _event_log(self, var: str) -> None:
+        if self._dirty:
+            self._recompute_commit_and_apply()
+        self.log_lines.append(f"{var}={self.db.log_value(var)}")
+
+    _event_scan = RaftSimulator._event_scan
+    _pares_scan = RaftSimulator._pares_scan
+
+    # ----------------------- Commit y BD -----------------------
+    def _rebuild_db(self) -> None:
+        self.db = Database()
+        self._db_hasta = 0
+        self._aplicar_hasta(len(self.log))
+
+    def _aplicar_hasta(self, n: int) -> None:
+        if self._db_hasta < 0:
+            self.db = Database()
+            self._db_hasta = 0
+        apply = self.db.apply_record
+        for _, _, rec in self.log[self._db_hasta:n]:
+            apply(rec)
+        self._db_hasta = n
+
+    def _recompute_commit_and_apply(self) -> None:
+        self._dirty = False
+        if not self._lider_activo():
+            return
+        nuevo = self._k_esimo_largo(self._majority())
+        if nuevo > self.commit_index:
+            self.commit_index = nuevo
+            self._aplicar_hasta(nuevo)
+
+    # ----------------------- Ejecución -----------------------
+    def _parse_header(self, header: str) -> None:
+        for tok in (x.strip() for x in header.split(";")):
+            if not tok:
+                continue
+            if parse_learner(tok)[1]:
+                raise ValueError("raft_grande no soporta learners")
+            nombre, _, t = tok.partition(",")
+            try:
+                timeout = int(t) if t else 0
+            except ValueError:
+                timeout = 0
+            self._agregar(nombre, timeout)
+        self._pick_leader()
+        self._recompute_commit_and_apply()
+
+    def _process_line(self, line: str) -> None:
+        cmd, sep, rest = line.partition(";")
+        if not sep:
+            return
+        if cmd == "Send":
+            self._send(rest.strip())
+        elif cmd == "Spread":
+            inside = rest.strip().strip("[]")
+            self._spread([t.strip() for t in inside.split(",") if t.strip()])
+        elif cmd == "Start":
+            self._event_start(rest.strip())
+        elif cmd == "Stop":
+            self._event_stop(rest.strip())
+        elif cmd == "Log":
+            self._event_log(rest.strip())
+        elif cmd in ("Scan", "Prefix"):
+            self._event_scan(cmd, rest.strip(), self.log_lines)
+
+    def run_lines(self, lines: Iterable[str]) -> Tuple[List[str], Dict[str, str]]:
+        it = iter(lines)
+        header = next(it, None)
+        if header is None:
+            return self.log_lines, self.db.snapshot()
+        self._parse_header(header)
+        for line in it:
+            self._process_line(line)
+        self._recompute_commit_and_apply()
+        return self.log_lines, self.db.snapshot()
+
+    def run(self) -> Tuple[List[str], Dict[str, str]]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            return self.run_lines(expandir(f, self._clean))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Raft para clústeres grandes")
+    parser.add_argument("caso")
+    args = parser.parse_args()
+    salida, estado = RaftGrande(args.caso).run()
+    print("LOGS")
+    print("\n".join(salida) if salida else "No hubo logs")
+    print("BASE DE DATOS")
+    print("\n".join(f"{k}={v}" for k, v in estado.items()) if estado else "No hay datos")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
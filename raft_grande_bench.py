@@ -0,0 +1,99 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Raft)
+#
+# Archivo: raft_grande_bench.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+raft_grande_bench.py
+
+Benchmark de raft_grande: memoria por nodo y eventos/s a 1k, 10k y 100k nodos, y
+hasta `--comparar-hasta` nodos también RaftSimulator, verificando que la salida y
+la BD sean iguales.
+
+Uso:
+    python raft_grande_bench.py --bench 1000,10000,100000 --eventos 5000
+"""
+
+from __future__ import annotations
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from typing import Dict, List, Sequence, Tuple
+
+from raft import RaftSimulator
+from raft_grande import RaftGrande
+
+
+# ------------------------------------------------------------------------------------
+# Benchmark: memoria por nodo y eventos/s a 1k, 10k y 100k nodos
+# ------------------------------------------------------------------------------------
+def carga(nodos: int, eventos: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    nombres = [f"N{i}" for i in range(nodos)]
+    lineas = [";".join(f"{n},{rng.randint(1, 300)}" for n in nombres)]
+    for i in range(eventos):
+        r = rng.random()
+        if r < 0.55:
+            lineas.append(f"Send;SET-k{rng.randrange(100)}-{i}")
+        elif r < 0.65:
+            lineas.append("Spread;[]")
+        elif r < 0.80:
+            objetivos = rng.sample(nombres, min(nodos, 16))
+            lineas.append(f"Spread;[{','.join(objetivos)}]")
+        elif r < 0.95:
+            lineas.append(f"Log;k{rng.randrange(100)}")
+        else:
+            lineas.append(f"{'Stop' if rng.random() < 0.5 else 'Start'};{rng.choice(nombres)}")
+    return lineas
+
+
+def _medir(fabrica, lineas: List[str]) -> Tuple[int, float, List[str], Dict[str, str]]:
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    sim = fabrica()
+    sim._parse_header(lineas[0])
+    mem = tracemalloc.get_traced_memory()[0]
+    for line in lineas[1:]:
+        sim._process_line(line)
+    sim._recompute_commit_and_apply()
+    seg = time.perf_counter() - inicio
+    tracemalloc.stop()
+    return mem, seg, sim.log_lines, sim.db.snapshot()
+
+
+def benchmark(tamanos: Sequence[int], eventos: int, comparar_hasta: int = 1000) -> None:
+    print(f"{'nodos':>7} | {'modo':>13} | {'bytes/nodo':>10} | {'eventos/s':>10} | igual")
+    for n in tamanos:
+        lineas = carga(n, eventos)
+        mem_g, seg_g, out_g, db_g = _medir(RaftGrande, lineas)
+        print(f"{n:7d} | {'raft_grande':>13} | {mem_g / n:10.0f} | "
+              f"{eventos / seg_g:10.0f} |")
+        if n <= comparar_hasta:
+            mem_s, seg_s, out_s, db_s = _medir(RaftSimulator, lineas)
+            igual = out_s == out_g and list(db_s.items()) == list(db_g.items())
+            print(f"{n:7d} | {'RaftSimulator':>13} | {mem_s / n:10.0f} | "
+                  f"{eventos / seg_s:10.0f} | {'sí' if igual else 'NO'}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de Raft para clústeres grandes")
+    parser.add_argument("--bench", default="1000,10000,100000",
+                        help="tamaños, p.ej. 1000,10000,100000")
+    parser.add_argument("--eventos", type=int, default=20000)
+    parser.add_argument("--comparar-hasta", type=int, default=1000,
+                        help="también corre RaftSimulator hasta este tamaño")
+    args = parser.parse_args()
+    benchmark([int(x) for x in args.bench.split(",")], args.eventos, args.comparar_hasta)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
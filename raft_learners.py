@@ -0,0 +1,154 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Raft)
+#
+# Archivo: raft_learners.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+raft_learners.py
+
+Réplicas learner (no votantes) para escalar lecturas en Raft. Se declaran en la
+cabecera con el sufijo `,learner` (p.ej. `A,1;B,5;C,3;L1,learner`), reciben el
+log replicado en cada Spread y aplican lo comprometido a su propia base de datos,
+pero no están en `RaftSimulator.nodes`: no cuentan para la mayoría ni se eligen.
+
+Las lecturas `Log;var;L1` las responde el learner L1 si su atraso (entradas
+comprometidas aún no aplicadas) es como máximo `max_staleness`; si no, se lee
+del líder como siempre.
+
+Uso (benchmark):
+    python raft_learners.py --learners 0,1,2,4,8 --escrituras 2000 --lecturas 20000
+    python raft_learners.py --servicio 50   # + 50 µs de disco/red por lectura
+"""
+
+from __future__ import annotations
+import argparse
+import time
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from acciones import Accion
+from database2 import Database
+
+
+@dataclass
+class Learner:
+    active: bool = True
+    log: List[Tuple[int, str, Accion]] = field(default_factory=list)
+    db: Database = field(default_factory=Database)
+    applied: int = 0
+    reads: int = 0
+
+    def sync(self, leader_log, commit_index: int) -> int:
+        """Recibe el log del líder y aplica lo comprometido; retorna entradas enviadas."""
+        n = len(self.log)
+        if n <= len(leader_log) and (n == 0 or self.log[-1] == leader_log[n - 1]):
+            shipped = len(leader_log) - n
+            self.log.extend(leader_log[n:])
+        else:
+            # El líder truncó o reescribió el log: se reconstruye desde cero
+            shipped = len(leader_log)
+            self.log = list(leader_log)
+            self.db = Database()
+            self.applied = 0
+
+        hasta = min(commit_index, len(self.log))
+        if hasta < self.applied:
+            self.db = Database()
+            self.applied = 0
+        for i in range(self.applied, hasta):
+            self.db.apply_record(self.log[i][2])
+        self.applied = max(self.applied, hasta)
+        return shipped
+
+    def staleness(self, commit_index: int) -> int:
+        return max(0, commit_index - self.applied)
+
+
+def parse_learner(tok: str) -> Tuple[str, bool]:
+    """'L1,learner' / 'L1,0,learner' → ('L1', True); cualquier otro token → (tok, False)."""
+    parts = [p.strip() for p in tok.split(",")]
+    if len(parts) >= 2 and parts[-1].lower() == "learner":
+        return parts[0], True
+    return tok, False
+
+
+# ------------------------------------------------------------------------------------
+# Benchmark: lecturas repartidas entre learners vs costo de commit
+# ------------------------------------------------------------------------------------
+def _escribir(header: str, escrituras: int):
+    """Clúster con la cabecera dada tras `escrituras` Send+Spread; retorna (sim, s/escritura)."""
+    from raft import RaftSimulator
+
+    sim = RaftSimulator("")
+    sim._parse_header(header)
+    inicio = time.perf_counter()
+    for i in range(escrituras):
+        sim._process_line(f"Send;SET-k{i % 100}-{i}")
+        sim._process_line("Spread;[]")
+    return sim, (time.perf_counter() - inicio) / escrituras
+
+
+def _leer(sim, replicas: List[str], lecturas: int, servicio_us: float) -> float:
+    """Tiempo de la réplica más ocupada al repartir las lecturas en ronda."""
+    ocupado = {r: 0.0 for r in replicas}
+    for i in range(lecturas):
+        r = replicas[i % len(replicas)]
+        antes = sim.learners[r].reads if r != "A" else 0
+        inicio = time.perf_counter()
+        sim._process_line(f"Log;k{i % 100}" if r == "A" else f"Log;k{i % 100};{r}")
+        t = time.perf_counter() - inicio + servicio_us / 1e6
+        # Un learner atrasado deriva la lectura al líder: se carga a quien respondió
+        ocupado[r if r != "A" and sim.learners[r].reads > antes else "A"] += t
+    return max(ocupado.values())
+
+
+def benchmark(learners: List[int], escrituras: int, lecturas: int,
+              servicio_us: float = 0.0, repeticiones: int = 5) -> None:
+    """
+    Cada réplica atiende sus lecturas en serie y las réplicas trabajan en paralelo:
+    cada lectura se mide y se carga (más `servicio_us` de disco/red) a la réplica que
+    de verdad la respondió, y el throughput es lecturas / tiempo de la más ocupada.
+    Cada repetición corre todas las configuraciones seguidas (así el ruido de la
+    máquina afecta a todas por igual) y se toma el mejor tiempo de cada una.
+    """
+    configs = [0] + [n for n in learners if n]  # sin learners: la base
+    ids = {n: [f"L{i}" for i in range(n)] for n in configs}
+    escritura = {n: float("inf") for n in configs}
+    ocupado = {n: float("inf") for n in configs}
+    for _ in range(repeticiones):
+        for n in configs:
+            header = "A,1;B,2;C,3" + "".join(f";{lid},learner" for lid in ids[n])
+            sim, t = _escribir(header, escrituras)
+            escritura[n] = min(escritura[n], t)
+            # el líder también atiende lecturas
+            ocupado[n] = min(ocupado[n], _leer(sim, ["A"] + ids[n], lecturas, servicio_us))
+
+    print(f"commit sin learners: {1e6 * escritura[0]:.1f} µs/escritura | "
+          f"lecturas sin learners: {lecturas / ocupado[0]:.0f}/s")
+    for n in learners:
+        throughput = lecturas / ocupado[n]
+        print(f"learners={n:2d} | commit: {1e6 * escritura[n]:7.1f} µs/escritura "
+              f"({100 * (escritura[n] / escritura[0] - 1):+5.1f}% vs sin learners) | "
+              f"lecturas: {throughput:9.0f}/s ({ocupado[0] / ocupado[n]:4.1f}x)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Learners no votantes en Raft")
+    parser.add_argument("--learners", default="0,1,2,4,8")
+    parser.add_argument("--escrituras", type=int, default=2000)
+    parser.add_argument("--lecturas", type=int, default=20000)
+    parser.add_argument("--servicio", type=float, default=0.0,
+                        help="µs extra por lectura en cada réplica (disco/red)")
+    args = parser.parse_args()
+    benchmark([int(x) for x in args.learners.split(",")], args.escrituras, args.lecturas,
+              args.servicio)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
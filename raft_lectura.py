@@ -0,0 +1,68 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Raft)
+#
+# Archivo: raft_lectura.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+raft_lectura.py
+
+Caché de lecturas para `Log;var` en Raft. Las entradas se agrupan por clave
+"plegada" (misma normalización que database2 + minúsculas, que es lo que usa DEL
+para encontrar la clave), de modo que aplicar una acción solo invalida las
+lecturas de la clave que toca.
+"""
+
+from __future__ import annotations
+from typing import Dict, Iterable, Optional, Tuple
+
+from acciones import Accion
+
+
+def fold_key(key: str) -> str:
+    """Clave canónica: '_' → ' ', sin espacios en los extremos y en minúsculas."""
+    return key.replace("_", " ").strip().lower()
+
+
+def action_key(action: str) -> Optional[str]:
+    """Clave plegada que toca una acción SET-/ADD-/DEL- (None si no es válida)."""
+    if not action or "-" not in action:
+        return None
+    return fold_key(action.split("-", 2)[1])
+
+
+class ReadCache:
+    """Valores leídos desde la BD aplicada, invalidados por clave."""
+
+    def __init__(self) -> None:
+        self._buckets: Dict[str, Dict[str, str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, var: str) -> Optional[str]:
+        bucket = self._buckets.get(fold_key(var))
+        val = bucket.get(var) if bucket else None
+        if val is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return val
+
+    def put(self, var: str, value: str) -> None:
+        self._buckets.setdefault(fold_key(var), {})[var] = value
+
+    def invalidate(self, entries: Iterable[Tuple[int, str, Accion]]) -> None:
+        """Descarta las lecturas de las claves tocadas por las entradas aplicadas."""
+        if not self._buckets:
+            return
+        for _, action, _ in entries:
+            key = action_key(action)
+            if key is not None:
+                self._buckets.pop(key, None)
+
+    def clear(self) -> None:
+        self._buckets.clear()
@@ -0,0 +1,268 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Raft)
+#
+# Archivo: raft_log.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+raft_log.py
+
+Log de Raft en formato columnar: los términos van en un array('q') y las acciones
+se internan en una tabla de strings compartida, referenciada por IDs en un
+array('I'). Se comporta como la lista de tuplas (term, acción, registro) que usa
+raft.py: len, índices, slicing, iteración, comparación, append, extend, copy y
+`del log[i:]`. El registro (la acción ya parseada, ver acciones.py) viaja con cada
+entrada desde el Send: la tabla lo guarda junto a su string.
+
+También tiene la detección de divergencia por bordes de term que usa la
+reincorporación de nodos: como los terms de un log no decrecen, el primer índice
+de cada term se obtiene con bisect y dos logs se comparan term a term (borde y
+última entrada de cada tramo) en vez de entrada a entrada.
+
+`NodeState` (activo, timeout, term, log) es el estado por nodo de raft.py.
+
+Uso (reporte de memoria):
+    python raft_log.py 1000000
+"""
+
+from __future__ import annotations
+import sys
+import tracemalloc
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from acciones import Accion
+
+Entry = Tuple[int, str, Accion]  # (term, acción, acción parseada)
+
+
+class StringTable:
+    """
+    Tabla de acciones internadas: cada string distinto se guarda una sola vez, junto
+    a su registro parseado.
+    """
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self.strings: List[str] = []
+        self.records: List[Accion] = []
+
+    def intern(self, s: str, rec: Accion) -> int:
+        sid = self._ids.get(s)
+        if sid is None:
+            sid = len(self.strings)
+            self._ids[s] = sid
+            self.strings.append(s)
+            self.records.append(rec)
+        return sid
+
+    def nbytes(self) -> int:
+        return (sys.getsizeof(self._ids) + sys.getsizeof(self.strings)
+                + sys.getsizeof(self.records)
+                + sum(sys.getsizeof(s) for s in self.strings))
+
+
+class ColumnarLog:
+    """Log (term, acción, registro) con términos en array('q') y acciones en array('I')."""
+
+    __slots__ = ("terms", "ids", "table")
+
+    def __init__(self, entries: Iterable[Entry] = (), table: Optional[StringTable] = None,
+                 ) -> None:
+        self.table = table if table is not None else StringTable()
+        self.terms = array("q")
+        self.ids = array("I")
+        self.extend(entries)
+
+    @classmethod
+    def _from_arrays(cls, terms: array, ids: array, table: StringTable) -> "ColumnarLog":
+        log = cls.__new__(cls)
+        log.terms, log.ids, log.table = terms, ids, table
+        return log
+
+    # ------------------------- Secuencia -------------------------
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[Entry, "ColumnarLog"]:
+        if isinstance(i, slice):
+            return self._from_arrays(self.terms[i], self.ids[i], self.table)
+        sid = self.ids[i]
+        return self.terms[i], self.table.strings[sid], self.table.records[sid]
+
+    def __iter__(self) -> Iterator[Entry]:
+        strings, records = self.table.strings, self.table.records
+        return zip(self.terms, (strings[sid] for sid in self.ids),
+                   (records[sid] for sid in self.ids))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ColumnarLog):
+            if other.table is self.table:
+                return self.terms == other.terms and self.ids == other.ids
+            return len(self) == len(other) and list(self) == list(other)
+        if isinstance(other, list):
+            return len(self) == len(other) and list(self) == other
+        return NotImplemented
+
+    def __ne__(self, other: object) -> bool:
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"ColumnarLog({list(self)!r})"
+
+    # ------------------------- Mutación -------------------------
+    def append(self, entry: Entry) -> None:
+        self.terms.append(entry[0])
+        self.ids.append(self.table.intern(entry[1], entry[2]))
+
+    def extend(self, entries: Iterable[Entry]) -> None:
+        if isinstance(entries, ColumnarLog) and entries.table is self.table:
+            self.terms.extend(entries.terms)
+            self.ids.extend(entries.ids)
+            return
+        for entry in entries:
+            self.append(entry)
+
+    def __delitem__(self, i: slice) -> None:
+        del self.terms[i]
+        del self.ids[i]
+
+    def copy(self) -> "ColumnarLog":
+        return self._from_arrays(array("q", self.terms), array("I", self.ids), self.table)
+
+    def nbytes(self) -> int:
+        """Bytes propios (sin la tabla compartida)."""
+        return (sys.getsizeof(self) + self.terms.buffer_info()[1] * self.terms.itemsize
+                + self.ids.buffer_info()[1] * self.ids.itemsize)
+
+
+# ------------------------------------------------------------------------------------
+# Estado de un nodo (log de lista o columnar)
+# ------------------------------------------------------------------------------------
+LogLike = Union[List[Entry], ColumnarLog]
+
+
+class NodeState:
+    # __slots__ explícito: dataclass(slots=True) requiere Python 3.10
+    __slots__ = ("active", "timeout", "term", "log")
+
+    def __init__(self, active: bool = True, timeout: int = 0, term: int = 0,
+                 log: Optional[LogLike] = None) -> None:
+        self.active = active
+        self.timeout = timeout
+        self.term = term
+        self.log: LogLike = [] if log is None else log
+
+    def __repr__(self) -> str:
+        return (f"NodeState(active={self.active}, timeout={self.timeout}, "
+                f"term={self.term}, log={self.log!r})")
+
+
+# ------------------------------------------------------------------------------------
+# Bordes de term y primer índice divergente
+# ------------------------------------------------------------------------------------
+def _fin_de_term(log: LogLike, inicio: int, fin: int) -> int:
+    """Índice siguiente al último de la racha de log[inicio][0] dentro de [inicio, fin)."""
+    if isinstance(log, ColumnarLog):
+        return bisect_right(log.terms, log.terms[inicio], inicio, fin)
+    # bisect_right a mano sobre el term (bisect acepta key= recién en Python 3.10)
+    t, lo, hi = log[inicio][0], inicio, fin
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if t < log[mid][0]:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def term_starts(log: LogLike, n: Optional[int] = None) -> Optional[List[Tuple[int, int]]]:
+    """[(term, primer índice)] de log[:n]; None si los terms no están ordenados."""
+    bordes: List[Tuple[int, int]] = []
+    i, n = 0, len(log) if n is None else n
+    while i < n:
+        t = log[i][0]
+        j = _fin_de_term(log, i, n)
+        if log[j - 1][0] != t or (j < n and log[j][0] < t):
+            return None
+        bordes.append((t, i))
+        i = j
+    return bordes
+
+
+def first_divergence(follower: LogLike, leader: LogLike) -> int:
+    """
+    Primer índice en que `follower` difiere de `leader` (o el largo común si uno es
+    prefijo del otro). Por cada tramo de term del seguidor basta ver que el líder
+    tenga ese term en ambos bordes y la misma última entrada (log matching); solo
+    el primer tramo que no calza se recorre entrada a entrada.
+    """
+    n = min(len(follower), len(leader))
+    bordes = term_starts(follower, n)
+    if bordes is None:
+        tramos = [(0, n)]  # terms desordenados: comparación lineal
+    else:
+        inicios = [ini for _, ini in bordes] + [n]
+        tramos = [(inicios[k], inicios[k + 1]) for k in range(len(bordes))]
+    for ini, fin in tramos:
+        if (bordes is not None and leader[ini][0] == follower[ini][0]
+                and leader[fin - 1] == follower[fin - 1]):
+            continue
+        for i in range(ini, fin):
+            if follower[i] != leader[i]:
+                return i
+    return n
+
+
+def entry_nbytes(entry: Entry) -> int:
+    """Bytes de una entrada en el cable: term (i64) + acción en UTF-8."""
+    return 8 + len(entry[1].encode("utf-8"))
+
+
+# ------------------------------------------------------------------------------------
+# Reporte de memoria: lista de tuplas vs columnar
+# ------------------------------------------------------------------------------------
+def _medir(construir) -> Tuple[object, int]:
+    tracemalloc.start()
+    obj = construir()
+    usado, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, usado
+
+
+def bytes_per_entry(n: int, distintas: int = 100) -> Tuple[float, float]:
+    """Bytes/entrada (lista de tuplas, columnar) para n entradas con acciones repetidas."""
+    from database2 import Database
+
+    def acciones() -> Iterator[Entry]:
+        # Igual que raft.py: cada Send arma un string nuevo aunque se repita
+        for i in range(n):
+            accion = "-".join(["SET", f"k{i % distintas}", "valor"])
+            yield i // 1000, accion, Database.parse_action(accion)
+
+    lista, b_lista = _medir(lambda: list(acciones()))
+    del lista
+    col, b_col = _medir(lambda: ColumnarLog(acciones()))
+    del col
+    return b_lista / n, b_col / n
+
+
+def main(argv: List[str]) -> int:
+    n = int(argv[1]) if len(argv) >= 2 else 1_000_000
+    lista, columnar = bytes_per_entry(n)
+    print(f"Entradas: {n}")
+    print(f"  lista de tuplas: {lista:7.1f} bytes/entrada")
+    print(f"  columnar:        {columnar:7.1f} bytes/entrada ({lista / columnar:.1f}x menos)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,113 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Raft)
+#
+# Archivo: raft_lotes.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+raft_lotes.py
+
+Group commit para `Send` en Raft: los Send consecutivos se acumulan en una cola y
+se agregan al log del líder en un solo lote cuando se alcanza `batch_size`, cuando
+el más antiguo lleva `linger` segundos esperando, o cuando llega cualquier otro
+evento (así ningún evento observa un Send pendiente y la semántica no cambia).
+
+También lleva las estadísticas de replicación: entradas por ronda de Spread,
+entradas comprometidas por segundo y el costo de ponerse al día de los nodos que
+se reincorporan (entradas y bytes enviados por Start).
+
+Uso:
+    python raft_lotes.py casos_Raft/test_01.txt --batch 64 --linger 0.001
+"""
+
+from __future__ import annotations
+import argparse
+import time
+from dataclasses import dataclass
+from typing import List
+
+
+@dataclass
+class ReplicationStats:
+    batches: int = 0
+    appended: int = 0
+    rounds: int = 0
+    shipped: int = 0
+    committed: int = 0
+    started: float = 0.0
+    rejoins: int = 0
+    rejoin_shipped: int = 0
+    rejoin_bytes: int = 0
+
+    def add_batch(self, size: int) -> None:
+        self.batches += 1
+        self.appended += size
+
+    def entries_per_batch(self) -> float:
+        return self.appended / self.batches if self.batches else 0.0
+
+    def entries_per_round(self) -> float:
+        return self.shipped / self.rounds if self.rounds else 0.0
+
+    def add_rejoin(self, shipped: int, nbytes: int) -> None:
+        self.rejoins += 1
+        self.rejoin_shipped += shipped
+        self.rejoin_bytes += nbytes
+
+    def commits_per_sec(self) -> float:
+        elapsed = time.perf_counter() - self.started if self.started else 0.0
+        return self.committed / elapsed if elapsed > 0 else 0.0
+
+    def report(self) -> str:
+        return (f"lotes={self.batches} entradas/lote={self.entries_per_batch():.1f} "
+                f"rondas={self.rounds} entradas/ronda={self.entries_per_round():.1f} "
+                f"commits={self.committed} commits/s={self.commits_per_sec():.0f} "
+                f"rejoins={self.rejoins} entradas/rejoin="
+                f"{self.rejoin_shipped / self.rejoins if self.rejoins else 0.0:.1f} "
+                f"bytes/rejoin={self.rejoin_bytes / self.rejoins if self.rejoins else 0.0:.0f}")
+
+
+class SendQueue:
+    """Cola de envíos de clientes pendientes de agregarse al log del líder."""
+
+    def __init__(self, batch_size: int = 1, linger: float = 0.0) -> None:
+        self.batch_size = max(1, batch_size)
+        self.linger = linger
+        self.pending: List[str] = []
+        self._oldest = 0.0
+
+    def push(self, action: str) -> bool:
+        """Encola una acción; retorna True si el lote debe agregarse ya."""
+        if not self.pending:
+            self._oldest = time.perf_counter()
+        self.pending.append(action)
+        if len(self.pending) >= self.batch_size:
+            return True
+        return self.linger > 0 and time.perf_counter() - self._oldest >= self.linger
+
+    def drain(self) -> List[str]:
+        batch, self.pending = self.pending, []
+        return batch
+
+
+def main() -> int:
+    from raft import RaftSimulator
+
+    parser = argparse.ArgumentParser(description="Raft con group commit de Send")
+    parser.add_argument("caso")
+    parser.add_argument("--batch", type=int, default=1)
+    parser.add_argument("--linger", type=float, default=0.0, help="segundos")
+    args = parser.parse_args()
+
+    sim = RaftSimulator(args.caso, batch_size=args.batch, linger=args.linger)
+    sim.run()
+    print(sim.stats.report())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,331 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Raft)
+#
+# Archivo: raft_multigrupo.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+raft_multigrupo.py
+
+Muchos grupos Raft chicos (mismos nodos, flujos de eventos distintos) avanzados
+en lote con NumPy. El estado de los G grupos × N nodos vive en matrices:
+
+    activo (G×N bool) | largo del log (G×N) | term del nodo (G×N)
+    term, líder, commit_index, sucio (vectores de largo G)
+
+Igual que en raft_grande, todo log de nodo es prefijo del log del líder, así que
+cada grupo guarda un solo log y el largo de cada nodo. En cada paso se toma el
+siguiente evento de cada grupo y se agrupan por comando:
+
+- Send: el append al log es por grupo; el largo del líder se fija en bloque.
+- Spread: los largos de los destinos se fijan con una máscara G×N.
+- Commit: se ordenan las filas (inactivos = -1) y el largo `mayoría`-ésimo mayor
+  de cada grupo sale de una sola operación; solo los grupos que avanzan bajan a
+  Python para aplicar sus entradas en su BD.
+- Start/Stop y la elección (con sus reglas de dedup y reconstrucción) son por
+  grupo, como en raft_grande: son raros.
+
+La salida de cada grupo es la misma que la de RaftSimulator para la gramática
+base, con una diferencia: el conjunto de nodos es el de la cabecera (un Start de
+un nodo desconocido se ignora) y no hay learners.
+
+NumPy es opcional para el resto del proyecto; este módulo lo requiere.
+
+El benchmark contra G RaftSimulator uno a uno está en raft_multigrupo_bench.py.
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depende del entorno
+    np = None
+
+from acciones import Accion
+from database2 import Database
+from indice import linea_scan
+from raft import RaftSimulator
+from raft_learners import parse_learner
+
+Entrada = Tuple[int, str, Accion]  # (term, acción, acción parseada)
+
+
+class RaftMultigrupo:
+    """G grupos Raft con los mismos nodos, avanzados en lote."""
+
+    def __init__(self, grupos: int, cabecera: str) -> None:
+        if np is None:
+            raise ImportError("raft_multigrupo requiere numpy (pip install numpy)")
+        self.grupos = grupos
+        self.nombres: List[str] = []
+        self.indice: Dict[str, int] = {}
+        timeouts: List[int] = []
+        for tok in (x.strip() for x in cabecera.split(";")):
+            if not tok:
+                continue
+            if parse_learner(tok)[1]:
+                raise ValueError("raft_multigrupo no soporta learners")
+            nombre, _, t = tok.partition(",")
+            try:
+                timeout = int(t) if t else 0
+            except ValueError:
+                timeout = 0
+            if nombre in self.indice:
+                # Nombre repetido: mismo nodo, vale el último timeout
+                timeouts[self.indice[nombre]] = timeout
+                continue
+            self.indice[nombre] = len(self.nombres)
+            self.nombres.append(nombre)
+            timeouts.append(timeout)
+
+        g, n = grupos, len(self.nombres)
+        self.timeout = np.array(timeouts, dtype=np.int64)
+        self.activo = np.ones((g, n), dtype=bool)
+        self.largo = np.zeros((g, n), dtype=np.int64)
+        self.term_nodo = np.zeros((g, n), dtype=np.int64)
+        self.term = np.zeros(g, dtype=np.int64)
+        self.leader = np.full(g, -1, dtype=np.int64)
+        self.commit_index = np.zeros(g, dtype=np.int64)
+        self.sucio = np.ones(g, dtype=bool)
+        self.logs: List[List[Entrada]] = [[] for _ in range(g)]
+        self.dbs = [Database() for _ in range(g)]
+        self._db_hasta = [0] * g  # la BD del grupo es replay(log[:_db_hasta]); -1 = rehacer
+        self.log_lines: List[List[str]] = [[] for _ in range(g)]
+        self._normalizadas: Dict[str, str] = {}
+        # Grupos con Start/Stop/elección en este paso: su commit se recalcula al final
+        self._pendientes: Set[int] = set()
+
+        for grupo in range(g):
+            self._pick_leader(grupo)
+        self._pendientes.clear()
+        self._recompute(np.arange(g))
+
+    _clean = staticmethod(RaftSimulator._clean)
+    _normalize_key = staticmethod(RaftSimulator._normalize_key)
+
+    # ----------------------- Commit (vectorizado) -----------------------
+    def _k_esimo(self, gs: "np.ndarray", k: "np.ndarray") -> "np.ndarray":
+        """Largo k-ésimo mayor entre los activos de cada grupo de `gs`."""
+        filas = np.where(self.activo[gs], self.largo[gs], -1)
+        filas.sort(axis=1)
+        return filas[np.arange(len(gs)), filas.shape[1] - k]
+
+    def _mayoria(self, gs: "np.ndarray") -> "np.ndarray":
+        return self.activo[gs].sum(axis=1) // 2 + 1
+
+    def _recompute(self, gs: "np.ndarray") -> None:
+        """Avanza el commit de los grupos `gs` con líder activo y aplica lo nuevo."""
+        self.sucio[gs] = False
+        lideres = self.leader[gs]
+        gs = gs[lideres >= 0]
+        if not len(gs):
+            return
+        gs = gs[self.activo[gs, self.leader[gs]]]
+        if not len(gs):
+            return
+        nuevo = self._k_esimo(gs, self._mayoria(gs))
+        avanza = nuevo > self.commit_index[gs]
+        gs, nuevo = gs[avanza], nuevo[avanza]
+        self.commit_index[gs] = nuevo
+        for grupo, hasta in zip(gs.tolist(), nuevo.tolist()):
+            self._aplicar_hasta(grupo, hasta)
+
+    # ----------------------- BD (por grupo) -----------------------
+    def _aplicar_hasta(self, grupo: int, n: int) -> None:
+        if self._db_hasta[grupo] < 0:
+            self.dbs[grupo] = Database()
+            self._db_hasta[grupo] = 0
+        apply = self.dbs[grupo].apply_record
+        for _, _, rec in self.logs[grupo][self._db_hasta[grupo]:n]:
+            apply(rec)
+        self._db_hasta[grupo] = n
+
+    def _rebuild_db(self, grupo: int) -> None:
+        self.dbs[grupo] = Database()
+        self._db_hasta[grupo] = 0
+        self._aplicar_hasta(grupo, len(self.logs[grupo]))
+
+    # ----------------------- Elección (por grupo) -----------------------
+    def _pick_leader(self, grupo: int) -> None:
+        activo = self.activo[grupo]
+        if not activo.any():
+            self.leader[grupo] = -1
+            return
+
+        log = self.logs[grupo]
+        largos = self.largo[grupo].tolist()
+        timeout = self.timeout.tolist()
+        activos = np.flatnonzero(activo).tolist()
+        mejor, clave_mejor = -1, None
+        for i in activos:
+            n = largos[i]
+            clave = (log[n - 1][0] if n else 0, n, -timeout[i])
+            if clave_mejor is None or clave > clave_mejor:
+                mejor, clave_mejor = i, clave
+
+        self.term[grupo] += 1
+        self.leader[grupo] = mejor
+        self.term_nodo[grupo, mejor] = self.term[grupo]
+
+        # Prefijo con mayoría de los activos (largo mayoría-ésimo mayor)
+        comprometido = sorted((largos[i] for i in activos), reverse=True)[len(activos) // 2]
+        prev = largos[mejor]
+        final: List[Entrada] = []
+        vistos = set()
+        for entrada in log[:max(comprometido, prev)]:
+            if entrada not in vistos:
+                vistos.add(entrada)
+                final.append(entrada)
+
+        cambio = len(final) != prev or final != log[:prev]
+        self.logs[grupo] = final
+        # Todos los nodos (también los detenidos) quedan con el log final
+        self.largo[grupo] = len(final)
+        if cambio:
+            self._rebuild_db(grupo)
+        elif self._db_hasta[grupo] > len(final):
+            self._db_hasta[grupo] = -1
+        self.commit_index[grupo] = len(final)
+        self._pendientes.add(grupo)
+
+    # ----------------------- Eventos en lote -----------------------
+    def _sends(self, gs: List[int], acciones: List[str]) -> None:
+        lideres = self.leader[gs]
+        ok = lideres >= 0
+        ok[ok] = self.activo[np.asarray(gs)[ok], lideres[ok]]
+        terms = self.term[gs].tolist()
+        destino, largos = [], []
+        for j, (grupo, action) in enumerate(zip(gs, acciones)):
+            if not ok[j]:
+                continue
+            norm = self._normalizadas.get(action)
+            if norm is None:
+                if len(self._normalizadas) >= 1 << 14:
+                    self._normalizadas.clear()
+                norm = self._normalizadas[action] = self._normalize_key(action)
+            action = norm
+            log = self.logs[grupo]
+            log.append((terms[j], action, Database.parse_action(action)))
+            destino.append(grupo)
+            largos.append(len(log))
+        if destino:
+            self.largo[destino, self.leader[destino]] = largos
+            self.sucio[destino] = True
+
+    def _spreads(self, gs: List[int], objetivos: List[List[str]]) -> None:
+        lens = np.array([len(self.logs[grupo]) for grupo in gs], dtype=np.int64)
+        g = np.asarray(gs, dtype=np.int64)
+        lideres = self.leader[g]
+        ok = (lideres >= 0) & (lens > 0)
+        ok[ok] = self.activo[g[ok], lideres[ok]]
+        if not ok.any():
+            return
+        g, lens, lideres, objetivos = g[ok], lens[ok], lideres[ok], \
+            [o for o, v in zip(objetivos, ok.tolist()) if v]
+
+        mascara = np.zeros((len(g), len(self.nombres)), dtype=bool)
+        todos = np.array([not o for o in objetivos])
+        mascara[todos] = True
+        for j, nombres in enumerate(objetivos):
+            for nombre in nombres:
+                i = self.indice.get(nombre)
+                if i is not None:
+                    mascara[j, i] = True
+        # Con destinos explícitos el líder no cuenta; en ambos casos solo los activos
+        mascara[~todos, lideres[~todos]] = False
+        mascara &= self.activo[g]
+        self.largo[g] = np.where(mascara, lens[:, None], self.largo[g])
+        self._recompute(g)
+
+    def _lecturas(self, gs: List[int], cmds: List[str], args: List[str]) -> None:
+        g = np.asarray(gs, dtype=np.int64)
+        sucios = g[self.sucio[g]]
+        if len(sucios):
+            self._recompute(sucios)
+        for grupo, cmd, arg in zip(gs, cmds, args):
+            if cmd == "Log":
+                self.log_lines[grupo].append(f"{arg}={self.dbs[grupo].log_value(arg)}")
+            elif cmd == "Prefix":
+                self.log_lines[grupo].append(linea_scan(f"Prefix;{arg}",
+                                                        self.dbs[grupo].prefijo(arg)))
+            else:
+                desde, _, hasta = arg.partition(";")
+                pares = self.dbs[grupo].rango(desde.strip(), hasta.strip() or None)
+                self.log_lines[grupo].append(linea_scan(f"Scan;{arg}", pares))
+
+    def _start(self, grupo: int, nombre: str) -> None:
+        self.sucio[grupo] = True
+        i = self.indice.get(nombre)
+        if i is None:
+            return
+        self.activo[grupo, i] = True
+        lider = int(self.leader[grupo])
+        if lider >= 0:
+            n = int(self.largo[grupo, lider])
+            if n:
+                self.largo[grupo, i] = n
+        else:
+            self._pick_leader(grupo)
+        self._pendientes.add(grupo)
+
+    def _stop(self, grupo: int, nombre: str) -> None:
+        self.sucio[grupo] = True
+        i = self.indice.get(nombre)
+        if i is None:
+            return
+        self.activo[grupo, i] = False
+        if i == self.leader[grupo]:
+            self._pick_leader(grupo)
+            if self.leader[grupo] < 0:
+                self._pendientes.discard(grupo)
+
+    def paso(self, eventos: Sequence[Optional[str]]) -> None:
+        """Procesa un evento (línea ya limpia, o None) por grupo."""
+        sends: Tuple[List[int], List[str]] = ([], [])
+        spreads: Tuple[List[int], List[List[str]]] = ([], [])
+        lecturas: Tuple[List[int], List[str], List[str]] = ([], [], [])
+        for grupo, line in enumerate(eventos):
+            if not line:
+                continue
+            cmd, sep, rest = line.partition(";")
+            if not sep:
+                continue
+            rest = rest.strip()
+            if cmd == "Send":
+                sends[0].append(grupo)
+                sends[1].append(rest)
+            elif cmd == "Spread":
+                spreads[0].append(grupo)
+                spreads[1].append([t.strip() for t in rest.strip("[]").split(",") if t.strip()])
+            elif cmd in ("Log", "Scan", "Prefix"):
+                lecturas[0].append(grupo)
+                lecturas[1].append(cmd)
+                lecturas[2].append(rest)
+            elif cmd == "Start":
+                self._start(grupo, rest)
+            elif cmd == "Stop":
+                self._stop(grupo, rest)
+        # Cada grupo tiene a lo más un evento por paso: el orden entre lotes no importa
+        if sends[0]:
+            self._sends(*sends)
+        if spreads[0]:
+            self._spreads(*spreads)
+        if lecturas[0]:
+            self._lecturas(*lecturas)
+        if self._pendientes:
+            self._recompute(np.fromiter(self._pendientes, dtype=np.int64))
+            self._pendientes.clear()
+
+    def run_flujos(self, flujos: Sequence[Sequence[str]]
+                   ) -> Tuple[List[List[str]], List[Dict[str, str]]]:
+        """Avanza en paralelo un flujo de eventos (sin cabecera) por grupo."""
+        flujos = [[x for x in map(self._clean, flujo) if x] for flujo in flujos]
+        for t in range(max((len(f) for f in flujos), default=0)):
+            self.paso([f[t] if t < len(f) else None for f in flujos])
+        self._recompute(np.arange(self.grupos))
+        return self.log_lines, [db.snapshot() for db in self.dbs]
@@ -0,0 +1,104 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Raft)
+#
+# Archivo: raft_multigrupo_bench.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+raft_multigrupo_bench.py
+
+Benchmark de raft_multigrupo: G RaftSimulator corridos uno a uno vs un
+RaftMultigrupo con los mismos flujos, verificando que salidas y BD coincidan.
+Requiere NumPy.
+
+Uso:
+    python raft_multigrupo_bench.py --grupos 100,1000,5000 --nodos 5 --eventos 200
+"""
+
+from __future__ import annotations
+import argparse
+import random
+import time
+from typing import Dict, List, Sequence, Tuple
+
+from raft import RaftSimulator
+from raft_multigrupo import RaftMultigrupo, np
+
+
+# ------------------------------------------------------------------------------------
+# Benchmark: G RaftSimulator uno a uno vs RaftMultigrupo
+# ------------------------------------------------------------------------------------
+def carga(grupos: int, nodos: int, eventos: int, seed: int = 0
+          ) -> Tuple[str, List[List[str]]]:
+    rng = random.Random(seed)
+    nombres = [f"N{i}" for i in range(nodos)]
+    cabecera = ";".join(f"{n},{rng.randint(1, 300)}" for n in nombres)
+    flujos = []
+    for _ in range(grupos):
+        flujo = []
+        for i in range(eventos):
+            r = rng.random()
+            if r < 0.5:
+                flujo.append(f"Send;SET-k{rng.randrange(50)}-{i}")
+            elif r < 0.65:
+                flujo.append("Spread;[]")
+            elif r < 0.8:
+                flujo.append(f"Spread;[{','.join(rng.sample(nombres, max(1, nodos // 2)))}]")
+            elif r < 0.95:
+                flujo.append(f"Log;k{rng.randrange(50)}")
+            else:
+                flujo.append(f"{'Stop' if rng.random() < 0.5 else 'Start'};{rng.choice(nombres)}")
+        flujos.append(flujo)
+    return cabecera, flujos
+
+
+def _por_grupo(cabecera: str, flujos: List[List[str]]
+               ) -> Tuple[List[List[str]], List[Dict[str, str]]]:
+    salidas, estados = [], []
+    for flujo in flujos:
+        sim = RaftSimulator()
+        sim._parse_header(cabecera)
+        for line in flujo:
+            sim._process_line(line)
+        sim._flush_sends()
+        sim._recompute_commit_and_apply()
+        salidas.append(sim.log_lines)
+        estados.append(sim.db.snapshot())
+    return salidas, estados
+
+
+def benchmark(grupos: Sequence[int], nodos: int, eventos: int) -> None:
+    print(f"{'grupos':>7} | {'por grupo':>10} | {'multigrupo':>10} | {'speedup':>7} | igual")
+    for g in grupos:
+        cabecera, flujos = carga(g, nodos, eventos)
+        inicio = time.perf_counter()
+        esperado = _por_grupo(cabecera, flujos)
+        t_seq = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        obtenido = RaftMultigrupo(g, cabecera).run_flujos(flujos)
+        t_vec = time.perf_counter() - inicio
+        igual = esperado[0] == obtenido[0] and all(
+            list(a.items()) == list(b.items()) for a, b in zip(esperado[1], obtenido[1]))
+        total = g * eventos
+        print(f"{g:7d} | {total / t_seq:8.0f}/s | {total / t_vec:8.0f}/s | "
+              f"{t_seq / t_vec:6.2f}x | {'sí' if igual else 'NO'}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Muchos grupos Raft en lote (NumPy)")
+    parser.add_argument("--grupos", default="100,1000,5000")
+    parser.add_argument("--nodos", type=int, default=5)
+    parser.add_argument("--eventos", type=int, default=200)
+    args = parser.parse_args()
+    if np is None:
+        parser.error("este benchmark requiere numpy (pip install numpy)")
+    benchmark([int(x) for x in args.grupos.split(",")], args.nodos, args.eventos)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,205 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Raft)
+#
+# Archivo: raft_sharding.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+raft_sharding.py
+
+Multi-Raft particionado por clave. El espacio de claves de database2 se reparte
+(por hash o por rango) entre N grupos Raft independientes, cada uno con su propio
+líder, log y base de datos. Un router dirige cada evento:
+
+- Send;ACCIÓN y Log;var → solo al grupo dueño de la clave.
+- Spread / Start / Stop → a todos los grupos (comparten los mismos nodos físicos).
+
+Como el ruteo es estático, el escenario se separa en un flujo de eventos por grupo
+y los grupos se ejecutan en paralelo en un pool de procesos. La salida de Log se
+reordena según la posición original de cada evento.
+
+Uso:
+    python raft_sharding.py casos_Raft/test_01.txt --shards 4
+    python raft_sharding.py --escala 1,2,4,8 --acciones 20000
+"""
+
+from __future__ import annotations
+import argparse
+import heapq
+import random
+import time
+import zlib
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from escenario import expandir
+from indice import linea_scan
+from raft import RaftSimulator
+from raft_lectura import action_key, fold_key
+
+Evento = Tuple[int, str]  # (posición en el escenario, línea)
+Escaneo = Tuple[int, str, List[Tuple[str, str]]]  # (posición, evento, pares del shard)
+ESCANEOS = ("Scan", "Prefix")
+
+
+class Router:
+    """Asigna cada clave (plegada como en database2) a uno de `shards` grupos."""
+
+    def __init__(self, shards: int, modo: str = "hash",
+                 limites: Optional[Sequence[str]] = None) -> None:
+        self.shards = max(1, shards)
+        self.modo = modo
+        if modo == "rango" and limites is None:
+            # Cortes uniformes sobre la primera letra: a..z
+            paso = 26 / self.shards
+            limites = [chr(ord("a") + round(paso * i)) for i in range(1, self.shards)]
+        self.limites = list(limites or [])
+
+    def shard_de(self, clave: str) -> int:
+        clave = fold_key(clave)
+        if self.modo == "rango":
+            return bisect_right(self.limites, clave)
+        # crc32 y no hash(): debe ser estable entre procesos
+        return zlib.crc32(clave.encode("utf-8")) % self.shards
+
+    def rutear(self, lineas: Sequence[str]) -> List[List[Evento]]:
+        """Separa los eventos (sin la cabecera) en un flujo por grupo."""
+        flujos: List[List[Evento]] = [[] for _ in range(self.shards)]
+        for pos, line in enumerate(lineas):
+            if line.startswith("Send;"):
+                clave = action_key(line.split(";", 1)[1].strip())
+                flujos[self.shard_de(clave) if clave is not None else 0].append((pos, line))
+            elif line.startswith("Log;"):
+                flujos[self.shard_de(line.split(";", 1)[1].strip())].append((pos, line))
+            else:
+                # Start/Stop/Spread y Scan/Prefix van a todos (los Scan se unen al final)
+                for flujo in flujos:
+                    flujo.append((pos, line))
+        return flujos
+
+
+def ejecutar_grupo(args: Tuple[str, List[Evento]]
+                   ) -> Tuple[List[Evento], List[Escaneo], Dict[str, str], int]:
+    """
+    Corre un grupo Raft sobre su flujo; retorna (salidas con posición, pares de cada
+    Scan/Prefix, BD, commit). Los Scan no escriben línea: la arma run_lines con los
+    pares de todos los shards.
+    """
+    cabecera, eventos = args
+    sim = RaftSimulator("")
+    sim._parse_header(cabecera)
+    salidas: List[Evento] = []
+    escaneos: List[Escaneo] = []
+    for pos, line in eventos:
+        cmd, _, arg = line.partition(";")
+        if cmd in ESCANEOS:
+            arg = arg.strip()
+            escaneos.append((pos, f"{cmd};{arg}", sim._pares_scan(cmd, arg)))
+            continue
+        antes = len(sim.log_lines)
+        sim._process_line(line)
+        if len(sim.log_lines) > antes:
+            salidas.append((pos, sim.log_lines[-1]))
+    sim._flush_sends()
+    sim._recompute_commit_and_apply()
+    return salidas, escaneos, sim.db.snapshot(), sim.commit_index
+
+
+class ShardedRaft:
+    """N grupos Raft independientes detrás de un Router."""
+
+    def __init__(self, shards: int, modo: str = "hash", workers: Optional[int] = None) -> None:
+        self.router = Router(shards, modo)
+        self.workers = workers
+        self.commits: List[int] = []
+
+    def run_lines(self, lineas: List[str]) -> Tuple[List[str], Dict[str, str]]:
+        if not lineas:
+            return [], {}
+        flujos = self.router.rutear(lineas[1:])
+        tareas = [(lineas[0], flujo) for flujo in flujos]
+        if self.router.shards == 1:
+            resultados = [ejecutar_grupo(tareas[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                resultados = list(pool.map(ejecutar_grupo, tareas))
+
+        salidas: List[Evento] = []
+        estado: Dict[str, str] = {}
+        partes: Dict[int, Tuple[str, List[List[Tuple[str, str]]]]] = {}
+        self.commits = []
+        for sal, escaneos, snap, commit in resultados:
+            salidas.extend(sal)
+            estado.update(snap)
+            self.commits.append(commit)
+            for pos, evento, pares in escaneos:
+                partes.setdefault(pos, (evento, []))[1].append(pares)
+        # Cada shard entrega sus pares ya ordenados y sus claves son disjuntas
+        for pos, (evento, listas) in partes.items():
+            salidas.append((pos, linea_scan(evento, heapq.merge(*listas))))
+        salidas.sort()
+        return [line for _, line in salidas], estado
+
+    def run(self, path: str) -> Tuple[List[str], Dict[str, str]]:
+        with open(path, "r", encoding="utf-8") as f:
+            lineas = list(expandir(f, RaftSimulator._clean))
+        return self.run_lines(lineas)
+
+
+# ------------------------------------------------------------------------------------
+# Escalamiento: throughput agregado vs número de shards
+# ------------------------------------------------------------------------------------
+def carga_escalamiento(acciones: int, nodos: int = 3, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    ids = [chr(ord("A") + i) for i in range(nodos)]
+    lineas = [";".join(f"{nid},{i + 1}" for i, nid in enumerate(ids))]
+    todos = f"Spread;[{','.join(ids)}]"
+    for i in range(acciones):
+        lineas.append(f"Send;SET-k{rng.randint(0, 9999)}-{i}")
+        if i % 8 == 7:
+            lineas.append(todos)
+    lineas.append(todos)
+    return lineas
+
+
+def escalar(shards: Sequence[int], acciones: int) -> None:
+    lineas = carga_escalamiento(acciones)
+    for n in shards:
+        sharded = ShardedRaft(n)
+        inicio = time.perf_counter()
+        sharded.run_lines(lineas)
+        seg = time.perf_counter() - inicio
+        total = sum(sharded.commits)
+        print(f"shards={n:3d} | comprometidas={total:7d} | {seg:7.2f}s | "
+              f"{total / seg:10.0f} acciones/s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Multi-Raft particionado por clave")
+    parser.add_argument("caso", nargs="?")
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--modo", choices=("hash", "rango"), default="hash")
+    parser.add_argument("--escala", help="lista de shards, p.ej. 1,2,4,8")
+    parser.add_argument("--acciones", type=int, default=20000)
+    args = parser.parse_args()
+
+    if args.escala:
+        escalar([int(x) for x in args.escala.split(",")], args.acciones)
+        return 0
+    if not args.caso:
+        parser.error("indica un caso o --escala")
+    salida, estado = ShardedRaft(args.shards, args.modo).run(args.caso)
+    print("LOGS")
+    print("\n".join(salida) if salida else "No hubo logs")
+    print("BASE DE DATOS")
+    print("\n".join(f"{k}={v}" for k, v in estado.items()) if estado else "No hay datos")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
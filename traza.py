@@ -0,0 +1,203 @@
+# ------------------------------------------------------------------------------------
+# Pontificia Universidad Católica de Chile
+# Escuela de Ingeniería — Departamento de Ciencia de la Computación
+# Curso: IIC2523 - Sistemas Distribuidos
+# Evaluación: Tarea 2 - Simulación de algoritmos de consenso (Paxos y Raft)
+#
+# Archivo: traza.py
+# Autor: Larry Andrés Uribe Araya
+# ------------------------------------------------------------------------------------
+
+"""
+traza.py
+
+Traza binaria de transiciones internas de los simuladores. Cada registro ocupa
+32 bytes fijos:
+
+    tipo (u8) | flags (u8) | nodo (u16) | evento (u32) | term/n (i64) | índice (i64)
+              | valor (i64)
+
+Los nombres de nodo se mapean a enteros y se guardan aparte en `<traza>.nodos`;
+los valores (acciones) se guardan como crc32. El grabador acumula registros en un
+buffer y escribe por bloques, así el costo en el camino caliente es un pack_into.
+
+El lector recorre la traza con mmap/memoryview: contar o filtrar por tipo usa una
+vista con paso de 32 bytes sobre la columna `tipo`, sin crear objetos por registro.
+
+Uso:
+    python main.py Raft casos_Raft/test_01.txt --traza /tmp/raft.bin
+    python traza.py /tmp/raft.bin
+    python traza.py /tmp/raft.bin --tipo COMMIT --nodo A
+"""
+
+from __future__ import annotations
+import argparse
+import mmap
+import os
+import struct
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+REGISTRO = struct.Struct("<BBHIqqq")
+TAM = REGISTRO.size  # 32 bytes
+
+ELECCION = 1
+TERM = 2
+REPLICACION = 3
+COMMIT = 4
+PROMISE = 5
+ACCEPT = 6
+LEARN = 7
+
+TIPOS = {
+    "ELECCION": ELECCION, "TERM": TERM, "REPLICACION": REPLICACION, "COMMIT": COMMIT,
+    "PROMISE": PROMISE, "ACCEPT": ACCEPT, "LEARN": LEARN,
+}
+NOMBRES = {v: k for k, v in TIPOS.items()}
+
+Registro = Tuple[int, int, int, int, int, int, int]
+
+
+def valor_id(valor: Optional[str]) -> int:
+    """Identificador de 64 bits de un valor/acción (crc32; -1 si no hay valor)."""
+    return -1 if valor is None else zlib.crc32(valor.encode("utf-8"))
+
+
+class TraceRecorder:
+    """Grabador con buffer de registros de ancho fijo."""
+
+    def __init__(self, path: str, buffer_registros: int = 4096) -> None:
+        self.path = path
+        self._f = open(path, "wb")
+        self._buf = bytearray(TAM * buffer_registros)
+        self._pos = 0
+        self._nodos: Dict[str, int] = {}
+        self.evento = 0
+
+    def node_id(self, nombre: str) -> int:
+        nid = self._nodos.get(nombre)
+        if nid is None:
+            nid = self._nodos[nombre] = len(self._nodos)
+        return nid
+
+    def tick(self) -> None:
+        """Avanza el número de evento del escenario."""
+        self.evento += 1
+
+    def emit(self, tipo: int, nodo: str, term: int = 0, indice: int = 0, valor: int = 0) -> None:
+        REGISTRO.pack_into(self._buf, self._pos, tipo, 0, self.node_id(nodo), self.evento,
+                           term, indice, valor)
+        self._pos += TAM
+        if self._pos == len(self._buf):
+            self.flush()
+
+    def flush(self) -> None:
+        self._f.write(memoryview(self._buf)[:self._pos])
+        self._pos = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._f.close()
+        with open(self.path + ".nodos", "w", encoding="utf-8") as f:
+            for nombre in self._nodos:
+                f.write(nombre + "\n")
+
+    # Checkpoint (pickle): se guarda cuánto se escribió y al reanudar se reabre el
+    # archivo ahí, descartando lo que se haya escrito después del checkpoint
+    def __getstate__(self) -> Dict[str, object]:
+        self.flush()
+        estado = dict(self.__dict__)
+        estado["_f"] = self._f.tell()
+        estado["_buf"] = len(self._buf)
+        return estado
+
+    def __setstate__(self, estado: Dict[str, object]) -> None:
+        escrito, tam_buf = estado.pop("_f"), estado.pop("_buf")
+        self.__dict__.update(estado)
+        self._f = open(self.path, "r+b")
+        self._f.truncate(escrito)
+        self._f.seek(escrito)
+        self._buf = bytearray(tam_buf)
+
+
+class TraceReader:
+    """Lector de trazas sobre mmap; filtra por tipo sin materializar registros."""
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "rb")
+        tam = os.path.getsize(path)
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if tam else None
+        self._mv = memoryview(self._mm) if self._mm is not None else memoryview(b"")
+        self.n = len(self._mv) // TAM
+        self.nodos: List[str] = []
+        if os.path.exists(path + ".nodos"):
+            with open(path + ".nodos", encoding="utf-8") as f:
+                self.nodos = [x.rstrip("\n") for x in f]
+
+    def _tipos(self) -> bytes:
+        # Columna de tipos: un byte cada TAM bytes (una sola copia de n bytes)
+        return self._mv[0:self.n * TAM:TAM].tobytes()
+
+    def count(self, tipo: Optional[int] = None) -> int:
+        if tipo is None:
+            return self.n
+        return self._tipos().count(tipo)
+
+    def indices(self, tipo: int) -> Iterator[int]:
+        tipos = self._tipos()
+        marca = bytes([tipo])
+        i = tipos.find(marca)
+        while i >= 0:
+            yield i
+            i = tipos.find(marca, i + 1)
+
+    def records(self, tipo: Optional[int] = None, nodo: Optional[int] = None,
+                ) -> Iterator[Registro]:
+        idx = self.indices(tipo) if tipo is not None else iter(range(self.n))
+        for i in idx:
+            if nodo is not None and int.from_bytes(self._mv[i * TAM + 2:i * TAM + 4],
+                                                   "little") != nodo:
+                continue
+            yield REGISTRO.unpack_from(self._mv, i * TAM)
+
+    def close(self) -> None:
+        self._mv.release()
+        if self._mm is not None:
+            self._mm.close()
+        self._file.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Lector de trazas binarias")
+    parser.add_argument("traza")
+    parser.add_argument("--tipo", choices=sorted(TIPOS))
+    parser.add_argument("--nodo")
+    parser.add_argument("--max", type=int, default=50)
+    args = parser.parse_args()
+
+    lector = TraceReader(args.traza)
+    if not args.tipo and not args.nodo:
+        print(f"Registros: {lector.n}")
+        for nombre, tipo in TIPOS.items():
+            print(f"  {nombre:12s} {lector.count(tipo)}")
+        lector.close()
+        return 0
+
+    tipo = TIPOS[args.tipo] if args.tipo else None
+    nodo = lector.nodos.index(args.nodo) if args.nodo in lector.nodos else None
+    if args.nodo and nodo is None:
+        print(f"Nodo desconocido: {args.nodo}")
+        return 1
+    for k, (t, _, n, ev, term, indice, valor) in enumerate(lector.records(tipo, nodo)):
+        if k >= args.max:
+            print("...")
+            break
+        nombre = lector.nodos[n] if n < len(lector.nodos) else str(n)
+        print(f"ev={ev:6d} {NOMBRES.get(t, t):12s} nodo={nombre:6s} term={term} "
+              f"índice={indice} valor={valor}")
+    lector.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())